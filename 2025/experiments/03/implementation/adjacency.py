@@ -4,13 +4,18 @@
 状态机做了适度简化，但保留了 OSPF 的关键阶段命名。通过 Hello
 报文驱动 Down→Init→Two-Way→Full 的转换，并将 ExStart/Exchange/
 Loading 合并为一次跃迁，方便学生把精力放在 LSA 泛洪与 SPF 上。
+
+点到点链路上双向后直接升至 Full；广播网段上邻接停留在 Two-Way，
+由路由器按 :func:`elect_designated_routers` 的结果只与 DR/BDR 建立 Full 邻接。
 """
 
 from __future__ import annotations
 
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, Iterable, Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+from .compact import router_id_value
 
 
 class NeighborState(str, Enum):
@@ -27,6 +32,7 @@ class Adjacency:
   state: NeighborState = NeighborState.DOWN
   dr: Optional[str] = None
   bdr: Optional[str] = None
+  priority: int = 1
   last_hello: float = 0.0
   dead_timer: float = 0.0
   hello_options: Dict[str, Any] = field(default_factory=dict)
@@ -54,6 +60,13 @@ class Adjacency:
     self.dead_timer = float(remote_dead) if isinstance(remote_dead, (int, float)) and remote_dead > 0 else float(dead_interval)
     self.last_hello = now
     self.hello_options = dict(message.get("options") or {})
+    try:
+      priority = int(message.get("priority", 1))
+    except (TypeError, ValueError):
+      priority = 1
+    if priority != self.priority:
+      self.priority = priority
+      changed = True
 
     # 按 RFC 2328 的流程推进状态。初次收到报文时从 Down → Init。
     if self.state == NeighborState.DOWN:
@@ -122,8 +135,59 @@ class Adjacency:
       return False
     if now - self.last_hello <= self.dead_timer:
       return False
+    self.bring_down()
+    return True
+
+  def bring_down(self) -> None:
+    """
+    立即将邻接置为 Down，例如 BFD 等外部检测机制判定链路故障时。
+    """
     self.state = NeighborState.DOWN
     self.dr = None
     self.bdr = None
     self.hello_options.clear()
-    return True
+
+
+@dataclass(frozen=True)
+class ElectionCandidate:
+  """参与 DR/BDR 选举的路由器及其在 Hello 中宣告的 DR/BDR。"""
+  priority: int
+  dr: Optional[str] = None
+  bdr: Optional[str] = None
+
+
+def elect_designated_routers(
+    local_router_id: str,
+    candidates: Mapping[str, ElectionCandidate],
+) -> Tuple[Optional[str], Optional[str]]:
+  """
+  按 RFC 2328 9.4 选举广播网段的 DR 与 BDR，返回 ``(dr, bdr)``。
+
+  ``candidates`` 包含本路由器以及所有已达到 Two-Way 的邻居。优先级为 0 的
+  路由器不参选。已宣告自己为 DR/BDR 的路由器优先保留角色，因此新加入的
+  高优先级路由器不会抢占现有 DR。本路由器的角色发生变化时按新角色再选一轮。
+  """
+  def rank(router_id: str) -> Tuple[int, int]:
+    return candidates[router_id].priority, router_id_value(router_id)
+
+  def run(pool: Mapping[str, ElectionCandidate]) -> Tuple[Optional[str], Optional[str]]:
+    eligible = [rid for rid, c in pool.items() if c.priority > 0]
+    bdr_pool = [rid for rid in eligible if pool[rid].dr != rid]
+    declared_bdr = [rid for rid in bdr_pool if pool[rid].bdr == rid]
+    bdr = max(declared_bdr or bdr_pool, key=rank, default=None)
+    declared_dr = [rid for rid in eligible if pool[rid].dr == rid]
+    # 无人宣告 DR 时由 BDR 接任；新的 BDR 在接任者宣告后的下一轮选出。
+    dr = max(declared_dr, key=rank, default=None) or bdr
+    return dr, bdr
+
+  local = candidates.get(local_router_id)
+  dr, bdr = run(candidates)
+  if local is None:
+    return dr, bdr
+  was_role = local_router_id in (local.dr, local.bdr)
+  is_role = local_router_id in (dr, bdr)
+  if was_role != is_role or (local.dr == local_router_id) != (dr == local_router_id):
+    pool = dict(candidates)
+    pool[local_router_id] = ElectionCandidate(local.priority, dr, bdr)
+    dr, bdr = run(pool)
+  return dr, bdr
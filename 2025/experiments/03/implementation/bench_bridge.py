@@ -0,0 +1,127 @@
+"""
+单一广播网段上的邻接数与泛洪量基准。
+
+在 :class:`~implementation.fabric.Fabric` 上构造 N 台路由器共享一个 /16 网段
+（每台路由器把其余 N-1 台都配置为该接口的邻居），分别以 ``point-to-point``
+（全互联 Full 邻接，即引入 DR/BDR 之前的行为）与 ``broadcast``（DR/BDR 选举 +
+Network LSA）两种接口类型运行，报告：
+
+- 收敛耗时与 Full 邻接总数（每条邻接在两端各计一次）；
+- 收敛期间的 LSU 报文数，以及全部报文的数量与字节数；
+- 收敛后单台路由器刷新一条 Router LSA 引起的 LSU 报文数（单次变更的泛洪量）。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_bridge [--routers 50] [--timeout 60] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from .adjacency import NeighborState
+from .bench_common import AREA, loopbacks_reachable, router_id, run_until
+from .events import EventLoop
+from .fabric import Fabric
+from .router import BROADCAST, POINT_TO_POINT, Router
+
+def bridge_config(routers: int, network_type: str) -> Dict[str, object]:
+  members = range(1, routers + 1)
+  config: Dict[str, object] = {
+      "defaults": {"area": AREA, "hello_interval": 1, "dead_interval": 4, "min_ls_interval": 0.5},
+      "routers": {},
+  }
+  for index in members:
+    rid = router_id(index)
+    config["routers"][rid] = {  # type: ignore[index]
+        "loopback": f"{rid}/32",
+        "interfaces": [{
+            "name": "br0",
+            "ip": f"10.0.{index >> 8}.{index & 0xFF}/16",
+            "cost": 10,
+            "network_type": network_type,
+            "neighbors": [
+                {"router_id": router_id(peer), "addr": f"10.0.{peer >> 8}.{peer & 0xFF}"}
+                for peer in members
+                if peer != index
+            ],
+        }],
+    }
+  return config
+
+
+def _full_adjacencies(routers: List[Router]) -> int:
+  return sum(
+      1
+      for r in routers
+      for iface_state in r.interfaces.values()
+      for adjacency in iface_state.adjacency.values()
+      if adjacency.state == NeighborState.FULL
+  )
+
+
+def run(routers: int, network_type: str, timeout: float) -> Dict[str, object]:
+  loop = EventLoop()
+  fabric = Fabric(loop)
+  config = bridge_config(routers, network_type)
+  members = [Router(rid, config, loop, dry_run=True) for rid in config["routers"]]  # type: ignore[union-attr]
+  started = time.monotonic()
+  for router in members:
+    router.bootstrap(bind=False)
+    fabric.attach(router)
+  converged = run_until(loop, lambda: loopbacks_reachable(members), timeout)
+  elapsed = time.monotonic() - started
+  # 等待收敛后的尾部泛洪结束，再统计一次变更的泛洪量。
+  run_until(loop, lambda: False, 2.0)
+  result: Dict[str, object] = {
+      "network_type": network_type,
+      "routers": routers,
+      "converged": converged,
+      "convergence_s": round(elapsed, 3),
+      "full_adjacencies": _full_adjacencies(members),
+      "convergence_lsu_messages": fabric.by_kind["lsu"],
+      "convergence_packets": fabric.packets,
+      "convergence_bytes": fabric.bytes,
+  }
+
+  fabric.reset_counters()
+  origin = members[-1]
+  origin._originate_router_lsa(force=True)
+  run_until(loop, lambda: False, 1.0)
+  result["change_lsu_messages"] = fabric.by_kind["lsu"]
+
+  for router in members:
+    router.shutdown()
+  return result
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Compare adjacencies and flooding on one shared segment.")
+  parser.add_argument("--routers", type=int, default=50, help="Number of routers on the segment")
+  parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for convergence per run")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.ERROR)
+  results = [run(max(2, args.routers), kind, args.timeout) for kind in (POINT_TO_POINT, BROADCAST)]
+  if args.json:
+    print(json.dumps(results, sort_keys=True))
+    return 0
+  for result in results:
+    print(
+        f"{result['network_type']:15s} converged={result['converged']} in {result['convergence_s']}s"
+        f" full={result['full_adjacencies']}"
+        f" lsu={result['convergence_lsu_messages']} packets={result['convergence_packets']}"
+        f" bytes={result['convergence_bytes']}"
+        f" change_lsu={result['change_lsu_messages']}"
+    )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
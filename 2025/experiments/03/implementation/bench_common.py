@@ -0,0 +1,68 @@
+"""
+在 :class:`~implementation.fabric.Fabric` 上运行多台路由器的基准共用的辅助函数。
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import time
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from .events import EventLoop
+from .fabric import Fabric
+from .router import Router
+
+AREA = "0.0.0.0"
+
+
+def router_id(index: int) -> str:
+  """第 ``index`` 台路由器的 Router ID（同时用作 loopback 地址）。"""
+  return f"192.168.{index >> 8}.{index & 0xFF}"
+
+
+def add_p2p_links(config: Dict[str, object], links: Iterable[Tuple[str, str]], *, cost: int = 10) -> None:
+  """为每条链路依次分配 10.0.0.0 起的 /30 网段，两端各加一个名为 ``to-<对端>`` 的接口。"""
+  routers = config["routers"]
+  for index, (a, b) in enumerate(links):
+    network = ipaddress.IPv4Address("10.0.0.0") + 4 * index
+    addresses = {a: network + 1, b: network + 2}
+    for local, peer in ((a, b), (b, a)):
+      routers[local]["interfaces"].append({  # type: ignore[index]
+          "name": f"to-{peer}",
+          "ip": f"{addresses[local]}/30",
+          "cost": cost,
+          "neighbors": [{"router_id": peer, "addr": str(addresses[peer])}],
+      })
+
+
+def run_until(loop: EventLoop, done: Callable[[], bool], timeout: float) -> bool:
+  """运行事件循环直到 ``done()`` 为真；超时返回 False。"""
+  deadline = time.monotonic() + timeout
+  while time.monotonic() < deadline:
+    loop._run_once()
+    if done():
+      return True
+  return False
+
+
+def settle(loop: EventLoop, fabric: Fabric, quiet: float, timeout: float) -> bool:
+  """运行事件循环，直到连续 ``quiet`` 秒没有新的 LSU 报文；超时返回 False。"""
+  deadline = time.monotonic() + timeout
+  last, since = fabric.by_kind["lsu"], time.monotonic()
+  while time.monotonic() < deadline:
+    loop._run_once()
+    count = fabric.by_kind["lsu"]
+    if count != last:
+      last, since = count, time.monotonic()
+    elif time.monotonic() - since >= quiet:
+      return True
+  return False
+
+
+def loopbacks_reachable(routers: List[Router]) -> bool:
+  """每台路由器都有到其余所有 loopback 的路由。"""
+  loopbacks = [f"{r.router_id}/32" for r in routers]
+  return all(
+      all(prefix in r.routes for prefix in loopbacks if prefix != f"{r.router_id}/32")
+      for r in routers
+  )
@@ -0,0 +1,162 @@
+"""
+转发表聚合的条目数与安装耗时基准。
+
+生成一个按区域连续编址的拓扑：本机通过一条链路连到每个区域的汇聚路由器，
+区域内的路由器串成一条链，链路网段取自 ``10.<区域>.<序号>.0/24``，loopback
+取自 ``172.16.<区域>.<序号>/32``。在 :class:`Router` 上运行 ``run_spf`` 后报告：
+
+- 路由表条目数与转发表条目数（仅自动聚合，以及额外配置每个区域的汇总范围）；
+- 生成转发表的耗时，与不做聚合、逐条装入的耗时对比；
+- 逐条校验每条路由覆盖的地址在两张表中的最长前缀匹配结果相同。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_fib [--regions 16] [--per-region 250] [--repeat 5] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+from typing import Callable, Dict, List
+
+from .compact import parse_prefix
+from .events import EventLoop
+from .fib import Fib, build_fib, route_action
+from .lsdb import Lsa, LsaHeader
+from .router import Router
+
+AREA = "0.0.0.0"
+ROOT = "192.168.255.255"
+
+
+def router_id(region: int, index: int) -> str:
+  return f"192.168.{region}.{index}"
+
+
+def _router_lsa(rid: str, links: List[str], networks: List[str], loopback: str) -> Lsa:
+  payload = {
+      "router_id": rid,
+      "links": [{"router_id": peer, "cost": 1} for peer in links],
+      "networks": [{"prefix": prefix, "metric": 1} for prefix in networks],
+      "loopback": loopback,
+      "loopback_cost": 0,
+  }
+  return Lsa(header=LsaHeader("router", rid, rid, 1), payload=payload)
+
+
+def build_router(regions: int, per_region: int) -> Router:
+  """构造本机 Router 并装入所有区域路由器的 Router LSA。"""
+  interfaces = []
+  lsas = [_router_lsa(ROOT, [router_id(r, 0) for r in range(1, regions + 1)], [], f"{ROOT}/32")]
+  for region in range(1, regions + 1):
+    hub = router_id(region, 0)
+    interfaces.append({
+        "name": f"up{region}",
+        "ip": f"10.255.{region}.1/24",
+        "cost": 1,
+        "neighbors": [{"router_id": hub, "addr": f"10.255.{region}.2"}],
+    })
+    for index in range(per_region + 1):
+      links = []
+      networks = []
+      if index == 0:
+        links.append(ROOT)
+        networks.append(f"10.255.{region}.0/24")
+      else:
+        links.append(router_id(region, index - 1))
+        networks.append(f"10.{region}.{index}.0/24")
+      if index < per_region:
+        links.append(router_id(region, index + 1))
+        networks.append(f"10.{region}.{index + 1}.0/24")
+      lsas.append(_router_lsa(router_id(region, index), links, networks, f"172.16.{region}.{index}/32"))
+  config = {
+      "defaults": {"area": AREA},
+      "routers": {ROOT: {"loopback": f"{ROOT}/32", "interfaces": interfaces}},
+  }
+  router = Router(ROOT, config, EventLoop(), dry_run=True)
+  router._load_interfaces()
+  for lsa in lsas:
+    router.lsdb.install(lsa)
+  return router
+
+
+def _timed(func: Callable[[], object], repeat: int) -> float:
+  samples = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    samples.append(time.perf_counter() - start)
+  return round(statistics.median(samples) * 1000, 3)
+
+
+def _equivalent(routes: Dict[str, Dict[str, object]], fib: Fib) -> bool:
+  """每条路由的首地址、末地址在两张表中的匹配结果必须一致。"""
+  flat = Fib(entries={parse_prefix(prefix): route_action(entry) for prefix, entry in routes.items()})
+  for prefix in routes:
+    network, length = parse_prefix(prefix)
+    for value in (network, network | ((1 << (32 - length)) - 1)):
+      address = ".".join(str((value >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+      if fib.lookup(address) != flat.lookup(address):
+        return False
+  return True
+
+
+def run(regions: int, per_region: int, repeat: int) -> Dict[str, object]:
+  router = build_router(regions, per_region)
+  router.run_spf()
+  routes = dict(router.routes)
+  ranges = [parse_prefix(f"10.{r}.0.0/16") for r in range(1, regions + 1)]
+  ranges += [parse_prefix(f"172.16.{r}.0/24") for r in range(1, regions + 1)]
+
+  auto = build_fib(routes)
+  summarized = build_fib(routes, ranges)
+  return {
+      "regions": regions,
+      "per_region": per_region,
+      "routes": len(routes),
+      "fib_auto": len(auto),
+      "fib_summary": len(summarized),
+      "reduction_auto": round(1 - len(auto) / len(routes), 4),
+      "reduction_summary": round(1 - len(summarized) / len(routes), 4),
+      "equivalent": _equivalent(routes, auto) and _equivalent(routes, summarized),
+      "install_ms": {
+          "flat": _timed(lambda: Fib(entries={parse_prefix(p): route_action(e) for p, e in routes.items()}), repeat),
+          "auto": _timed(lambda: build_fib(routes), repeat),
+          "summary": _timed(lambda: build_fib(routes, ranges), repeat),
+      },
+      "router_install_ms": round(router.metrics.get("fib.install_s") * 1000, 3),
+  }
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Measure FIB aggregation size and install time.")
+  parser.add_argument("--regions", type=int, default=16, help="Number of regions behind the local router")
+  parser.add_argument("--per-region", type=int, default=250, help="Routers per region (at most 254)")
+  parser.add_argument("--repeat", type=int, default=5, help="Samples per timed step")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.WARNING)
+  result = run(min(max(1, args.regions), 254), min(max(1, args.per_region), 254), max(1, args.repeat))
+  if args.json:
+    print(json.dumps(result, sort_keys=True))
+    return 0
+  install = result["install_ms"]
+  print(f"regions {result['regions']} x {result['per_region']} routers, routes {result['routes']}")
+  print(f"fib auto     {result['fib_auto']} entries ({result['reduction_auto']:.1%} smaller)")
+  print(f"fib summary  {result['fib_summary']} entries ({result['reduction_summary']:.1%} smaller)")
+  print(f"equivalent   {result['equivalent']}")
+  print(  # type: ignore[index]
+      f"install      flat={install['flat']}ms auto={install['auto']}ms summary={install['summary']}ms"
+      f" (router run_spf: {result['router_install_ms']}ms)"
+  )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,147 @@
+"""
+全互联拓扑上的泛洪量基准。
+
+在 :class:`~implementation.fabric.Fabric` 上构造 N 台两两直连的路由器（每对
+路由器之间一条 /30 点到点链路），分别以全量泛洪与精简泛洪（``reduced_flooding``）
+运行，报告：
+
+- 收敛耗时与收敛期间的 LSU 报文数（直到 LSU 停止）；
+- 泛洪子图的链路数（全量泛洪时为全部链路）；
+- 收敛后依次让若干台路由器刷新 Router LSA，平均每次变更引起的 LSU 报文数，
+  以及每次变更是否送达了所有路由器；
+- 在变更发起者的一条泛洪链路上静默丢包（邻接尚未超时）后再次变更，检查
+  LSA 是否仍送达所有路由器。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_flood [--routers 64] [--changes 8] [--timeout 120] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import logging
+import sys
+import time
+from typing import Dict, List
+
+from .bench_common import AREA, add_p2p_links, loopbacks_reachable, router_id, run_until, settle
+from .events import EventLoop
+from .fabric import Fabric
+from .router import Router
+
+def mesh_config(routers: int, reduced: bool) -> Dict[str, object]:
+  ids = [router_id(index) for index in range(1, routers + 1)]
+  config: Dict[str, object] = {
+      "defaults": {
+          "area": AREA,
+          # 单进程模拟数千条邻接，放宽计时，避免处理积压被误判为邻居超时。
+          "hello_interval": 2,
+          "dead_interval": 120,
+          "min_ls_interval": 5.0,
+          "reduced_flooding": reduced,
+      },
+      "routers": {rid: {"loopback": f"{rid}/32", "interfaces": []} for rid in ids},
+  }
+  add_p2p_links(config, itertools.combinations(ids, 2))
+  return config
+
+
+def _sequence(router: Router, origin: str) -> int:
+  lsa = router.lsdb.lookup("router", origin)
+  return lsa.header.sequence if lsa is not None else -1
+
+
+def _change(loop: EventLoop, fabric: Fabric, members: List[Router], origin: Router) -> Dict[str, object]:
+  """
+  强制刷新 ``origin`` 的 Router LSA（可能被 MinLSInterval 推迟），等待泛洪结束后
+  统计 LSU 报文数与送达情况。
+  """
+  previous = _sequence(origin, origin.router_id)
+  fabric.reset_counters()
+  origin._originate_router_lsa(force=True)
+  run_until(loop, lambda: _sequence(origin, origin.router_id) != previous, 10.0)
+  sequence = _sequence(origin, origin.router_id)
+  settle(loop, fabric, 1.0, 60.0)
+  return {
+      "lsu_messages": fabric.by_kind["lsu"],
+      "delivered": all(_sequence(router, origin.router_id) == sequence for router in members),
+  }
+
+
+def run(routers: int, reduced: bool, changes: int, timeout: float) -> Dict[str, object]:
+  loop = EventLoop()
+  fabric = Fabric(loop)
+  config = mesh_config(routers, reduced)
+  members = [Router(rid, config, loop, dry_run=True) for rid in config["routers"]]  # type: ignore[union-attr]
+  started = time.monotonic()
+  for router in members:
+    router.bootstrap(bind=False)
+    fabric.attach(router)
+  # 收敛：所有路由器都有到其余 loopback 的路由，且推迟的 LSA 生成与尾部泛洪都已结束。
+  converged = run_until(loop, lambda: loopbacks_reachable(members), timeout)
+  converged = converged and settle(loop, fabric, 6.0, timeout)
+  elapsed = time.monotonic() - started
+  convergence_lsu = fabric.by_kind["lsu"]
+
+  area = members[0].areas[AREA]
+  links = routers * (routers - 1) // 2
+  flooding_links = area.flooding.flooding_links if reduced and area.flooding is not None else links
+  step = max(1, routers // max(1, changes))
+  samples = [_change(loop, fabric, members, members[index]) for index in range(0, routers, step)[:changes]]
+
+  # 静默切断发起者在泛洪子图中的一条链路，验证冗余。
+  origin = members[-1]
+  if reduced and area.flooding is not None:
+    peer = min(area.flooding.flooding.get(origin.router_id, {members[0].router_id}))
+  else:
+    peer = members[0].router_id
+  fabric.down(origin.router_id, peer)
+  failed = _change(loop, fabric, members, origin)
+  fabric.up(origin.router_id, peer)
+
+  for router in members:
+    router.shutdown()
+  return {
+      "reduced_flooding": reduced,
+      "routers": routers,
+      "converged": converged,
+      "convergence_s": round(elapsed, 3),
+      "convergence_lsu_messages": convergence_lsu,
+      "links": links,
+      "flooding_links": flooding_links,
+      "changes": len(samples),
+      "lsu_per_change": round(sum(s["lsu_messages"] for s in samples) / max(1, len(samples)), 1),  # type: ignore[misc]
+      "delivered": all(s["delivered"] for s in samples),
+      "delivered_with_failed_link": failed["delivered"],
+  }
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Compare flooding volume on a full mesh with and without reduced flooding.")
+  parser.add_argument("--routers", type=int, default=64, help="Number of fully meshed routers")
+  parser.add_argument("--changes", type=int, default=8, help="Router LSA refreshes to sample after convergence")
+  parser.add_argument("--timeout", type=float, default=120.0, help="Seconds to wait for convergence per run")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.ERROR)
+  results = [run(max(3, args.routers), reduced, max(1, args.changes), args.timeout) for reduced in (False, True)]
+  if args.json:
+    print(json.dumps(results, sort_keys=True))
+    return 0
+  for result in results:
+    print(
+        f"{'reduced' if result['reduced_flooding'] else 'full':8s} converged={result['converged']}"
+        f" in {result['convergence_s']}s lsu={result['convergence_lsu_messages']}"
+        f" flooding_links={result['flooding_links']}/{result['links']}"
+        f" lsu_per_change={result['lsu_per_change']} delivered={result['delivered']}"
+        f" delivered_with_failed_link={result['delivered_with_failed_link']}"
+    )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,157 @@
+"""
+链路劣化下的收敛耗时基准。
+
+在 :class:`~implementation.fabric.Fabric` 上构造 ``rows × cols`` 的网格拓扑，
+用 :class:`~implementation.impair.ImpairedTransport` 为每台路由器的发送方向
+注入给定比例的丢包（外加固定时延与抖动），对每个丢包率报告：
+
+- 冷启动收敛耗时：所有路由器都有到其余 loopback 的路由，且各自持有每台
+  路由器最新的 Router LSA；
+- 切断网格中央的一条链路后的再收敛耗时：除上述条件外，两端都已不再通告
+  该链路；
+- 期间的 LSU 报文数与劣化层丢弃的报文数。
+
+超时未收敛的阶段在 JSON 中记为 ``null``，文本输出为 ``timeout``。用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_loss [--rows 4] [--cols 4] [--loss 0,0.01,0.05,0.1,0.2] [--seed 1] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import sys
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .bench_common import AREA, add_p2p_links, loopbacks_reachable, run_until
+from .events import EventLoop
+from .fabric import Fabric
+from .impair import ImpairedTransport, Impairment
+from .router import Router
+
+
+def grid_router_id(row: int, col: int) -> str:
+  """网格第 ``row`` 行第 ``col`` 列的 Router ID；劣化的随机数序列由它派生。"""
+  return f"192.168.{row + 1}.{col + 1}"
+
+
+def grid_config(rows: int, cols: int) -> Tuple[Dict[str, object], List[Tuple[str, str]]]:
+  """返回网格拓扑的配置与链路列表（每条链路一个 /30 网段）。"""
+  config: Dict[str, object] = {
+      "defaults": {"area": AREA, "hello_interval": 1, "dead_interval": 4, "min_ls_interval": 0.5},
+      "routers": {
+          grid_router_id(r, c): {"loopback": f"{grid_router_id(r, c)}/32", "interfaces": []}
+          for r in range(rows)
+          for c in range(cols)
+      },
+  }
+  links: List[Tuple[str, str]] = []
+  for r in range(rows):
+    for c in range(cols):
+      if c + 1 < cols:
+        links.append((grid_router_id(r, c), grid_router_id(r, c + 1)))
+      if r + 1 < rows:
+        links.append((grid_router_id(r, c), grid_router_id(r + 1, c)))
+  add_p2p_links(config, links)
+  return config, links
+
+
+def _timed(loop: EventLoop, done: Callable[[], bool], timeout: float) -> Optional[float]:
+  """运行事件循环直到 ``done()``，返回耗时；超时返回 None。"""
+  started = time.monotonic()
+  return time.monotonic() - started if run_until(loop, done, timeout) else None
+
+
+def _links_of(router: Router, origin: str) -> set[str]:
+  lsa = router.lsdb.lookup("router", origin)
+  if lsa is None:
+    return set()
+  return {str(link.get("router_id")) for link in lsa.payload.get("links", [])}
+
+
+def _converged(routers: List[Router]) -> bool:
+  if not loopbacks_reachable(routers):
+    return False
+  # 每台路由器都持有其余路由器当前生成的 Router LSA。
+  for origin in routers:
+    own = origin.lsdb.lookup("router", origin.router_id)
+    if own is None:
+      return False
+    for router in routers:
+      stored = router.lsdb.lookup("router", origin.router_id)
+      if stored is None or stored.header.sequence != own.header.sequence:
+        return False
+  return True
+
+
+def run(rows: int, cols: int, loss: float, seed: int, timeout: float) -> Dict[str, object]:
+  loop = EventLoop()
+  fabric = Fabric(loop)
+  config, links = grid_config(rows, cols)
+  members = [Router(rid, config, loop, dry_run=True) for rid in config["routers"]]  # type: ignore[union-attr]
+  profile = {"send": {"*": Impairment(loss=loss, delay_ms=2.0, jitter_ms=1.0)}}
+  for router in members:
+    router.bootstrap(bind=False)
+    fabric.attach(router)
+    ImpairedTransport(loop, profile, seed=seed).attach(router)
+
+  cold = _timed(loop, lambda: _converged(members), timeout)
+  cold_lsu = fabric.by_kind["lsu"]
+
+  fabric.reset_counters()
+  a, b = links[len(links) // 2]
+  by_id = {router.router_id: router for router in members}
+  fabric.down(a, b)
+  failure = _timed(
+      loop,
+      lambda: b not in _links_of(by_id[a], a) and a not in _links_of(by_id[b], b) and _converged(members),
+      timeout,
+  )
+  failure_lsu = fabric.by_kind["lsu"]
+
+  lost = sum(router.metrics.get("impair.lost") for router in members)
+  for router in members:
+    router.shutdown()
+  return {
+      "loss": loss,
+      "routers": len(members),
+      "links": len(links),
+      "cold_convergence_s": None if cold is None else round(cold, 3),
+      "cold_lsu_messages": cold_lsu,
+      "failure_convergence_s": None if failure is None else round(failure, 3),
+      "failure_lsu_messages": failure_lsu,
+      "impaired_drops": int(lost),
+  }
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Measure convergence time under injected packet loss.")
+  parser.add_argument("--rows", type=int, default=4, help="Grid rows")
+  parser.add_argument("--cols", type=int, default=4, help="Grid columns")
+  parser.add_argument("--loss", default="0,0.01,0.05,0.1,0.2", help="Comma separated send loss ratios")
+  parser.add_argument("--seed", type=int, default=1, help="Impairment RNG seed")
+  parser.add_argument("--timeout", type=float, default=30.0, help="Seconds to wait for each convergence phase")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.ERROR)
+  rates = [float(value) for value in args.loss.split(",") if value.strip()]
+  results = [run(max(1, args.rows), max(2, args.cols), rate, args.seed, args.timeout) for rate in rates]
+  if args.json:
+    print(json.dumps(results, sort_keys=True))
+    return 0
+  for result in results:
+    cold = "timeout" if result["cold_convergence_s"] is None else f"{result['cold_convergence_s']}s"
+    failure = "timeout" if result["failure_convergence_s"] is None else f"{result['failure_convergence_s']}s"
+    print(
+        f"loss={result['loss']:<5} cold={cold} lsu={result['cold_lsu_messages']}"
+        f" failure={failure} lsu={result['failure_lsu_messages']}"
+        f" dropped={result['impaired_drops']}"
+    )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,312 @@
+"""
+LSDB 与 SPF 紧凑表示的内存与耗时基准。
+
+生成一个可复现的随机拓扑（环 + 随机弦，代价 1–20），将每台路由器的
+Router LSA 按 LSU 的 JSON 编码往返后装入 :class:`LinkStateDatabase`，然后报告：
+
+- LSDB 中每条 LSA 的平均字节数（tracemalloc 统计 ``install`` 之后保留的内存）；
+- SPF 内部状态的字节数：:mod:`implementation.compact` 的整数下标/数组表示
+  （链路数组、CSR 图、距离与首跳数组），与以 Router ID 字符串为键的嵌套字典
+  邻接表及字典形式的 Dijkstra 结果对比；
+- 建图与 Dijkstra 的耗时，同样与字符串字典版本对比（紧凑表示的建图拆分为
+  只在 LSA 变化时执行的链路打包与每次拓扑变化都执行的 CSR 构建）；
+- 在配置了真实接口的 :class:`Router` 上运行完整 ``run_spf`` 的冷启动耗时，
+  以及修改一条链路代价后的增量耗时；
+- 一条链路在两个代价之间反复切换时，关闭与开启 SPF 结果缓存的 ``run_spf``
+  耗时、缓存命中率与占用的字节数，并校验两种情况下的路由表一致。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_spf [--nodes 10000] [--degree 4] [--repeat 5] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import heapq
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from array import array
+from typing import Callable, Dict, List, Tuple
+
+from .compact import CsrGraph, RouterIdTable, pack_links, shortest_paths
+from .events import EventLoop
+from .lsdb import LinkStateDatabase, Lsa, LsaHeader
+from .router import Router
+
+AREA = "0.0.0.0"
+
+
+def router_id(index: int) -> str:
+  value = index + 1
+  return f"10.{(value >> 16) & 0xFF}.{(value >> 8) & 0xFF}.{value & 0xFF}"
+
+
+def build_topology(nodes: int, degree: int, seed: int) -> Dict[int, Dict[int, int]]:
+  """
+  返回对称邻接表 ``{下标: {邻居下标: 代价}}``。环保证连通，
+  其余度数由随机弦补足，两个方向使用相同代价。
+  """
+  rng = random.Random(seed)
+  adjacency: Dict[int, Dict[int, int]] = {index: {} for index in range(nodes)}
+
+  def connect(a: int, b: int) -> None:
+    if a == b or b in adjacency[a]:
+      return
+    cost = rng.randint(1, 20)
+    adjacency[a][b] = cost
+    adjacency[b][a] = cost
+
+  for index in range(nodes):
+    connect(index, (index + 1) % nodes)
+  chords = max(0, nodes * (degree - 2) // 2)
+  for _ in range(chords):
+    connect(rng.randrange(nodes), rng.randrange(nodes))
+  return adjacency
+
+
+def router_lsa(index: int, links: Dict[int, int], sequence: int = 1) -> Lsa:
+  rid = router_id(index)
+  payload = {
+      "router_id": rid,
+      "links": [{"router_id": router_id(peer), "cost": cost} for peer, cost in sorted(links.items())],
+      "networks": [{"prefix": f"172.{16 + (index >> 16)}.{(index >> 8) & 0xFF}.{index & 0xFF}/32", "metric": 1}],
+      "loopback": f"{rid}/32",
+      "loopback_cost": 0,
+  }
+  return Lsa(header=LsaHeader("router", rid, rid, sequence), payload=payload)
+
+
+def _wire_copy(lsa: Lsa) -> Lsa:
+  # 经过一次 JSON 往返，使对象形态与从 LSU 报文解码得到的一致。
+  encoded = json.dumps(LinkStateDatabase.to_message_payload(lsa))
+  return LinkStateDatabase.from_message_payload(json.loads(encoded))
+
+
+def _retained(build: Callable[[], object]) -> Tuple[object, int]:
+  """运行 ``build`` 并返回其结果与调用后仍被保留的内存字节数。"""
+  gc.collect()
+  tracemalloc.start()
+  before = tracemalloc.get_traced_memory()[0]
+  result = build()
+  gc.collect()
+  after = tracemalloc.get_traced_memory()[0]
+  tracemalloc.stop()
+  return result, after - before
+
+
+def _timed(func: Callable[[], object], repeat: int) -> Dict[str, float]:
+  samples: List[float] = []
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    samples.append(time.perf_counter() - start)
+  return {"min_ms": round(min(samples) * 1000, 3), "median_ms": round(statistics.median(samples) * 1000, 3)}
+
+
+def _dict_graph(lsas: List[Lsa]) -> Dict[str, Dict[str, int]]:
+  graph: Dict[str, Dict[str, int]] = {}
+  for lsa in lsas:
+    graph[lsa.header.advertising_router] = {
+        str(link["router_id"]): int(link.get("cost", 1)) for link in lsa.payload.get("links", [])
+    }
+  return graph
+
+
+def _dict_dijkstra(graph: Dict[str, Dict[str, int]], root: str) -> Tuple[Dict[str, int], Dict[str, str]]:
+  """以字符串为键、内层循环做双向检查的参考实现。"""
+  dist: Dict[str, int] = {root: 0}
+  first_hop: Dict[str, str] = {}
+  heap: List[Tuple[int, str]] = [(0, root)]
+  while heap:
+    cost, vertex = heapq.heappop(heap)
+    if cost > dist.get(vertex, cost):
+      continue
+    for neighbor, link_cost in graph.get(vertex, {}).items():
+      if vertex not in graph.get(neighbor, {}):
+        continue
+      new_cost = cost + link_cost
+      if new_cost < dist.get(neighbor, new_cost + 1):
+        dist[neighbor] = new_cost
+        first_hop[neighbor] = neighbor if vertex == root else first_hop[vertex]
+        heapq.heappush(heap, (new_cost, neighbor))
+  return dist, first_hop
+
+
+def _pack_all(lsas: List[Lsa]) -> Tuple[RouterIdTable, Dict[int, array]]:
+  ids = RouterIdTable()
+  links: Dict[int, array] = {}
+  for lsa in lsas:
+    links[ids.intern(lsa.header.advertising_router)] = pack_links(
+        ids,
+        ((str(link["router_id"]), int(link.get("cost", 1))) for link in lsa.payload.get("links", [])),
+    )
+  return ids, links
+
+
+def _bench_router(adjacency: Dict[int, Dict[int, int]], lsas: List[Lsa]) -> Router:
+  """构造以下标 0 为本机、每个邻居一个接口的 Router，并装入全部 LSA。"""
+  interfaces = []
+  for slot, (peer, cost) in enumerate(sorted(adjacency[0].items())):
+    interfaces.append({
+        "name": f"bench{slot}",
+        "ip": f"192.0.2.{slot * 4 + 1}/30",
+        "cost": cost,
+        "neighbors": [{"router_id": router_id(peer), "addr": f"192.0.2.{slot * 4 + 2}"}],
+    })
+  config = {
+      "defaults": {"area": AREA},
+      "routers": {router_id(0): {"loopback": f"{router_id(0)}/32", "interfaces": interfaces}},
+  }
+  router = Router(router_id(0), config, EventLoop(), dry_run=True)
+  router._load_interfaces()
+  for lsa in lsas:
+    router.lsdb.install(lsa)
+  return router
+
+
+def run(nodes: int, degree: int, repeat: int, seed: int) -> Dict[str, object]:
+  adjacency = build_topology(nodes, degree, seed)
+  links_total = sum(len(peers) for peers in adjacency.values())
+  wire = [_wire_copy(router_lsa(index, peers)) for index, peers in adjacency.items()]
+
+  def install_all() -> LinkStateDatabase:
+    lsdb = LinkStateDatabase()
+    for lsa in wire:
+      lsdb.install(lsa)
+    return lsdb
+
+  lsdb, lsdb_bytes = _retained(install_all)
+  stored = list(lsdb.snapshot().values())  # type: ignore[attr-defined]
+  dict_graph, dict_graph_bytes = _retained(lambda: _dict_graph(stored))
+  (ids, packed), packed_bytes = _retained(lambda: _pack_all(stored))
+  graph, csr_bytes = _retained(lambda: CsrGraph.build(len(ids), packed))
+  root = router_id(0)
+  root_index = ids.lookup(root)
+  assert root_index is not None
+
+  # 两种实现的结果必须一致，否则耗时对比没有意义。
+  (ref_dist, _), dict_result_bytes = _retained(lambda: _dict_dijkstra(dict_graph, root))
+  (dist, _), compact_result_bytes = _retained(lambda: shortest_paths(graph, root_index))
+  assert all(dist[ids.lookup(name)] == cost for name, cost in ref_dist.items())
+  timings = {
+      "dict_build": _timed(lambda: _dict_graph(stored), repeat),
+      "dict_dijkstra": _timed(lambda: _dict_dijkstra(dict_graph, root), repeat),
+      # 路由器只为变化的 LSA 重新打包链路；每次拓扑变化都需要重建 CSR。
+      "compact_pack": _timed(lambda: _pack_all(stored), repeat),
+      "compact_build": _timed(lambda: CsrGraph.build(len(ids), packed), repeat),
+      "compact_dijkstra": _timed(lambda: shortest_paths(graph, root_index), repeat),
+  }
+
+  router = _bench_router(adjacency, stored)
+  start = time.perf_counter()
+  router.run_spf()
+  cold = time.perf_counter() - start
+  routes = len(router.routes)
+
+  # 修改一条远端链路的代价，触发一次拓扑重算（仅该 LSA 被重新解析）。
+  far = nodes // 2
+  incremental: List[float] = []
+  for step in range(repeat):
+    peers = dict(adjacency[far])
+    peer = next(iter(peers))
+    peers[peer] = 1 + (peers[peer] + step) % 20
+    router.lsdb.install(router_lsa(far, peers, sequence=2 + step))
+    start = time.perf_counter()
+    router.run_spf()
+    incremental.append(time.perf_counter() - start)
+
+  # 同一条链路在两个代价之间来回切换，拓扑只在两种状态间交替。
+  peer = next(iter(adjacency[far]))
+  sequence = 2 + repeat
+  flap: Dict[str, List[float]] = {}
+  flap_routes: Dict[str, List[Dict[str, object]]] = {}
+  for label, cache_size in (("uncached", 0), ("cached", 8)):
+    router._spf_cache_size = cache_size
+    flap[label] = []
+    flap_routes[label] = []
+    for step in range(2 * repeat):
+      peers = dict(adjacency[far])
+      peers[peer] = 1 + (peers[peer] + step % 2) % 20
+      router.lsdb.install(router_lsa(far, peers, sequence=sequence))
+      sequence += 1
+      start = time.perf_counter()
+      router.run_spf()
+      flap[label].append(time.perf_counter() - start)
+      flap_routes[label].append(dict(router.routes))
+
+  return {
+      "nodes": nodes,
+      "links": links_total,
+      "lsdb": {
+          "bytes_total": lsdb_bytes,
+          "bytes_per_lsa": round(lsdb_bytes / nodes, 1),
+      },
+      "spf_state": {
+          "dict_graph_bytes": dict_graph_bytes,
+          "dict_result_bytes": dict_result_bytes,
+          "compact_links_bytes": packed_bytes,
+          "compact_csr_bytes": csr_bytes,
+          "compact_result_bytes": compact_result_bytes,
+      },
+      "timings": timings,
+      "router_spf": {
+          "routes": routes,
+          "cold_ms": round(cold * 1000, 3),
+          "incremental_median_ms": round(statistics.median(incremental) * 1000, 3),
+      },
+      "spf_cache": {
+          "flap_uncached_median_ms": round(statistics.median(flap["uncached"]) * 1000, 3),
+          "flap_cached_median_ms": round(statistics.median(flap["cached"]) * 1000, 3),
+          "hit_rate": round(router.metrics.get("spf.cache.hit_rate"), 4),
+          "entries": int(router.metrics.get("spf.cache.entries")),
+          "bytes": int(router.metrics.get("spf.cache.bytes")),
+          "equivalent": flap_routes["uncached"] == flap_routes["cached"],
+      },
+  }
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Measure LSDB memory and SPF time on a synthetic topology.")
+  parser.add_argument("--nodes", type=int, default=10000, help="Number of routers in the synthetic area")
+  parser.add_argument("--degree", type=int, default=4, help="Average number of links per router")
+  parser.add_argument("--repeat", type=int, default=5, help="Samples per timed step")
+  parser.add_argument("--seed", type=int, default=1, help="Topology RNG seed")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.WARNING)
+  result = run(args.nodes, max(2, args.degree), max(1, args.repeat), args.seed)
+  if args.json:
+    print(json.dumps(result, sort_keys=True))
+    return 0
+  lsdb = result["lsdb"]
+  state = result["spf_state"]
+  spf = result["router_spf"]
+  print(f"nodes {result['nodes']} links {result['links']}")
+  print(f"lsdb            {lsdb['bytes_total']} bytes ({lsdb['bytes_per_lsa']} bytes/LSA)")  # type: ignore[index]
+  print(f"dict state      graph={state['dict_graph_bytes']} result={state['dict_result_bytes']} bytes")  # type: ignore[index]
+  print(  # type: ignore[index]
+      f"compact state   links={state['compact_links_bytes']} csr={state['compact_csr_bytes']}"
+      f" result={state['compact_result_bytes']} bytes"
+  )
+  for name, timing in result["timings"].items():  # type: ignore[union-attr]
+    print(f"{name:16s} min={timing['min_ms']}ms median={timing['median_ms']}ms")
+  print(f"router run_spf  cold={spf['cold_ms']}ms incremental={spf['incremental_median_ms']}ms routes={spf['routes']}")  # type: ignore[index]
+  cache = result["spf_cache"]
+  print(  # type: ignore[index]
+      f"link flap       uncached={cache['flap_uncached_median_ms']}ms cached={cache['flap_cached_median_ms']}ms"
+      f" hit_rate={cache['hit_rate']} entries={cache['entries']} bytes={cache['bytes']}"
+      f" equivalent={cache['equivalent']}"
+  )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,305 @@
+"""
+单台路由器控制面的 LSA 风暴压测。
+
+用 :mod:`implementation.bench_spf` 的随机拓扑生成一个虚拟网络，被测
+:class:`Router` 为其中下标 0 的路由器，所有 LSU 都以它的第一个邻居的名义
+经 ``process_message`` 注入（不经过套接字与报文编解码）。先注入整个 LSDB
+并等待首轮 SPF 完成，然后在 ``duration`` 秒内按 ``rate`` 持续发送 Router LSA：
+
+- 每次更新随机选一台虚拟路由器，序列号加一并换上一个新的 /32 存根前缀，
+  按 ``cost_ratio`` 的比例同时改变它的一条链路代价（触发完整 SPF，其余为
+  仅前缀变化）；
+- 按 ``duplicate_ratio`` 的比例重发某台路由器上一次发出的实例（重复 LSA）。
+
+报告稳态下每秒安装的 LSA 数、每秒 SPF 次数，以及从注入到新前缀出现在
+``routes`` 中的时延分位数（同一台虚拟路由器的更新尚未生效又被新更新覆盖时，
+从较早的那次注入开始计时；检测粒度为 1 ms 的注入节拍）。``--json`` 输出一个
+键固定、按键排序的 JSON 对象，``schema`` 字段在格式变化时递增，便于回归比对。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.bench_storm [--nodes 2000] [--degree 4] [--rate 2000] [--duration 10]
+      [--duplicate-ratio 0.2] [--cost-ratio 0.5] [--per-lsu 1] [--seed 1] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import ipaddress
+import json
+import logging
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import message
+from .bench_spf import AREA, build_topology, router_id, router_lsa
+from .events import EventLoop
+from .lsdb import LinkStateDatabase, Lsa
+from .router import DEFAULT_OSPF_PORT, Router
+
+SCHEMA = 1
+CHURN_BASE = ipaddress.IPv4Address("100.64.0.0")
+
+
+class StormGenerator:
+  """虚拟网络一侧：生成并记录每台虚拟路由器最新的 Router LSA 实例。"""
+
+  def __init__(self, adjacency: Dict[int, Dict[int, int]], *, cost_ratio: float, duplicate_ratio: float, seed: int) -> None:
+    self.adjacency = {index: dict(peers) for index, peers in adjacency.items()}
+    self.cost_ratio = cost_ratio
+    self.duplicate_ratio = duplicate_ratio
+    self.rng = random.Random(seed)
+    # 用一份本地 LSDB 计算校验和，重复实例因此能走被测路由器的头部快速路径。
+    self.lsdb = LinkStateDatabase()
+    self.sequences: Dict[int, int] = {}
+    self.last_sent: Dict[int, Dict[str, object]] = {}
+    self.prefix_count = 0
+
+  def originate(self, index: int) -> Tuple[Dict[str, object], str]:
+    """生成 ``index`` 的下一个实例，返回 (LSU 中的 LSA 负载, 新存根前缀)。"""
+    sequence = self.sequences.get(index, 0x80000000) + 1
+    self.sequences[index] = sequence
+    prefix = f"{CHURN_BASE + self.prefix_count}/32"
+    self.prefix_count += 1
+    lsa = router_lsa(index, self.adjacency[index], sequence)
+    lsa.payload["networks"].append({"prefix": prefix, "metric": 1})  # type: ignore[union-attr]
+    return self._record(index, lsa), prefix
+
+  def next_update(self) -> Tuple[int, Dict[str, object], Optional[str]]:
+    """下一条要发送的 LSA：(虚拟路由器下标, 负载, 新前缀；重复实例为 None)。"""
+    if self.last_sent and self.rng.random() < self.duplicate_ratio:
+      index = self.rng.choice(list(self.last_sent))
+      return index, self.last_sent[index], None
+    index = self.rng.randrange(1, len(self.adjacency))
+    if self.rng.random() < self.cost_ratio and self.adjacency[index]:
+      peer = self.rng.choice(list(self.adjacency[index]))
+      self.adjacency[index][peer] = self.rng.randint(1, 20)
+    payload, prefix = self.originate(index)
+    return index, payload, prefix
+
+  def _record(self, index: int, lsa: Lsa) -> Dict[str, object]:
+    self.lsdb.install(lsa)
+    stored = self.lsdb.lookup(*lsa.fingerprint())
+    payload = LinkStateDatabase.to_message_payload(stored or lsa)
+    self.last_sent[index] = payload
+    return payload
+
+
+def _target_router(adjacency: Dict[int, Dict[int, int]], loop: EventLoop) -> Tuple[Router, str, str]:
+  """构造下标 0 的被测路由器，返回 (路由器, 注入方 Router ID, 注入方接口地址)。"""
+  interfaces = []
+  for slot, (peer, cost) in enumerate(sorted(adjacency[0].items())):
+    interfaces.append({
+        "name": f"storm{slot}",
+        "ip": f"192.0.2.{slot * 4 + 1}/30",
+        "cost": cost,
+        "neighbors": [{"router_id": router_id(peer), "addr": f"192.0.2.{slot * 4 + 2}"}],
+    })
+  config = {
+      "defaults": {"area": AREA},
+      "routers": {router_id(0): {"loopback": f"{router_id(0)}/32", "interfaces": interfaces}},
+  }
+  router = Router(router_id(0), config, loop, dry_run=True)
+  router._load_interfaces()
+  router.lsdb.install(router_lsa(0, adjacency[0]))
+  first = interfaces[0]["neighbors"][0]  # type: ignore[index]
+  return router, str(first["router_id"]), str(first["addr"])
+
+
+def _percentile(samples: List[float], fraction: float) -> Optional[float]:
+  if not samples:
+    return None
+  ordered = sorted(samples)
+  return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+  return None if value is None else round(value * 1000, 3)
+
+
+def run(
+    nodes: int,
+    degree: int,
+    rate: float,
+    duration: float,
+    *,
+    duplicate_ratio: float = 0.2,
+    cost_ratio: float = 0.5,
+    per_lsu: int = 1,
+    seed: int = 1,
+    tick: float = 0.001,
+    drain: float = 5.0,
+) -> Dict[str, object]:
+  adjacency = build_topology(nodes, degree, seed)
+  loop = EventLoop()
+  router, injector, injector_addr = _target_router(adjacency, loop)
+  generator = StormGenerator(adjacency, cost_ratio=cost_ratio, duplicate_ratio=duplicate_ratio, seed=seed)
+
+  spf_runs = 0
+  run_spf = router.run_spf
+
+  def counted_spf() -> None:
+    nonlocal spf_runs
+    spf_runs += 1
+    run_spf()
+
+  router.run_spf = counted_spf  # type: ignore[method-assign]
+
+  def inject(lsas: List[Dict[str, object]]) -> None:
+    msg = message.Message(
+        msg_type=message.MessageType.LINK_STATE_UPDATE,
+        router_id=injector,
+        area_id=AREA,
+        payload={"lsas": lsas},
+    )
+    router.process_message(msg, src=(injector_addr, DEFAULT_OSPF_PORT))
+
+  def run_until(done, timeout: float) -> Optional[float]:  # type: ignore[no-untyped-def]
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+      loop._run_once()
+      if done():
+        return time.monotonic() - started
+    return None
+
+  # 初始 LSDB：每个 LSU 携带 100 条 LSA。
+  started = time.monotonic()
+  initial = [generator.originate(index) for index in range(1, nodes)]
+  for offset in range(0, len(initial), 100):
+    inject([payload for payload, _ in initial[offset:offset + 100]])
+  initial_prefixes = [prefix for _, prefix in initial]
+  loaded = run_until(lambda: all(prefix in router.routes for prefix in initial_prefixes), 60.0 + nodes / 100)
+  initial_load = None if loaded is None else time.monotonic() - started
+
+  # 风暴中的全部更新预先生成，计时只包含被测路由器的处理。每个节拍最多注入
+  # 10 ms 的配额，跟不上时实际注入速率低于 rate，而不是让单个节拍占满事件循环。
+  updates = [generator.next_update() for _ in range(int(rate * duration))]
+  burst = max(per_lsu, int(rate * 0.01))
+
+  # 风暴阶段：pending 记录每台虚拟路由器尚未在 routes 中生效的 (前缀, 最早注入时间)。
+  pending: Dict[int, Tuple[str, float]] = {}
+  latencies: List[float] = []
+  offered = duplicates = 0
+  installed_before = router.metrics.get("lsu.lsas_installed")
+  spf_before = spf_runs
+  fib_seen = router.metrics.get("fib.installs")
+  storm_start = time.monotonic()
+  storm_end = storm_start + duration
+
+  def check_routes() -> None:
+    nonlocal fib_seen
+    installs = router.metrics.get("fib.installs")
+    if installs == fib_seen:
+      return
+    fib_seen = installs
+    now = time.monotonic()
+    for index, (prefix, injected) in list(pending.items()):
+      if prefix in router.routes:
+        latencies.append(now - injected)
+        del pending[index]
+
+  def on_tick() -> None:
+    nonlocal offered, duplicates
+    check_routes()
+    now = time.monotonic()
+    if now >= storm_end:
+      return
+    due = min(int(rate * (now - storm_start)), len(updates)) - offered
+    batch: List[Dict[str, object]] = []
+    for _ in range(max(0, min(due, burst))):
+      index, payload, prefix = updates[offered]
+      offered += 1
+      if prefix is None:
+        duplicates += 1
+      else:
+        pending[index] = (prefix, pending[index][1] if index in pending else now)
+      batch.append(payload)
+      if len(batch) >= per_lsu:
+        inject(batch)
+        batch = []
+    if batch:
+      inject(batch)
+
+  task = loop.schedule(tick, on_tick, repeat=True)
+  run_until(lambda: time.monotonic() >= storm_end, duration + 1.0)
+  storm_elapsed = time.monotonic() - storm_start
+  installed = router.metrics.get("lsu.lsas_installed") - installed_before
+  spf_count = spf_runs - spf_before
+  run_until(lambda: not pending, drain)
+  loop.cancel(task)
+  router.shutdown()
+
+  return {
+      "schema": SCHEMA,
+      "nodes": nodes,
+      "degree": degree,
+      "rate": rate,
+      "duration_s": duration,
+      "duplicate_ratio": duplicate_ratio,
+      "cost_ratio": cost_ratio,
+      "per_lsu": per_lsu,
+      "seed": seed,
+      "initial_load_s": None if initial_load is None else round(initial_load, 3),
+      "offered_lsas": offered,
+      "offered_lsas_per_s": round(offered / storm_elapsed, 1),
+      "duplicate_lsas": duplicates,
+      "lsas_installed": int(installed),
+      "lsas_installed_per_s": round(installed / storm_elapsed, 1),
+      "spf_runs": spf_count,
+      "spf_runs_per_s": round(spf_count / storm_elapsed, 2),
+      "latency_samples": len(latencies),
+      "latency_p50_ms": _ms(_percentile(latencies, 0.5)),
+      "latency_p99_ms": _ms(_percentile(latencies, 0.99)),
+      "latency_max_ms": _ms(max(latencies, default=None)),
+      "unresolved_updates": len(pending),
+  }
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Drive one router with a synthetic LSA storm and measure install/SPF throughput.")
+  parser.add_argument("--nodes", type=int, default=2000, help="Routers in the virtual topology")
+  parser.add_argument("--degree", type=int, default=4, help="Average router degree")
+  parser.add_argument("--rate", type=float, default=2000.0, help="LSAs offered per second")
+  parser.add_argument("--duration", type=float, default=10.0, help="Storm length in seconds")
+  parser.add_argument("--duplicate-ratio", type=float, default=0.2, help="Fraction of offered LSAs that repeat the last instance")
+  parser.add_argument("--cost-ratio", type=float, default=0.5, help="Fraction of updates that also change a link cost")
+  parser.add_argument("--per-lsu", type=int, default=1, help="LSAs carried in each injected LSU")
+  parser.add_argument("--seed", type=int, default=1, help="Topology and churn RNG seed")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.ERROR)
+  result = run(
+      max(3, args.nodes),
+      max(2, args.degree),
+      max(1.0, args.rate),
+      max(0.1, args.duration),
+      duplicate_ratio=min(1.0, max(0.0, args.duplicate_ratio)),
+      cost_ratio=min(1.0, max(0.0, args.cost_ratio)),
+      per_lsu=max(1, args.per_lsu),
+      seed=args.seed,
+  )
+  if args.json:
+    print(json.dumps(result, sort_keys=True))
+    return 0
+  print(
+      f"nodes={result['nodes']} degree={result['degree']} rate={result['rate']}/s"
+      f" duplicates={result['duplicate_ratio']} cost_changes={result['cost_ratio']}"
+      f" initial_load={result['initial_load_s']}s"
+  )
+  print(
+      f"offered={result['offered_lsas']} ({result['offered_lsas_per_s']}/s) installed={result['lsas_installed']}"
+      f" ({result['lsas_installed_per_s']}/s) spf={result['spf_runs']} ({result['spf_runs_per_s']}/s)"
+  )
+  print(
+      f"install-to-route p50={result['latency_p50_ms']}ms p99={result['latency_p99_ms']}ms"
+      f" max={result['latency_max_ms']}ms samples={result['latency_samples']}"
+      f" unresolved={result['unresolved_updates']}"
+  )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
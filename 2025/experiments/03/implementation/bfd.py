@@ -0,0 +1,246 @@
+"""
+BFD 风格的快速故障检测。
+
+每个 Full 邻接在双方通过 Hello ``options.bfd`` 声明支持后建立一个探测会话，
+复用路由器的 UDP 套接字与事件循环。探测报文是固定 20 字节的二进制结构
+（首字节 ``0xBF``，与 JSON 协议报文天然可区分）：
+
+  ``!BBBxIII`` = magic、会话状态、检测倍数、填充、发送方 Router ID、
+  本端判别符（my discriminator）、对端判别符（your discriminator），
+  其后 ``!I`` 为本端期望的发送间隔（毫秒）。
+
+会话状态机按 RFC 5880 简化为 Down → Init → Up 三态。所有会话共用一个
+周期定时器：每次触发时为到期的会话发送预先编码好的报文，并检查处于
+Up 状态的会话是否在 ``detect_mult × 协商间隔`` 内未收到对端报文，超时即
+通过回调通知路由器立刻拆除邻接。
+"""
+
+from __future__ import annotations
+
+import ipaddress
+import logging
+import random
+import struct
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, Optional, Tuple
+
+from .events import EventLoop
+from .metrics import Metrics
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = 0xBF
+DEFAULT_MULTIPLIER = 3
+_PACKET = struct.Struct("!BBBxIIII")
+
+
+class SessionState(IntEnum):
+  DOWN = 1
+  INIT = 2
+  UP = 3
+
+
+@dataclass
+class BfdSession:
+  interface: str
+  neighbor: str
+  local_discr: int
+  tx_interval: float
+  state: SessionState = SessionState.DOWN
+  remote_discr: int = 0
+  remote_interval: float = 0.0
+  remote_mult: int = DEFAULT_MULTIPLIER
+  last_rx: float = 0.0
+  next_tx: float = 0.0
+  packet: bytes = b""
+
+  @property
+  def interval(self) -> float:
+    """协商后的发送间隔：双方期望值中较慢的一个。"""
+    return max(self.tx_interval, self.remote_interval)
+
+  @property
+  def detect_time(self) -> float:
+    return self.remote_mult * max(self.tx_interval, self.remote_interval or self.tx_interval)
+
+
+def encode_packet(
+    state: SessionState,
+    detect_mult: int,
+    router_id: str,
+    my_discr: int,
+    your_discr: int,
+    interval: float,
+) -> bytes:
+  return _PACKET.pack(
+      MAGIC,
+      int(state),
+      detect_mult,
+      int(ipaddress.IPv4Address(router_id)),
+      my_discr,
+      your_discr,
+      int(interval * 1000),
+  )
+
+
+def decode_packet(data: bytes) -> Optional[Tuple[SessionState, int, str, int, int, float]]:
+  """解析探测报文，格式不符时返回 None。"""
+  if len(data) != _PACKET.size or data[0] != MAGIC:
+    return None
+  _, state, mult, rid, my_discr, your_discr, interval_ms = _PACKET.unpack(data)
+  try:
+    session_state = SessionState(state)
+  except ValueError:
+    return None
+  return session_state, mult, str(ipaddress.IPv4Address(rid)), my_discr, your_discr, interval_ms / 1000.0
+
+
+def is_bfd_packet(data: bytes) -> bool:
+  return bool(data) and data[0] == MAGIC
+
+
+class BfdManager:
+  """
+  管理所有探测会话，并以单个共享定时器驱动收发与超时检测。
+
+  ``send(interface, neighbor, data)`` 负责实际发送；``on_down(interface, neighbor)``
+  在 Up 会话检测到故障或对端宣告 Down 时调用。
+  """
+
+  def __init__(
+      self,
+      router_id: str,
+      loop: EventLoop,
+      *,
+      interval: float,
+      multiplier: int = DEFAULT_MULTIPLIER,
+      send: Callable[[str, str, bytes], None],
+      on_down: Callable[[str, str], None],
+      metrics: Optional[Metrics] = None,
+  ) -> None:
+    self.router_id = router_id
+    self.loop = loop
+    self.interval = interval
+    self.multiplier = multiplier
+    self._send = send
+    self._on_down = on_down
+    self.metrics = metrics or Metrics()
+    self._sessions: Dict[Tuple[str, str], BfdSession] = {}
+    self._by_discr: Dict[int, BfdSession] = {}
+    self._next_discr = 1
+    self._timer = None
+
+  @property
+  def sessions(self) -> Dict[Tuple[str, str], BfdSession]:
+    return self._sessions
+
+  def start(self, interface: str, neighbor: str, remote_interval: float = 0.0) -> BfdSession:
+    """为 ``interface`` 上的 ``neighbor`` 建立会话；已存在时直接返回。"""
+    key = (interface, neighbor)
+    session = self._sessions.get(key)
+    if session is not None:
+      return session
+    session = BfdSession(
+        interface=interface,
+        neighbor=neighbor,
+        local_discr=self._next_discr,
+        tx_interval=self.interval,
+        remote_interval=remote_interval,
+    )
+    self._next_discr += 1
+    self._sessions[key] = session
+    self._by_discr[session.local_discr] = session
+    self._encode(session)
+    self.metrics.set("bfd.sessions", len(self._sessions))
+    if self._timer is None:
+      self._timer = self.loop.schedule(self.interval, self._tick, repeat=True)
+    LOGGER.debug("建立 BFD 会话 %s/%s discr=%d", interface, neighbor, session.local_discr)
+    return session
+
+  def stop(self, interface: str, neighbor: str) -> None:
+    session = self._sessions.pop((interface, neighbor), None)
+    if session is None:
+      return
+    self._by_discr.pop(session.local_discr, None)
+    self.metrics.set("bfd.sessions", len(self._sessions))
+    if not self._sessions and self._timer is not None:
+      self.loop.cancel(self._timer)
+      self._timer = None
+
+  def close(self) -> None:
+    for key in list(self._sessions):
+      self.stop(*key)
+
+  # --------------------------------------------------------------- receive
+  def handle_packet(self, data: bytes) -> None:
+    decoded = decode_packet(data)
+    if decoded is None:
+      self.metrics.incr("bfd.rx_invalid")
+      return
+    state, mult, sender, my_discr, your_discr, interval = decoded
+    session = self._by_discr.get(your_discr) if your_discr else None
+    if session is None:
+      session = next(
+          (s for s in self._sessions.values() if s.neighbor == sender and s.remote_discr in (0, my_discr)),
+          None,
+      )
+    if session is None or session.neighbor != sender:
+      self.metrics.incr("bfd.rx_unmatched")
+      return
+    self.metrics.incr("bfd.rx")
+    now = time.time()
+    session.last_rx = now
+    changed = session.remote_discr != my_discr or session.remote_interval != interval or session.remote_mult != mult
+    session.remote_discr = my_discr
+    session.remote_interval = interval
+    session.remote_mult = mult or DEFAULT_MULTIPLIER
+
+    previous = session.state
+    if state == SessionState.DOWN:
+      if session.state == SessionState.UP:
+        self._session_down(session, "对端宣告 Down")
+        return
+      if session.state == SessionState.DOWN:
+        session.state = SessionState.INIT
+    elif state in (SessionState.INIT, SessionState.UP):
+      if session.state in (SessionState.DOWN, SessionState.INIT):
+        session.state = SessionState.UP
+    if session.state != previous:
+      LOGGER.info("BFD 会话 %s/%s %s -> %s", session.interface, session.neighbor, previous.name, session.state.name)
+      changed = True
+      # 状态变化时立即应答，缩短三次握手时间。
+      session.next_tx = now
+    if changed:
+      self._encode(session)
+
+  # ------------------------------------------------------------------ timer
+  def _tick(self) -> None:
+    now = time.time()
+    for session in list(self._sessions.values()):
+      if session.state == SessionState.UP and now - session.last_rx > session.detect_time:
+        self._session_down(session, "探测超时")
+        continue
+      if now >= session.next_tx:
+        self._send(session.interface, session.neighbor, session.packet)
+        self.metrics.incr("bfd.tx")
+        # RFC 5880 建议发送间隔抖动到 75%–100%，避免多个会话同步发送。
+        session.next_tx = now + session.interval * random.uniform(0.75, 1.0)
+
+  def _session_down(self, session: BfdSession, reason: str) -> None:
+    LOGGER.warning("BFD 会话 %s/%s Down：%s", session.interface, session.neighbor, reason)
+    self.metrics.incr("bfd.down_events")
+    self.stop(session.interface, session.neighbor)
+    self._on_down(session.interface, session.neighbor)
+
+  def _encode(self, session: BfdSession) -> None:
+    # 报文只在会话参数变化时重新编码，周期发送直接复用字节串。
+    session.packet = encode_packet(
+        session.state,
+        self.multiplier,
+        self.router_id,
+        session.local_discr,
+        session.remote_discr,
+        session.tx_interval,
+    )
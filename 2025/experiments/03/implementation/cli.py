@@ -4,13 +4,17 @@
 
 from __future__ import annotations
 
+import functools
 import logging
 import queue
 import threading
-from typing import Iterable
+import time
+from typing import Dict, Iterable, List, Optional
 
 LOGGER = logging.getLogger(__name__)
 
+_QUERY_TIMEOUT = 2.0
+
 
 class CliShell:
   def __init__(self, router: "Router") -> None:
@@ -21,6 +25,7 @@ class CliShell:
     self._commands = {
         "show": self._cmd_show,
         "send": self._cmd_send,
+        "profile": self._cmd_profile,
         "quit": self._cmd_quit,
         "exit": self._cmd_quit,
         "help": self._cmd_help,
@@ -54,15 +59,21 @@ class CliShell:
   def _cmd_show(self, args: Iterable[str]) -> None:
     sub = list(args)
     if not sub:
-      LOGGER.info("用法: show <neighbors|lsdb|routes>")
+      LOGGER.info("用法: show <neighbors|lsdb|routes|fib|tx|stats>")
       return
     topic = sub[0]
     if topic == "neighbors":
       self._show_neighbors()
     elif topic == "lsdb":
-      self._show_lsdb()
+      self._show_lsdb(sub[1:])
     elif topic == "routes":
       self._show_routes()
+    elif topic == "fib":
+      self._show_fib()
+    elif topic == "tx":
+      self._show_tx()
+    elif topic == "stats":
+      self._show_stats()
     else:
       LOGGER.warning("不支持的 show 子命令: %s", topic)
 
@@ -76,19 +87,57 @@ class CliShell:
     if iface_state is None:
       LOGGER.warning("接口不存在: %s", iface)
       return
+    # 交给事件循环线程执行，避免与协议处理并发访问路由器状态。
+    self.router.loop.call_soon_threadsafe(self._send_hello, iface_state)
+
+  def _send_hello(self, iface_state: "InterfaceState") -> None:
     try:
       self.router.send_hello(iface_state)
     except Exception:  # pragma: no cover - diagnostics
       LOGGER.exception("发送 Hello 失败")
     else:
-      LOGGER.info("%s 已发送 Hello", iface)
+      LOGGER.info("%s 已发送 Hello", iface_state.config.name)
+
+  def _cmd_profile(self, args: Iterable[str]) -> None:
+    sub = list(args)
+    action = sub[0] if sub else "show"
+    loop = self.router.loop
+    try:
+      if action == "on":
+        threshold = float(sub[1]) / 1000 if len(sub) > 1 else 0.1
+        loop.call_threadsafe(loop.enable_profiling, threshold).result(timeout=_QUERY_TIMEOUT)
+        LOGGER.info("已开启事件循环剖析，慢回调阈值 %.1f ms", threshold * 1000)
+      elif action == "off":
+        loop.call_threadsafe(loop.disable_profiling).result(timeout=_QUERY_TIMEOUT)
+        LOGGER.info("已关闭事件循环剖析")
+      elif action == "reset":
+        loop.call_threadsafe(self._reset_profile).result(timeout=_QUERY_TIMEOUT)
+      elif action == "show":
+        limit = int(sub[1]) if len(sub) > 1 else 10
+        report = loop.call_threadsafe(self._profile_report, limit).result(timeout=_QUERY_TIMEOUT)
+        self._show_profile(report)
+      else:
+        LOGGER.info("用法: profile on [slow-ms] | off | show [n] | reset")
+    except ValueError:
+      LOGGER.info("用法: profile on [slow-ms] | off | show [n] | reset")
+
+  def _profile_report(self, limit: int) -> Optional[Dict[str, object]]:
+    profiler = self.router.loop.profiler
+    return profiler.report(limit) if profiler is not None else None
+
+  def _reset_profile(self) -> None:
+    if self.router.loop.profiler is not None:
+      self.router.loop.profiler.reset()
 
   def _cmd_quit(self, _: Iterable[str]) -> None:
     LOGGER.info("退出 CLI")
     self.stop()
 
   def _cmd_help(self, _: Iterable[str]) -> None:
-    LOGGER.info("commands: show neighbors|lsdb|routes, send hello <iface>, quit/exit")
+    LOGGER.info(
+        "commands: show neighbors|lsdb [adv <rid>|prefix <p>]|routes|fib|tx|stats, send hello <iface>,"
+        " profile on [ms]|off|show [n]|reset, quit/exit"
+    )
 
   # ------------------------------------------------------------------- views
   def _show_neighbors(self) -> None:
@@ -104,19 +153,35 @@ class CliShell:
       last = entry.get("last_hello", "?")
       LOGGER.info("%s neighbor=%s state=%s last=%.1f", iface, rid, state, last)
 
-  def _show_lsdb(self) -> None:
-    lsdb = self.router.get_lsdb()
+  def _show_lsdb(self, args: List[str]) -> None:
+    if not args:
+      lsdb = self.router.get_lsdb()
+    elif len(args) == 2 and args[0] in ("adv", "prefix"):
+      # 过滤查询依赖事件循环线程维护的索引，交由循环线程执行。
+      name = "adv_router" if args[0] == "adv" else "prefix"
+      future = self.router.loop.call_threadsafe(functools.partial(self.router.find_lsdb, **{name: args[1]}))
+      try:
+        lsdb = future.result(timeout=_QUERY_TIMEOUT)
+      except ValueError as exc:
+        LOGGER.warning("%s", exc)
+        return
+    else:
+      LOGGER.info("用法: show lsdb [adv <router-id> | prefix <prefix>]")
+      return
     if not lsdb:
-      LOGGER.info("LSDB 为空")
+      LOGGER.info("LSDB 为空" if not args else "没有匹配的 LSA")
       return
+    now = time.time()
     for key in sorted(lsdb):
       entry = lsdb[key]
+      # 快照中的 age 是条目渲染时的值，按经过的时间补齐。
+      age = int(entry.get("age", 0) + now - entry.get("as_of", now))
       LOGGER.info(
           "%s adv=%s seq=%s age=%s payload=%r",
           key,
           entry.get("adv_router"),
           entry.get("seq"),
-          entry.get("age"),
+          age,
           entry.get("payload"),
       )
 
@@ -128,16 +193,100 @@ class CliShell:
     for prefix in sorted(routes):
       entry = routes[prefix]
       LOGGER.info(
-          "%s -> next-hop %s via %s cost %s",
+          "%s -> next-hop %s via %s cost %s%s",
           prefix,
           entry.get("next_hop", "-"),
           entry.get("interface", "-"),
           entry.get("cost", "?"),
+          " (lfa)" if entry.get("protection") == "lfa" else "",
+      )
+
+  def _show_fib(self) -> None:
+    fib = self.router.get_fib()
+    if not fib:
+      LOGGER.info("转发表为空")
+      return
+    for prefix in sorted(fib):
+      entry = fib[prefix]
+      LOGGER.info(
+          "%s -> next-hop %s via %s%s",
+          prefix,
+          entry.get("next_hop") or "-",
+          entry.get("interface") or "-",
+          f" ({entry['aggregate']})" if entry.get("aggregate") else "",
+      )
+    stats = self._query_stats()
+    LOGGER.info(
+        "转发表 %d 条，路由 %d 条，上次生成耗时 %.3f ms",
+        len(fib),
+        int(stats.get("fib.routes", 0)),
+        stats.get("fib.install_s", 0.0) * 1000,
+    )
+
+  def _show_tx(self) -> None:
+    # 发送队列只在事件循环线程中修改，交由循环线程读取。
+    queues = self.router.loop.call_threadsafe(self.router.transmit_stats).result(timeout=_QUERY_TIMEOUT)
+    if not queues:
+      LOGGER.info("暂无发送队列")
+      return
+    for name in sorted(queues):
+      entry = queues[name]
+      LOGGER.info(
+          "%s queued=%d high=%d sent=%d dropped=%d retries=%d errors=%d",
+          name,
+          entry["queued"],
+          entry["high_water"],
+          entry["sent"],
+          entry["dropped"],
+          entry["retries"],
+          entry["errors"],
+      )
+
+  def _show_profile(self, report: Optional[Dict[str, object]]) -> None:
+    if report is None:
+      LOGGER.info("事件循环剖析未开启，使用 profile on 开启")
+      return
+    for row in report["callbacks"]:  # type: ignore[union-attr]
+      LOGGER.info(
+          "%-48s calls=%d total=%.1fms mean=%.3fms p99<=%.3fms max=%.3fms",
+          row["name"],
+          row["count"],
+          row["total_s"] * 1000,
+          row["mean_s"] * 1000,
+          row["p99_s"] * 1000,
+          row["max_s"] * 1000,
+      )
+    for name in ("lateness", "select_wait"):
+      summary = report[name]
+      LOGGER.info(
+          "%s count=%d p50<=%.3fms p99<=%.3fms max=%.3fms",
+          name,
+          summary["count"],  # type: ignore[index]
+          summary["p50_s"] * 1000,  # type: ignore[index]
+          summary["p99_s"] * 1000,  # type: ignore[index]
+          summary["max_s"] * 1000,  # type: ignore[index]
       )
+    LOGGER.info("慢回调 %d 次（阈值 %.1f ms）", report["slow_callbacks"], report["slow_threshold_s"] * 1000)  # type: ignore[operator]
+
+  def _query_stats(self) -> Dict[str, float]:
+    # 计数器由事件循环线程更新，交由循环线程读取一致的快照。
+    return self.router.loop.call_threadsafe(self.router.get_stats).result(timeout=_QUERY_TIMEOUT)
+
+  def _show_stats(self) -> None:
+    stats = self._query_stats()
+    if not stats:
+      LOGGER.info("暂无统计数据")
+      return
+    for name in sorted(stats):
+      value = stats[name]
+      if isinstance(value, float) and not value.is_integer():
+        LOGGER.info("%s = %.4f", name, value)
+      else:
+        LOGGER.info("%s = %d", name, value)
 
 
 # Avoid circular import
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
-  from .router import Router
+  from .router import InterfaceState, Router
@@ -0,0 +1,313 @@
+"""
+SPF 使用的紧凑内部表示。
+
+LSA 负载中的 Router ID 与前缀是字符串，直接在 Dijkstra 内层循环中使用会带来
+大量哈希与比较开销。这里在 LSA 变化时一次性完成转换：
+
+- :class:`RouterIdTable` 将 Router ID 驻留为稠密整数下标，并保存其 32 位数值；
+- 前缀表示为 ``(网络地址整数, 前缀长度)`` 二元组，仅在生成路由视图时格式化；
+- 广播网段由 Network LSA 描述，在图中作为伪节点出现（名称见 :func:`network_vertex`）；
+- 每台路由器的链路保存为 ``array('I')``，交错存放 ``邻居下标, 代价``；
+- :class:`CsrGraph` 将所有链路压缩为 CSR（offsets/targets/costs 三个数组），
+  :func:`shortest_paths` 在其上运行 Dijkstra，距离与首跳同样以数组返回；
+- CSR 图可经 :meth:`CsrGraph.pack` 序列化为原始字节，由子进程中的
+  :func:`shortest_paths_packed` 与 :func:`loop_free_alternates_packed` 计算，
+  避免大规模 SPF 阻塞事件循环。
+"""
+
+from __future__ import annotations
+
+import functools
+import socket
+import struct
+from array import array
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from typing import AbstractSet, Dict, Iterable, List, Optional, Set, Tuple
+
+Prefix = Tuple[int, int]
+PackedGraph = Tuple[bytes, bytes, bytes]
+
+# 不可达距离的哨兵值；使用整数数组保持代价为 int。
+UNREACHABLE = 1 << 62
+NO_HOP = -1
+
+_NETWORK_VERTEX = "network:"
+
+
+def router_id_value(router_id: str) -> int:
+  """点分十进制 Router ID 的 32 位数值。"""
+  return struct.unpack("!I", socket.inet_aton(router_id))[0]
+
+
+def network_vertex(lsa_id: str) -> str:
+  """以 DR 接口地址 ``lsa_id`` 标识的广播网段伪节点名称，与 Router ID 不会冲突。"""
+  return _NETWORK_VERTEX + lsa_id
+
+
+def is_network_vertex(name: str) -> bool:
+  return name.startswith(_NETWORK_VERTEX)
+
+
+@functools.lru_cache(maxsize=65536)
+def parse_prefix(prefix: str) -> Prefix:
+  """将 ``a.b.c.d/len`` 解析为 ``(网络地址, 前缀长度)``，主机位被清零。"""
+  address, _, length_text = prefix.partition("/")
+  length = int(length_text) if length_text else 32
+  if not 0 <= length <= 32:
+    raise ValueError(f"invalid prefix length in {prefix!r}")
+  value = struct.unpack("!I", socket.inet_aton(address))[0]
+  mask = (0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF
+  return value & mask, length
+
+
+@functools.lru_cache(maxsize=65536)
+def format_prefix(prefix: Prefix) -> str:
+  network, length = prefix
+  return f"{socket.inet_ntoa(struct.pack('!I', network))}/{length}"
+
+
+class RouterIdTable:
+  """
+  Router ID 字符串与稠密整数下标之间的驻留表。下标一经分配不再变化。
+
+  广播网段伪节点同样在此驻留，其下标记录在 ``transit`` 中；数值取 DR 接口地址。
+  """
+
+  __slots__ = ("_index", "_names", "values", "transit")
+
+  def __init__(self) -> None:
+    self._index: Dict[str, int] = {}
+    self._names: List[str] = []
+    self.values = array("I")
+    self.transit: Set[int] = set()
+
+  def intern(self, router_id: str) -> int:
+    index = self._index.get(router_id)
+    if index is None:
+      index = len(self._names)
+      self._index[router_id] = index
+      self._names.append(router_id)
+      if is_network_vertex(router_id):
+        self.transit.add(index)
+        self.values.append(router_id_value(router_id[len(_NETWORK_VERTEX):]))
+      else:
+        self.values.append(router_id_value(router_id))
+    return index
+
+  def lookup(self, router_id: Optional[str]) -> Optional[int]:
+    if router_id is None:
+      return None
+    return self._index.get(router_id)
+
+  def name(self, index: int) -> str:
+    return self._names[index]
+
+  def __len__(self) -> int:
+    return len(self._names)
+
+
+def pack_links(table: RouterIdTable, links: Iterable[Tuple[str, int]]) -> array:
+  """
+  将 ``(邻居 Router ID, 代价)`` 序列打包为交错数组；同一邻居只保留最小代价，
+  按邻居下标排序，便于直接比较两次的链路是否相同。
+  """
+  best: Dict[int, int] = {}
+  for router_id, cost in links:
+    index = table.intern(router_id)
+    if index not in best or cost < best[index]:
+      best[index] = cost
+  packed = array("I")
+  for index in sorted(best):
+    packed.append(index)
+    packed.append(best[index])
+  return packed
+
+
+def link_cost(row: Optional[array], target: int) -> Optional[int]:
+  """在交错链路数组中查找到 ``target`` 的代价。"""
+  if row is None:
+    return None
+  for i in range(0, len(row), 2):
+    if row[i] == target:
+      return row[i + 1]
+  return None
+
+
+def drop_links(row: array, targets: set) -> array:
+  """返回去掉指向 ``targets`` 的链路后的新数组。"""
+  kept = array("I")
+  for i in range(0, len(row), 2):
+    if row[i] not in targets:
+      kept.append(row[i])
+      kept.append(row[i + 1])
+  return kept
+
+
+@dataclass(slots=True)
+class CsrGraph:
+  offsets: array
+  targets: array
+  costs: array
+
+  @property
+  def size(self) -> int:
+    return len(self.offsets) - 1
+
+  @classmethod
+  def build(cls, size: int, links: Dict[int, array]) -> "CsrGraph":
+    """
+    由各路由器的链路数组构建 CSR 图。只保留两端都通告的链路，
+    使 Dijkstra 内层循环无需再做双向检查。
+    """
+    # 有向边编码为 ``起点 << 32 | 终点``，一次集合查找即可判断反向链路是否存在。
+    edges = set()
+    for vertex, row in links.items():
+      edges.update((vertex << 32) | target for target in row[0::2])
+    offsets = array("I", [0]) * (size + 1)
+    targets = array("I")
+    costs = array("I")
+    for vertex in range(size):
+      row = links.get(vertex)
+      if row:
+        for neighbor, cost in zip(row[0::2], row[1::2]):
+          if (neighbor << 32) | vertex in edges:
+            targets.append(neighbor)
+            costs.append(cost)
+      offsets[vertex + 1] = len(targets)
+    return cls(offsets, targets, costs)
+
+  def pack(self) -> PackedGraph:
+    """三个数组的原始字节，跨进程传输时无需逐元素序列化。"""
+    return self.offsets.tobytes(), self.targets.tobytes(), self.costs.tobytes()
+
+  @classmethod
+  def unpack(cls, packed: PackedGraph) -> "CsrGraph":
+    arrays = []
+    for raw in packed:
+      values = array("I")
+      values.frombytes(raw)
+      arrays.append(values)
+    return cls(*arrays)
+
+  def neighbors(self, vertex: int) -> Iterable[Tuple[int, int]]:
+    if vertex >= self.size:
+      return ()
+    start, end = self.offsets[vertex], self.offsets[vertex + 1]
+    return zip(self.targets[start:end], self.costs[start:end])
+
+
+def changed_vertices(old: Tuple[array, array], new: Tuple[array, array]) -> List[int]:
+  """
+  比较两次 :func:`shortest_paths` 的结果，返回距离或首跳发生变化的顶点下标。
+  新增的顶点（下标超出旧数组）总是视为变化。
+  """
+  old_dist, old_hop = old
+  new_dist, new_hop = new
+  moved = [
+      index
+      for index, (a, b, c, d) in enumerate(zip(old_dist, new_dist, old_hop, new_hop))
+      if a != b or c != d
+  ]
+  moved.extend(range(len(old_dist), len(new_dist)))
+  return moved
+
+
+def shortest_paths(graph: CsrGraph, root: int, transit: AbstractSet[int] = frozenset()) -> Tuple[array, array]:
+  """
+  以 ``root`` 为根运行 Dijkstra，返回按下标索引的距离数组与首跳数组。
+
+  不可达顶点的距离为 :data:`UNREACHABLE`，无首跳时为 :data:`NO_HOP`。
+  ``transit`` 中的伪节点若与根直连，经由它到达的路由器以自身为首跳
+  （即同一广播网段上的邻居），而不是以伪节点为首跳。
+  """
+  size = graph.size
+  dist = array("q", [UNREACHABLE]) * size
+  first_hop = array("q", [NO_HOP]) * size
+  if root >= size:
+    return dist, first_hop
+  offsets, targets, costs = graph.offsets, graph.targets, graph.costs
+  dist[root] = 0
+  heap: List[Tuple[int, int]] = [(0, root)]
+  while heap:
+    cost, vertex = heappop(heap)
+    if cost > dist[vertex]:
+      continue
+    hop = first_hop[vertex]
+    direct = vertex == root or (hop == vertex and vertex in transit)
+    for i in range(offsets[vertex], offsets[vertex + 1]):
+      neighbor = targets[i]
+      new_cost = cost + costs[i]
+      if new_cost < dist[neighbor]:
+        dist[neighbor] = new_cost
+        first_hop[neighbor] = neighbor if direct else hop
+        heappush(heap, (new_cost, neighbor))
+  return dist, first_hop
+
+
+def shortest_paths_packed(packed: PackedGraph, root: int, transit: Tuple[int, ...]) -> Tuple[bytes, bytes]:
+  """
+  :func:`shortest_paths` 的子进程入口：输入 :meth:`CsrGraph.pack` 的结果，
+  以原始字节返回距离数组与首跳数组（``array('q')``）。
+  """
+  dist, first_hop = shortest_paths(CsrGraph.unpack(packed), root, frozenset(transit))
+  return dist.tobytes(), first_hop.tobytes()
+
+
+def loop_free_alternates(
+    graph: CsrGraph,
+    root: int,
+    dist: array,
+    first_hop: array,
+    transit: AbstractSet[int] = frozenset(),
+) -> Tuple[Dict[int, array], Dict[int, Tuple[int, int]]]:
+  """
+  依据 RFC 5286 的无环条件为每个目的顶点选择备份首跳：
+
+  邻居 N 可作为到 D 的备份，当且仅当 dist(N, D) < dist(N, S) + dist(S, D)，
+  即 N 到 D 的最短路径不会绕回根 S。返回以各邻居为根的距离数组，以及
+  ``{目的下标: (备份首跳下标, 经备份到达的代价)}``。广播网段的伪节点不作为备份首跳。
+  """
+  own_links = [(n, cost) for n, cost in graph.neighbors(root) if n not in transit]
+  neighbor_dist = {neighbor: shortest_paths(graph, neighbor)[0] for neighbor, _ in own_links}
+  alternates: Dict[int, Tuple[int, int]] = {}
+  for dest in range(len(dist)):
+    dist_sd = dist[dest]
+    if dest == root or dist_sd >= UNREACHABLE:
+      continue
+    primary = first_hop[dest]
+    best: Optional[Tuple[int, int]] = None
+    for neighbor, cost in own_links:
+      if neighbor == primary:
+        continue
+      dist_n = neighbor_dist[neighbor]
+      dist_nd = dist_n[dest]
+      if dist_nd >= UNREACHABLE:
+        continue
+      if dist_nd < dist_n[root] + dist_sd:
+        candidate = (cost + dist_nd, neighbor)
+        if best is None or candidate < best:
+          best = candidate
+    if best is not None:
+      alternates[dest] = (best[1], best[0])
+  return neighbor_dist, alternates
+
+
+def loop_free_alternates_packed(
+    packed: PackedGraph,
+    root: int,
+    paths: Tuple[bytes, bytes],
+    transit: Tuple[int, ...],
+) -> Dict[int, Tuple[int, int]]:
+  """:func:`loop_free_alternates` 的子进程入口，只返回备份首跳表。"""
+  dist, first_hop = unpack_paths(paths)
+  return loop_free_alternates(CsrGraph.unpack(packed), root, dist, first_hop, frozenset(transit))[1]
+
+
+def unpack_paths(packed: Tuple[bytes, bytes]) -> Tuple[array, array]:
+  result = []
+  for raw in packed:
+    values = array("q")
+    values.frombytes(raw)
+    result.append(values)
+  return result[0], result[1]
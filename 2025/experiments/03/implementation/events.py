@@ -3,25 +3,37 @@
 
 仅实现实验所需的最核心能力：
 - ``schedule``：注册一次性/周期性定时任务；
-- ``register_socket``：监听套接字可读事件；
-- ``run`` / ``stop``：驱动与终止主循环。
+- ``register_socket``：监听套接字可读事件；``watch_writable`` 等待一次可写事件；
+- ``call_soon``：循环线程内投递回调，下一轮执行，不加锁也不唤醒；
+- ``call_soon_threadsafe`` / ``submit_threadsafe``：供其他线程投递回调；
+- ``call_threadsafe``：在循环线程中执行回调，并以 Future 返回结果；
+- ``run`` / ``stop``：驱动与终止主循环；
+- ``enable_profiling``：可选地按回调统计耗时、定时器迟到与 select 等待时间。
 
 事件循环是单线程模型，回调中应避免阻塞操作，以免影响定时器精度。
+其他线程投递的回调经由 socketpair 自唤醒，不必等待当前 select 超时。
 """
 
 from __future__ import annotations
 
+import functools
 import heapq
 import logging
 import selectors
 import socket
 import threading
 import time
+from collections import deque
+from concurrent.futures import Future
 from dataclasses import dataclass, field
-from typing import Callable, Optional
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+from .profiling import LoopProfiler
 
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 @dataclass(order=True)
 class _ScheduledTask:
@@ -43,6 +55,16 @@ class EventLoop:
     self._task_seq = 0
     self._running = False
     self._lock = threading.Lock()
+    self._thread_id: Optional[int] = None
+    self._ready: Deque[Callable[[], None]] = deque()
+    self.profiler: Optional[LoopProfiler] = None
+    # 等待可写事件的套接字及其一次性回调。
+    self._writers: Dict[socket.socket, Callable[[socket.socket], None]] = {}
+    # 自唤醒通道：其他线程写入一个字节即可打断 select。
+    self._wakeup_recv, self._wakeup_send = socket.socketpair()
+    self._wakeup_recv.setblocking(False)
+    self._wakeup_send.setblocking(False)
+    self._selector.register(self._wakeup_recv, selectors.EVENT_READ, self._drain_wakeup)
 
   # ------------------------------------------------------------------ timers
   def schedule(self, delay: float, callback: Callable[[], None], *, repeat: bool = False) -> _ScheduledTask:
@@ -66,6 +88,8 @@ class EventLoop:
           interval=delay if repeat else None,
       )
       heapq.heappush(self._tasks, task)
+    if self._thread_id is not None and threading.get_ident() != self._thread_id:
+      self._wakeup()
     return task
 
   def cancel(self, task: _ScheduledTask) -> None:
@@ -74,6 +98,87 @@ class EventLoop:
     """
     task.cancelled = True
 
+  def call_soon(self, callback: Callable[..., None], *args: object) -> None:
+    """
+    Queue ``callback(*args)`` from the loop thread itself.
+
+    No wakeup byte is written: queued callbacks already make the current
+    iteration select with a zero timeout.  Other threads must use
+    :meth:`call_soon_threadsafe`.
+    """
+    self._ready.append(functools.partial(callback, *args) if args else callback)
+
+  def call_soon_threadsafe(self, callback: Callable[..., None], *args: object) -> None:
+    """
+    Queue ``callback(*args)`` from any thread and wake the loop immediately.
+
+    Callbacks run on the loop thread in submission order, before timers that
+    are due in the same iteration.
+    """
+    if not callable(callback):
+      raise TypeError("callback must be callable")
+    self._ready.append(functools.partial(callback, *args) if args else callback)
+    self._wakeup()
+
+  def call_threadsafe(self, callback: Callable[..., T], *args: object) -> "Future[T]":
+    """
+    Run ``callback(*args)`` on the loop thread and return a future for its result.
+
+    Called from the loop thread itself, or while the loop is not running, the
+    callback runs inline so callers waiting on the future cannot deadlock.
+    """
+    future: Future[T] = Future()
+
+    def run() -> None:
+      if not future.set_running_or_notify_cancel():
+        return
+      try:
+        future.set_result(callback(*args))
+      except BaseException as exc:  # propagated to the waiting thread
+        future.set_exception(exc)
+
+    if self._thread_id is None or threading.get_ident() == self._thread_id:
+      run()
+    else:
+      self.call_soon_threadsafe(run)
+    return future
+
+  def submit_threadsafe(self, callbacks: Iterable[Callable[[], None]]) -> int:
+    """
+    Queue a batch of zero-argument callbacks with a single wakeup.
+
+    Intended for external producers that inject many requests at once.
+    Returns the number of callbacks queued.
+    """
+    batch = list(callbacks)
+    for callback in batch:
+      if not callable(callback):
+        raise TypeError("callback must be callable")
+    if not batch:
+      return 0
+    self._ready.extend(batch)
+    self._wakeup()
+    return len(batch)
+
+  # -------------------------------------------------------------- profiling
+  def enable_profiling(self, slow_threshold: float = 0.1) -> LoopProfiler:
+    """
+    Start timing every callback; returns the active profiler.
+
+    Re-enabling keeps the collected data and only updates the threshold.
+    Call from the loop thread (or via :meth:`call_threadsafe`).
+    """
+    if self.profiler is None:
+      self.profiler = LoopProfiler(slow_threshold)
+    else:
+      self.profiler.slow_threshold = slow_threshold
+    return self.profiler
+
+  def disable_profiling(self) -> Optional[LoopProfiler]:
+    """Stop profiling and return the detached profiler, if any."""
+    profiler, self.profiler = self.profiler, None
+    return profiler
+
   # ---------------------------------------------------------------- sockets
   def register_socket(
       self,
@@ -92,6 +197,7 @@ class EventLoop:
     self._selector.register(sock, selectors.EVENT_READ, callback)
 
     def unregister() -> None:
+      self._writers.pop(sock, None)
       try:
         self._selector.unregister(sock)
       except KeyError:
@@ -99,26 +205,175 @@ class EventLoop:
 
     return unregister
 
+  def watch_writable(self, sock: socket.socket, callback: Callable[[socket.socket], None]) -> None:
+    """
+    Run ``callback(sock)`` once ``sock`` becomes writable.
+
+    The write interest is one-shot: it is dropped before the callback runs,
+    so a sender that is still blocked must call this again.  Read interest
+    registered through :meth:`register_socket` is kept.
+    """
+    if not callable(callback):
+      raise TypeError("callback must be callable")
+    self._writers[sock] = callback
+    try:
+      key = self._selector.get_key(sock)
+    except KeyError:
+      self._selector.register(sock, selectors.EVENT_WRITE, None)
+      return
+    if not key.events & selectors.EVENT_WRITE:
+      self._selector.modify(sock, key.events | selectors.EVENT_WRITE, key.data)
+
+  def unwatch_writable(self, sock: socket.socket) -> None:
+    """Drop a pending :meth:`watch_writable` interest, if any."""
+    self._writers.pop(sock, None)
+    try:
+      key = self._selector.get_key(sock)
+    except KeyError:
+      return
+    if not key.events & selectors.EVENT_WRITE:
+      return
+    events = key.events & ~selectors.EVENT_WRITE
+    if events:
+      self._selector.modify(sock, events, key.data)
+    else:
+      self._selector.unregister(sock)
+
+  def _take_writer(self, sock: socket.socket) -> Optional[Callable[[socket.socket], None]]:
+    callback = self._writers.get(sock)
+    self.unwatch_writable(sock)
+    return callback
+
   # ------------------------------------------------------------------- loop
   def run(self) -> None:
     """
     Run the event loop until :meth:`stop` is called.
     """
     self._running = True
-    while self._running:
-      self._run_once()
+    self._thread_id = threading.get_ident()
+    try:
+      while self._running:
+        self._run_once()
+    finally:
+      self._thread_id = None
 
   def stop(self) -> None:
     """
     Request loop termination.  The loop exits after the current iteration.
+
+    Safe to call from other threads.
     """
     self._running = False
+    self._wakeup()
+
+  def close(self) -> None:
+    """
+    Release the selector and the wakeup channel.  The loop must not be running.
+    """
+    try:
+      self._selector.unregister(self._wakeup_recv)
+    except KeyError:
+      pass
+    self._wakeup_recv.close()
+    self._wakeup_send.close()
+    self._selector.close()
+
+  def run_pending(self) -> int:
+    """
+    Execute every task that is already due without waiting for IO.
+
+    Returns the number of callbacks executed.  Used by offline drivers such
+    as the replay harness that feed messages without sockets.
+    """
+    call, run_task, _ = self._hooks()
+    return self._run_ready(call) + self._run_due_tasks(time.time(), run_task)
 
   # ------------------------------------------------------------ internals
   def _run_once(self) -> None:
-    now = time.time()
+    call, run_task, select = self._hooks()
+    self._run_ready(call)
+    self._run_due_tasks(time.time(), run_task)
+
+    # Compute selector timeout based on next scheduled task
+    timeout: Optional[float] = None
+    if self._ready:
+      timeout = 0.0
+    else:
+      with self._lock:
+        if self._tasks:
+          timeout = max(0.0, self._tasks[0].deadline - time.time())
+
+    for key, mask in select(timeout):
+      if mask & selectors.EVENT_WRITE:
+        writer = self._take_writer(key.fileobj)  # type: ignore[arg-type]
+        if writer is not None:
+          call(writer, "socket writer failed", key.fileobj)
+      if mask & selectors.EVENT_READ and key.data is not None:
+        call(key.data, "socket callback failed", key.fileobj)
+
+  def _hooks(self) -> Tuple[Callable[..., None], Callable[[_ScheduledTask], None], Callable[[Optional[float]], List]]:
+    # 每轮只读取一次 profiler，据此选用普通或计时版本的回调执行、定时任务与 select；
+    # 普通路径上不再有任何剖析判断。
+    profiler = self.profiler
+    if profiler is None:
+      return self._call, self._run_task, self._selector.select
+    return (
+        functools.partial(self._call_profiled, profiler),
+        functools.partial(self._run_task_profiled, profiler),
+        functools.partial(self._select_profiled, profiler),
+    )
+
+  @staticmethod
+  def _call(callback: Callable[..., None], failure: str, *args: object) -> None:
+    try:
+      callback(*args)
+    except Exception:  # pragma: no cover - diagnostics
+      LOGGER.exception(failure)
 
-    # Execute due tasks
+  def _call_profiled(self, profiler: LoopProfiler, callback: Callable[..., None], failure: str, *args: object) -> None:
+    start = time.perf_counter()
+    self._call(callback, failure, *args)
+    profiler.record_callback(callback, time.perf_counter() - start)
+
+  def _run_task(self, task: _ScheduledTask) -> None:
+    self._call(task.callback, "scheduled task failed")
+
+  def _run_task_profiled(self, profiler: LoopProfiler, task: _ScheduledTask) -> None:
+    profiler.record_lateness(time.time() - task.deadline)
+    self._call_profiled(profiler, task.callback, "scheduled task failed")
+
+  def _select_profiled(self, profiler: LoopProfiler, timeout: Optional[float]) -> List:
+    start = time.perf_counter()
+    events = self._selector.select(timeout)
+    profiler.record_select_wait(time.perf_counter() - start)
+    return events
+
+  def _run_ready(self, call: Callable[..., None]) -> int:
+    # 只执行本轮开始时已在队列中的回调，回调再投递的任务留到下一轮。
+    executed = 0
+    for _ in range(len(self._ready)):
+      executed += 1
+      call(self._ready.popleft(), "threadsafe callback failed")
+    return executed
+
+  def _wakeup(self) -> None:
+    try:
+      self._wakeup_send.send(b"\0")
+    except (BlockingIOError, InterruptedError):
+      # 缓冲区已满说明唤醒尚未被消费，无需再写。
+      pass
+    except OSError:
+      pass
+
+  def _drain_wakeup(self, sock: socket.socket) -> None:
+    try:
+      while sock.recv(4096):
+        pass
+    except (BlockingIOError, InterruptedError):
+      pass
+
+  def _run_due_tasks(self, now: float, run_task: Callable[[_ScheduledTask], None]) -> int:
+    executed = 0
     while True:
       with self._lock:
         if not self._tasks or self._tasks[0].deadline > now:
@@ -126,25 +381,10 @@ class EventLoop:
         task = heapq.heappop(self._tasks)
       if task.cancelled:
         continue
-      try:
-        task.callback()
-      except Exception:  # pragma: no cover - diagnostics
-        LOGGER.exception("scheduled task failed")
+      executed += 1
+      run_task(task)
       if task.interval and not task.cancelled:
         task.deadline = now + task.interval
         with self._lock:
           heapq.heappush(self._tasks, task)
-
-    # Compute selector timeout based on next scheduled task
-    timeout: Optional[float] = None
-    with self._lock:
-      if self._tasks:
-        timeout = max(0.0, self._tasks[0].deadline - time.time())
-
-    events = self._selector.select(timeout)
-    for key, _ in events:
-      callback = key.data
-      try:
-        callback(key.fileobj)  # type: ignore[arg-type]
-      except Exception:  # pragma: no cover - diagnostics
-        LOGGER.exception("socket callback failed")
+    return executed
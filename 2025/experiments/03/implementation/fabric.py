@@ -0,0 +1,123 @@
+"""
+单进程内存网络：在同一个事件循环里互联多台 Router，不创建真实套接字。
+
+单进程模式按 Router ID 的哈希分配本地端口，路由器数量较多时可能冲突；
+基准与大规模仿真改用 :class:`Fabric`。每台路由器的 ``_socket`` 被替换为
+:class:`FabricSocket`，``sendto`` 按目的地址找到拥有该接口地址的路由器，
+以源接口地址作为来源，在下一轮事件循环中调用其 ``_handle_datagram``。
+
+路由器需以非单进程模式创建（目的地址为邻居接口地址），并使用
+``bootstrap(bind=False)``。
+"""
+
+from __future__ import annotations
+
+import functools
+import ipaddress
+import logging
+from collections import Counter
+from typing import TYPE_CHECKING, Dict, Optional, Tuple
+
+from .bfd import is_bfd_packet
+from .events import EventLoop
+
+if TYPE_CHECKING:
+  from .router import Router
+
+LOGGER = logging.getLogger(__name__)
+
+
+class FabricSocket:
+  """替代 UDP 套接字的发送端，只实现 Router 用到的 ``sendto`` 与 ``close``。"""
+
+  def __init__(self, fabric: "Fabric", router: "Router") -> None:
+    self._fabric = fabric
+    self._router = router
+
+  def sendto(self, data: bytes, addr: Tuple[str, int]) -> int:
+    self._fabric.deliver(self._router, data, addr)
+    return len(data)
+
+  def close(self) -> None:
+    self._fabric.detach(self._router)
+
+
+class Fabric:
+  """
+  按接口地址转发报文的内存网络，并统计收发的报文数与字节数。
+
+  ``down(a, b)`` 可以单向或双向丢弃两台路由器之间的报文，用于模拟链路故障。
+  """
+
+  def __init__(self, loop: EventLoop) -> None:
+    self.loop = loop
+    self._by_addr: Dict[str, "Router"] = {}
+    self._blocked: set[Tuple[str, str]] = set()
+    self.packets = 0
+    self.bytes = 0
+    self.dropped = 0
+    self.by_kind: Counter[str] = Counter()
+
+  def attach(self, router: "Router") -> None:
+    """登记 ``router`` 的全部接口地址并替换其套接字；需在加载接口之后调用。"""
+    for iface_state in router.interfaces.values():
+      self._by_addr[str(iface_state.address.ip)] = router
+    router._socket = FabricSocket(self, router)  # type: ignore[assignment]
+
+  def detach(self, router: "Router") -> None:
+    for addr in [addr for addr, owner in self._by_addr.items() if owner is router]:
+      del self._by_addr[addr]
+
+  def down(self, a: str, b: str, *, both: bool = True) -> None:
+    self._blocked.add((a, b))
+    if both:
+      self._blocked.add((b, a))
+
+  def up(self, a: str, b: str) -> None:
+    self._blocked.discard((a, b))
+    self._blocked.discard((b, a))
+
+  def owner(self, addr: str) -> Optional["Router"]:
+    """拥有接口地址 ``addr`` 的路由器。"""
+    return self._by_addr.get(addr)
+
+  def is_down(self, a: str, b: str) -> bool:
+    """从 ``a`` 发往 ``b`` 的报文是否被丢弃。"""
+    return (a, b) in self._blocked
+
+  def reset_counters(self) -> None:
+    self.packets = 0
+    self.bytes = 0
+    self.dropped = 0
+    self.by_kind.clear()
+
+  def deliver(self, sender: "Router", data: bytes, addr: Tuple[str, int]) -> None:
+    target = self._by_addr.get(addr[0])
+    if target is None or (sender.router_id, target.router_id) in self._blocked:
+      self.dropped += 1
+      return
+    self.packets += 1
+    self.bytes += len(data)
+    self.by_kind[_kind_of(data)] += 1
+    source = _source_address(sender, addr[0]) or addr[0]
+    self.loop.call_soon_threadsafe(functools.partial(target._handle_datagram, data, (source, addr[1])))
+
+
+def _source_address(sender: "Router", dest: str) -> Optional[str]:
+  """发送方与目的地址处于同一网段的接口地址。"""
+  dest_ip = ipaddress.ip_address(dest)
+  for iface_state in sender.interfaces.values():
+    if dest_ip in iface_state.address.network:
+      return str(iface_state.address.ip)
+  return None
+
+
+def _kind_of(data: bytes) -> str:
+  # 报文按键排序编码，顶层 "type" 位于 payload 之后，从尾部查找即可，无需完整解码。
+  if is_bfd_packet(data):
+    return "bfd"
+  start = data.rfind(b'"type":"')
+  if start < 0:
+    return "other"
+  start += len(b'"type":"')
+  return data[start:data.find(b'"', start)].decode("ascii", errors="replace")
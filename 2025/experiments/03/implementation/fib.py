@@ -0,0 +1,159 @@
+"""
+由路由表生成聚合后的转发表（FIB）。
+
+``Router.routes`` 为每个通告的网段与 loopback 保留一条路由，条目数随拓扑
+线性增长。转发只关心最长前缀匹配得到的出接口与下一跳，因此可以在不改变
+任何已路由目的地址转发结果的前提下压缩：
+
+1. 配置的汇总范围（路由器配置中的 ``summary_ranges``）以被覆盖路由中最常见
+   的转发动作安装为一条汇总条目，动作不同的明细仍然保留并优先匹配；范围内
+   没有明细路由的地址随汇总转发，与 Area 汇总的语义一致。范围本身或其上级
+   已有路由时忽略该范围；
+2. 转发动作与最近的上级条目相同的明细是冗余的，直接删除；
+3. 动作相同的一对兄弟前缀（同一父前缀的两半）合并为父前缀，逐级向上，
+   父前缀已存在且动作不同时不合并。
+
+前缀使用 :mod:`implementation.compact` 的 ``(网络地址整数, 长度)`` 表示。
+"""
+
+from __future__ import annotations
+
+import socket
+import struct
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from .compact import Prefix, format_prefix, parse_prefix
+
+# 转发动作：(下一跳地址, 出接口, 下一跳路由器)；直连与 loopback 的下一跳为 None。
+Action = Tuple[Optional[str], Optional[str], Optional[str]]
+
+_MASKS = [(0xFFFFFFFF << (32 - length)) & 0xFFFFFFFF for length in range(33)]
+
+
+@dataclass
+class Fib:
+  """
+  聚合后的转发表。``sources`` 只记录合成条目的来源（``summary`` 或 ``auto``），
+  其余条目与某条路由一一对应。
+  """
+
+  entries: Dict[Prefix, Action] = field(default_factory=dict)
+  sources: Dict[Prefix, str] = field(default_factory=dict)
+  routes: int = 0
+  _lengths: List[int] = field(default_factory=list, repr=False)
+
+  def __post_init__(self) -> None:
+    self._lengths = sorted({length for _, length in self.entries}, reverse=True)
+
+  def __len__(self) -> int:
+    return len(self.entries)
+
+  def lookup(self, address: str) -> Optional[Action]:
+    """对 ``address`` 做最长前缀匹配，没有匹配条目时返回 None。"""
+    value = struct.unpack("!I", socket.inet_aton(address))[0]
+    for length in self._lengths:
+      action = self.entries.get((value & _MASKS[length], length))
+      if action is not None:
+        return action
+    return None
+
+  def view(self) -> Dict[str, Dict[str, object]]:
+    """以前缀字符串为键的只读展示形式，用于快照与 CLI。"""
+    view: Dict[str, Dict[str, object]] = {}
+    for prefix, (next_hop, interface, next_hop_router) in self.entries.items():
+      entry: Dict[str, object] = {"next_hop": next_hop, "interface": interface}
+      if next_hop_router is not None:
+        entry["next_hop_router"] = next_hop_router
+      source = self.sources.get(prefix)
+      if source is not None:
+        entry["aggregate"] = source
+      view[format_prefix(prefix)] = entry
+    return view
+
+
+def route_action(entry: Mapping[str, object]) -> Action:
+  return entry.get("next_hop"), entry.get("interface"), entry.get("next_hop_router")  # type: ignore[return-value]
+
+
+def build_fib(routes: Mapping[str, Mapping[str, object]], summary_ranges: Iterable[Prefix] = ()) -> Fib:
+  """
+  由 ``routes`` 生成转发表。对任何被某条路由覆盖的地址，结果与直接按
+  ``routes`` 做最长前缀匹配相同。
+  """
+  table: Dict[Prefix, Action] = {parse_prefix(prefix): route_action(entry) for prefix, entry in routes.items()}
+  sources: Dict[Prefix, str] = {}
+  ranges = set(summary_ranges)
+  if ranges:
+    range_lengths = sorted({length for _, length in ranges})
+    covered: Dict[Prefix, Counter[Action]] = {}
+    for (network, length), action in table.items():
+      for range_length in range_lengths:
+        if range_length >= length:
+          break
+        summary = (network & _MASKS[range_length], range_length)
+        if summary in ranges:
+          covered.setdefault(summary, Counter())[action] += 1
+    for summary in sorted(covered, key=lambda prefix: prefix[1]):
+      network, length = summary
+      # 已被更短的路由覆盖时，范围内的空洞本来就有去处，汇总会改变其转发结果。
+      if any((network & _MASKS[shorter], shorter) in table for shorter in range(length + 1)):
+        continue
+      table[summary] = covered[summary].most_common(1)[0][0]
+      sources[summary] = "summary"
+
+  buckets: List[Dict[int, Action]] = [{} for _ in range(33)]
+  for (network, length), action in table.items():
+    buckets[length][network] = action
+  _drop_redundant(buckets)
+  _merge_siblings(buckets, sources)
+  _drop_redundant(buckets)
+
+  entries = {(network, length): action for length in range(33) for network, action in buckets[length].items()}
+  return Fib(
+      entries=entries,
+      sources={prefix: source for prefix, source in sources.items() if prefix in entries},
+      routes=len(routes),
+  )
+
+
+def _drop_redundant(buckets: List[Dict[int, Action]]) -> None:
+  """删除与最近上级条目动作相同的明细；删除任一条都不影响其余条目的判断。"""
+  lengths = [length for length in range(33) if buckets[length]]
+  for index, length in enumerate(lengths):
+    shorter = lengths[index - 1::-1] if index else []
+    redundant = []
+    for network, action in buckets[length].items():
+      for parent_length in shorter:
+        parent = buckets[parent_length].get(network & _MASKS[parent_length])
+        if parent is not None:
+          if parent == action:
+            redundant.append(network)
+          break
+    for network in redundant:
+      del buckets[length][network]
+
+
+def _merge_siblings(buckets: List[Dict[int, Action]], sources: Dict[Prefix, str]) -> None:
+  """自长到短合并动作相同的兄弟前缀；两半恰好覆盖父前缀，转发结果不变。"""
+  for length in range(32, 0, -1):
+    level = buckets[length]
+    if not level:
+      continue
+    parents = buckets[length - 1]
+    bit = 1 << (32 - length)
+    for network in list(level):
+      action = level.get(network)
+      if action is None or network & bit:
+        continue
+      if level.get(network | bit) != action:
+        continue
+      existing = parents.get(network)
+      if existing is not None and existing != action:
+        continue
+      del level[network]
+      del level[network | bit]
+      if existing is None:
+        parents[network] = action
+        sources[(network, length - 1)] = "auto"
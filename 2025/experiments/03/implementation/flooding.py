@@ -0,0 +1,193 @@
+"""
+稠密拓扑上的精简泛洪子图。
+
+默认的泛洪把每条新 LSA 发给除来源外的所有邻居，全互联或 Clos 拓扑上每条
+链路都会收到一份甚至多份副本。:func:`build_flooding_topology` 由 Area 内
+Router LSA 描述的链路计算一个泛洪子图，LSA 只沿子图中的链路泛洪，邻接
+仍在所有链路上维持：
+
+1. 以最小 Router ID 为根做广度优先搜索，得到第一棵生成树；
+2. 以最大 Router ID 为根，优先使用第一棵树之外的链路，得到第二棵生成树，
+   两棵树尽量不共用链路；
+3. 若子图中仍有桥（拓扑本身不是桥的链路），补入一条跨越该桥的链路。
+
+因此只要拓扑本身 2-边连通，任意一条链路故障都不会使泛洪子图分裂。计算
+只依赖 LSDB 内容并按 Router ID 排序，LSDB 一致的路由器得到相同的子图，
+无需额外的信令。
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+Edge = Tuple[str, str]
+
+
+@dataclass
+class FloodingTopology:
+  """
+  ``graph`` 为双方 Router LSA 都通告了的链路；``flooding`` 为其中的泛洪子图。
+  两者均以邻接集合表示。
+  """
+
+  graph: Dict[str, Set[str]] = field(default_factory=dict)
+  flooding: Dict[str, Set[str]] = field(default_factory=dict)
+
+  def floods(self, router_id: str, neighbor: str) -> bool:
+    """``router_id`` 是否应沿到 ``neighbor`` 的链路泛洪。拓扑中尚未出现的链路照常泛洪。"""
+    if neighbor not in self.graph.get(router_id, ()):
+      return True
+    return neighbor in self.flooding.get(router_id, ())
+
+  @property
+  def links(self) -> int:
+    return sum(len(peers) for peers in self.graph.values()) // 2
+
+  @property
+  def flooding_links(self) -> int:
+    return sum(len(peers) for peers in self.flooding.values()) // 2
+
+
+def bidirectional_graph(links: Mapping[str, Iterable[str]]) -> Dict[str, Set[str]]:
+  """只保留两端都通告了的链路，单向的链路（同步未完成或正在断开）不计入。"""
+  announced = {router: set(peers) for router, peers in links.items()}
+  graph: Dict[str, Set[str]] = {router: set() for router in announced}
+  for router, peers in announced.items():
+    for peer in peers:
+      if peer != router and router in announced.get(peer, ()):
+        graph[router].add(peer)
+  return graph
+
+
+def build_flooding_topology(links: Mapping[str, Iterable[str]]) -> FloodingTopology:
+  """由每台路由器通告的邻居集合计算泛洪子图；各连通分量分别处理。"""
+  graph = bidirectional_graph(links)
+  flooding: Dict[str, Set[str]] = {router: set() for router in graph}
+  seen: Set[str] = set()
+  for start in sorted(graph):
+    if start in seen:
+      continue
+    component = _component(graph, start)
+    seen |= component
+    first = _spanning_tree(graph, min(component), avoid=None)
+    second = _spanning_tree(graph, max(component), avoid=first)
+    for a, b in first | second:
+      flooding[a].add(b)
+      flooding[b].add(a)
+  _cover_bridges(graph, flooding)
+  return FloodingTopology(graph=graph, flooding=flooding)
+
+
+def _edge(a: str, b: str) -> Edge:
+  return (a, b) if a < b else (b, a)
+
+
+def _component(graph: Mapping[str, Set[str]], start: str) -> Set[str]:
+  component = {start}
+  queue = deque([start])
+  while queue:
+    node = queue.popleft()
+    for peer in graph[node]:
+      if peer not in component:
+        component.add(peer)
+        queue.append(peer)
+  return component
+
+
+def _spanning_tree(graph: Mapping[str, Set[str]], root: str, avoid: Optional[Set[Edge]]) -> Set[Edge]:
+  """
+  从 ``root`` 出发的广度优先生成树。给定 ``avoid`` 时按 0-1 BFS 计算：
+  ``avoid`` 中的链路代价为 1，其余为 0，尽量不复用这些链路。
+  """
+  cost = {root: 0}
+  parent: Dict[str, str] = {}
+  queue = deque([root])
+  done: Set[str] = set()
+  while queue:
+    node = queue.popleft()
+    if node in done:
+      continue
+    done.add(node)
+    for peer in sorted(graph[node]):
+      if peer in done:
+        continue
+      weight = 1 if avoid is not None and _edge(node, peer) in avoid else 0
+      candidate = cost[node] + weight
+      if avoid is None:
+        # 普通 BFS：以首次发现为准。
+        if peer in cost:
+          continue
+        cost[peer] = candidate
+        parent[peer] = node
+        queue.append(peer)
+      elif candidate < cost.get(peer, candidate + 1):
+        cost[peer] = candidate
+        parent[peer] = node
+        if weight:
+          queue.append(peer)
+        else:
+          queue.appendleft(peer)
+  return {_edge(child, up) for child, up in parent.items()}
+
+
+def _cover_bridges(graph: Mapping[str, Set[str]], flooding: Dict[str, Set[str]]) -> None:
+  """为子图中每条在原拓扑里并非桥的桥补一条跨越它的链路，直到不再有可补的桥。"""
+  skipped: Set[Edge] = set()
+  while True:
+    bridges = [bridge for bridge in _bridges(flooding) if bridge not in skipped]
+    if not bridges:
+      return
+    a, b = bridges[0]
+    flooding[a].discard(b)
+    flooding[b].discard(a)
+    side = _component(flooding, a)
+    flooding[a].add(b)
+    flooding[b].add(a)
+    crossing = sorted(
+        _edge(node, peer)
+        for node in side
+        for peer in graph[node]
+        if peer not in side and _edge(node, peer) != (a, b)
+    )
+    if not crossing:
+      # 原拓扑中这条链路本身就是桥，无法补强。
+      skipped.add((a, b))
+      continue
+    x, y = crossing[0]
+    flooding[x].add(y)
+    flooding[y].add(x)
+
+
+def _bridges(graph: Mapping[str, Set[str]]) -> List[Edge]:
+  """迭代版 Tarjan 算法求无向图的桥，按字典序返回。"""
+  order: Dict[str, int] = {}
+  low: Dict[str, int] = {}
+  bridges: List[Edge] = []
+  for root in sorted(graph):
+    if root in order:
+      continue
+    order[root] = low[root] = len(order)
+    stack: List[Tuple[str, Optional[str], Iterable[str]]] = [(root, None, iter(sorted(graph[root])))]
+    while stack:
+      node, up, peers = stack[-1]
+      advanced = False
+      for peer in peers:
+        if peer == up:
+          continue
+        if peer in order:
+          low[node] = min(low[node], order[peer])
+          continue
+        order[peer] = low[peer] = len(order)
+        stack.append((peer, node, iter(sorted(graph[peer]))))
+        advanced = True
+        break
+      if advanced:
+        continue
+      stack.pop()
+      if up is not None:
+        low[up] = min(low[up], low[node])
+        if low[node] > order[up]:
+          bridges.append(_edge(up, node))
+  return sorted(bridges)
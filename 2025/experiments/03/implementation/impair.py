@@ -0,0 +1,239 @@
+"""
+按邻居注入丢包、时延、抖动、重复与乱序的传输层。
+
+不借助 namespace 与 ``tc netem`` 测试 :class:`~implementation.router.Router` 在
+劣化链路上的行为：:meth:`ImpairedTransport.attach` 包装路由器的发送路径（替换
+``_socket``）与接收路径（替换实例上的 ``_handle_datagram``），按对端 Router ID
+查找劣化配置，延迟的报文由事件循环的定时器投递。真实 UDP 套接字与
+:class:`~implementation.fabric.Fabric` 均可使用；与 Fabric 一起使用时需在
+``fabric.attach`` 之后调用。
+
+配置为 JSON/YAML 映射，``send`` 与 ``receive`` 分别作用于两个方向，键为邻居
+Router ID，``"*"`` 为其余邻居的默认值::
+
+  {"seed": 7,
+   "send": {"*": {"loss": 0.05, "delay_ms": 10, "jitter_ms": 5},
+            "2.2.2.2": {"loss": 0.2, "duplicate": 0.01, "reorder": 0.05}},
+   "receive": {"3.3.3.3": {"delay_ms": 50, "distribution": "exponential"}}}
+
+每个 (本机, 邻居, 方向) 使用由 ``seed`` 派生的独立随机数序列，同一输入
+报文序列下的劣化结果可复现。
+"""
+
+from __future__ import annotations
+
+import functools
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Callable, Dict, Mapping, Optional, Tuple
+
+from .events import EventLoop
+
+if TYPE_CHECKING:
+  from .router import Router
+
+LOGGER = logging.getLogger(__name__)
+
+SEND = "send"
+RECEIVE = "receive"
+DISTRIBUTIONS = ("uniform", "normal", "exponential")
+
+
+@dataclass(frozen=True)
+class Impairment:
+  """
+  单个方向的劣化参数。概率取值 0–1，时间单位为毫秒。
+
+  时延为 ``delay_ms`` 加上按 ``distribution`` 抽样的抖动：``uniform`` 在
+  ±``jitter_ms`` 内均匀分布，``normal`` 以 ``jitter_ms`` 为标准差，
+  ``exponential`` 以 ``jitter_ms`` 为均值（只增不减）。被选中乱序的报文额外
+  推迟 ``reorder_gap_ms``，排到其后发送的报文之后。
+  """
+
+  loss: float = 0.0
+  delay_ms: float = 0.0
+  jitter_ms: float = 0.0
+  distribution: str = "uniform"
+  duplicate: float = 0.0
+  reorder: float = 0.0
+  reorder_gap_ms: float = 10.0
+
+  @classmethod
+  def from_config(cls, raw: Mapping[str, object]) -> "Impairment":
+    known = {f.name for f in fields(cls)}
+    unknown = set(raw) - known
+    if unknown:
+      raise ValueError(f"unknown impairment keys: {', '.join(sorted(unknown))}")
+    impairment = cls(**{key: (str(value) if key == "distribution" else float(value)) for key, value in raw.items()})  # type: ignore[arg-type]
+    for name in ("loss", "duplicate", "reorder"):
+      if not 0.0 <= getattr(impairment, name) <= 1.0:
+        raise ValueError(f"{name} must be between 0 and 1")
+    if impairment.distribution not in DISTRIBUTIONS:
+      raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}")
+    return impairment
+
+  def sample_delay(self, rng: random.Random) -> float:
+    """抽样一个报文的时延（秒），不小于 0。"""
+    jitter = self.jitter_ms
+    if not jitter:
+      extra = 0.0
+    elif self.distribution == "normal":
+      extra = rng.gauss(0.0, jitter)
+    elif self.distribution == "exponential":
+      extra = rng.expovariate(1.0 / jitter)
+    else:
+      extra = rng.uniform(-jitter, jitter)
+    return max(0.0, self.delay_ms + extra) / 1000
+
+
+class _Link:
+  """一个 (邻居, 方向) 的劣化参数、随机数序列与计数。"""
+
+  __slots__ = ("impairment", "rng", "counters")
+
+  def __init__(self, impairment: Impairment, seed: str) -> None:
+    self.impairment = impairment
+    self.rng = random.Random(seed)
+    self.counters: Counter[str] = Counter()
+
+
+class ImpairedTransport:
+  """
+  为一台路由器注入劣化的发送与接收路径。``profiles`` 的形式为
+  ``{"send"|"receive": {邻居或 "*": Impairment}}``。
+  """
+
+  def __init__(
+      self,
+      loop: EventLoop,
+      profiles: Mapping[str, Mapping[str, Impairment]],
+      *,
+      seed: int = 0,
+  ) -> None:
+    self.loop = loop
+    self.seed = seed
+    self.profiles = {direction: dict(profiles.get(direction, {})) for direction in (SEND, RECEIVE)}
+    self.router: Optional["Router"] = None
+    self._links: Dict[Tuple[str, str], _Link] = {}
+    self._by_addr: Dict[str, str] = {}
+    self._by_port: Dict[int, str] = {}
+
+  @classmethod
+  def from_config(cls, loop: EventLoop, raw: Mapping[str, object]) -> "ImpairedTransport":
+    """由配置映射构造，格式见模块说明；非法配置抛出 ValueError。"""
+    profiles: Dict[str, Dict[str, Impairment]] = {}
+    for direction in (SEND, RECEIVE):
+      section = raw.get(direction) or {}
+      if not isinstance(section, Mapping):
+        raise ValueError(f"impairment section {direction!r} must be a mapping")
+      profiles[direction] = {}
+      for neighbor, entry in section.items():
+        if not isinstance(entry, Mapping):
+          raise ValueError(f"impairment for {neighbor!r} must be a mapping")
+        profiles[direction][str(neighbor)] = Impairment.from_config(entry)
+    return cls(loop, profiles, seed=int(raw.get("seed", 0)))  # type: ignore[arg-type]
+
+  # ---------------------------------------------------------------- wiring
+  def attach(self, router: "Router") -> None:
+    """包装 ``router`` 当前的套接字与报文入口；需在套接字创建（或 Fabric 接入）之后调用。"""
+    from .router import Router
+
+    self.router = router
+    for iface_state in router.interfaces.values():
+      for neighbor in iface_state.neighbors.values():
+        self._by_addr[neighbor.addr] = neighbor.router_id
+        self._by_port[Router._port_for_router(neighbor.router_id)] = neighbor.router_id
+    if router._socket is not None:
+      router._socket = _ImpairedSocket(self, router._socket)  # type: ignore[assignment]
+    deliver = router._handle_datagram
+    router._handle_datagram = functools.partial(self._receive, deliver)  # type: ignore[method-assign]
+
+  def stats(self) -> Dict[str, Dict[str, int]]:
+    """按 ``<方向> <邻居>`` 汇总的 passed/lost/duplicated/reordered 计数。"""
+    return {f"{direction} {neighbor}": dict(link.counters) for (direction, neighbor), link in sorted(self._links.items())}
+
+  def _neighbor_of(self, addr: Tuple[str, int]) -> Optional[str]:
+    if self.router is not None and self.router.single_process:
+      return self._by_port.get(addr[1])
+    return self._by_addr.get(addr[0])
+
+  def _link(self, direction: str, addr: Tuple[str, int]) -> Optional[_Link]:
+    neighbor = self._neighbor_of(addr)
+    if neighbor is None:
+      return None
+    key = (direction, neighbor)
+    link = self._links.get(key)
+    if link is None:
+      profiles = self.profiles[direction]
+      impairment = profiles.get(neighbor) or profiles.get("*")
+      if impairment is None:
+        return None
+      router_id = self.router.router_id if self.router is not None else "?"
+      link = self._links[key] = _Link(impairment, f"{self.seed}/{router_id}/{neighbor}/{direction}")
+    return link
+
+  # -------------------------------------------------------------- datapath
+  def _send(self, sock: object, data: bytes, addr: Tuple[str, int]) -> int:
+    link = self._link(SEND, addr)
+    if link is None:
+      return sock.sendto(data, addr)  # type: ignore[attr-defined]
+    self._impair(link, functools.partial(self._send_later, sock, data, addr))
+    return len(data)
+
+  def _send_later(self, sock: object, data: bytes, addr: Tuple[str, int]) -> None:
+    try:
+      sock.sendto(data, addr)  # type: ignore[attr-defined]
+    except OSError as exc:
+      LOGGER.debug("延迟发送至 %s:%s 失败: %s", addr[0], addr[1], exc)
+
+  def _receive(self, deliver: Callable[[bytes, Tuple[str, int]], None], data: bytes, addr: Tuple[str, int]) -> None:
+    link = self._link(RECEIVE, addr)
+    if link is None:
+      deliver(data, addr)
+      return
+    self._impair(link, functools.partial(deliver, data, addr))
+
+  def _impair(self, link: _Link, forward: Callable[[], None]) -> None:
+    """按 ``link`` 的参数决定丢弃、复制与推迟，随后调用 ``forward``。"""
+    impairment = link.impairment
+    rng = link.rng
+    if impairment.loss and rng.random() < impairment.loss:
+      link.counters["lost"] += 1
+      self._count("lost")
+      return
+    copies = 1
+    if impairment.duplicate and rng.random() < impairment.duplicate:
+      copies = 2
+      link.counters["duplicated"] += 1
+      self._count("duplicated")
+    for _ in range(copies):
+      delay = impairment.sample_delay(rng)
+      if impairment.reorder and rng.random() < impairment.reorder:
+        delay += impairment.reorder_gap_ms / 1000
+        link.counters["reordered"] += 1
+        self._count("reordered")
+      link.counters["passed"] += 1
+      if delay > 0:
+        self.loop.schedule(delay, forward)
+      else:
+        forward()
+
+  def _count(self, name: str) -> None:
+    if self.router is not None:
+      self.router.metrics.incr(f"impair.{name}")
+
+
+class _ImpairedSocket:
+  """代替路由器套接字的发送端；其余属性转交给被包装的套接字。"""
+
+  def __init__(self, transport: ImpairedTransport, inner: object) -> None:
+    self._transport = transport
+    self._inner = inner
+
+  def sendto(self, data: bytes, addr: Tuple[str, int]) -> int:
+    return self._transport._send(self._inner, data, addr)
+
+  def __getattr__(self, name: str) -> object:
+    return getattr(self._inner, name)
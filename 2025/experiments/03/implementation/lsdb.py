@@ -4,21 +4,46 @@ Link State Database management helpers.
 The implementation stores LSAs in-memory and performs the minimum validation
 required to support the teaching exercises: sequence handling, checksum
 verification, and ageing/refresh logic.
+
+LSAs age until ``MAX_AGE``.  An LSA reaching MaxAge is removed and handed back
+to the caller so it can be flooded as a flush; receiving a MaxAge instance
+that is at least as recent as the stored copy removes it as well.  Received
+copies keep the age they arrived with, so a flood never grants an instance a
+fresh lifetime.  The flushed instance is held for ``FLUSH_HOLD_TIME`` and,
+while held, any non-MaxAge copy whose sequence is not higher is rejected: a
+neighbour that has not processed the flush yet cannot bring it back.
+
+Besides the primary ``(lsa_type, lsa_id)`` map the database maintains
+secondary indexes by advertising router, by advertised prefix and by age
+bucket, so filtered lookups do not scan every entry.  Age buckets are keyed
+by the LSA's *birth* on the database clock (total seconds aged), which stays
+fixed while the LSA ages and therefore never needs re-bucketing.
+
+The database also keeps ``topology_hash``, an XOR of per-LSA digests of the
+links described by Router and Network LSAs.  It is updated on every install
+and removal, so two LSDB states with the same link set hash to the same value
+regardless of how they were reached, and SPF results can be cached by it.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
+import sys
 import time
 import zlib
 from copy import deepcopy
 from dataclasses import dataclass, field, replace
-from typing import Dict, Iterable, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from . import timers
+from .compact import Prefix, parse_prefix
+
+# 年龄索引的桶宽（秒）。
+AGE_BUCKET = 60
 
 
-@dataclass
+@dataclass(slots=True)
 class LsaHeader:
   lsa_type: str
   lsa_id: str
@@ -28,7 +53,7 @@ class LsaHeader:
   checksum: int = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Lsa:
   header: LsaHeader
   payload: Dict[str, object] = field(default_factory=dict)
@@ -56,6 +81,61 @@ def _compute_checksum(header: LsaHeader, payload: Dict[str, object]) -> int:
   return zlib.crc32(encoded) & 0xFFFFFFFF
 
 
+def advertised_prefixes(lsa: Lsa) -> Iterator[Prefix]:
+  """
+  LSA 负载中通告的前缀：Router LSA 的 loopback 与 networks，Summary LSA 的 prefixes，
+  Network LSA 的网段。
+
+  无法解析的前缀被忽略。
+  """
+  payload = lsa.payload
+  raw: List[object] = []
+  for field_name in ("loopback", "network"):
+    if payload.get(field_name):
+      raw.append(payload[field_name])
+  for field_name in ("networks", "prefixes"):
+    for entry in payload.get(field_name) or ():
+      if isinstance(entry, dict) and entry.get("prefix"):
+        raw.append(entry["prefix"])
+  for prefix in raw:
+    try:
+      yield parse_prefix(str(prefix))
+    except (OSError, ValueError):
+      continue
+
+
+def topology_digest(lsa: Lsa) -> int:
+  """
+  LSA 所描述链路的 64 位摘要：Router LSA 为 (邻居或网段, 代价) 集合，Network LSA
+  为网段上的路由器集合；其余类型不影响拓扑，返回 0。
+  """
+  payload = lsa.payload
+  if lsa.header.lsa_type == "router":
+    links = sorted(
+        (str(link.get("router_id") or f"net:{link.get('network')}"), int(link.get("cost", 1)))
+        for link in payload.get("links") or ()
+        if isinstance(link, dict)
+    )
+  elif lsa.header.lsa_type == "network":
+    links = sorted((str(router), 0) for router in payload.get("routers") or ())
+  else:
+    return 0
+  encoded = json.dumps([lsa.header.lsa_type, lsa.header.lsa_id, links], separators=(",", ":")).encode("utf-8")
+  return int.from_bytes(hashlib.blake2b(encoded, digest_size=8).digest(), "little")
+
+
+def _index_add(index: Dict, value: object, key: Tuple[str, str]) -> None:
+  index.setdefault(value, set()).add(key)
+
+
+def _index_remove(index: Dict, value: object, key: Tuple[str, str]) -> None:
+  keys = index.get(value)
+  if keys is not None:
+    keys.discard(key)
+    if not keys:
+      del index[value]
+
+
 class LinkStateDatabase:
   """
   In-memory LSDB following the minimal rules required by the lab exercises.
@@ -64,19 +144,63 @@ class LinkStateDatabase:
   def __init__(self) -> None:
     self._lsas: Dict[Tuple[str, str], Lsa] = {}
     self._last_refresh = time.time()
+    self._listeners: List[Callable[[Tuple[str, str], Optional[Lsa]], None]] = []
+    # 二级索引，均存放主键；由 _store/_discard 维护。
+    self._by_adv: Dict[str, Set[Tuple[str, str]]] = {}
+    self._by_prefix: Dict[Prefix, Set[Tuple[str, str]]] = {}
+    self._by_age: Dict[int, Set[Tuple[str, str]]] = {}
+    self._prefixes: Dict[Tuple[str, str], Tuple[Prefix, ...]] = {}
+    self._birth: Dict[Tuple[str, str], int] = {}
+    self._clock = 0
+    # 各 Router/Network LSA 的链路摘要及其异或，安装与移除时增量维护。
+    self._digests: Dict[Tuple[str, str], int] = {}
+    self.topology_hash = 0
+    # 已清除的 MaxAge 实例及其释放时刻（数据库时钟），见 flushed()。
+    self._flushed: Dict[Tuple[str, str], Tuple[Lsa, int]] = {}
+
+  def __len__(self) -> int:
+    return len(self._lsas)
+
+  def add_listener(self, callback: Callable[[Tuple[str, str], Optional[Lsa]], None]) -> None:
+    """
+    注册变更回调：LSA 被安装、恢复或移除时以 ``(key, lsa)`` 调用，移除时 lsa 为 None。
+
+    age 的周期性增长不视为变更。
+    """
+    self._listeners.append(callback)
+
+  def _notify(self, key: Tuple[str, str], lsa: Optional[Lsa]) -> None:
+    for callback in self._listeners:
+      callback(key, lsa)
 
   def install(self, lsa: Lsa) -> bool:
     """
     将 LSA 插入或更新到数据库，当 LSDB 发生变化时返回 True。
+
+    age 达到 MaxAge 的 LSA 表示清除：若不旧于本地副本则将其删除并返回 True，
+    清除的实例在 ``FLUSH_HOLD_TIME`` 内保留，期间序列号不更大的普通实例被拒绝。
     """
     key = lsa.fingerprint()
     current = self._lsas.get(key)
+    if lsa.header.age >= timers.MAX_AGE:
+      if current is None or lsa.header.sequence < current.header.sequence:
+        return False
+      self._discard(key)
+      self._hold_flushed(key, lsa)
+      self._notify(key, None)
+      return True
+
+    held = self._flushed.get(key)
+    if held is not None:
+      if lsa.header.sequence <= held[0].header.sequence:
+        return False
+      del self._flushed[key]
 
     payload_copy = deepcopy(lsa.payload)
     base_header = replace(lsa.header, age=0, checksum=0)
     checksum = _compute_checksum(base_header, payload_copy)
     candidate = Lsa(
-        header=replace(base_header, checksum=checksum),
+        header=replace(base_header, age=min(max(lsa.header.age, 0), timers.MAX_AGE - 1), checksum=checksum),
         payload=payload_copy,
     )
 
@@ -88,31 +212,149 @@ class LinkStateDatabase:
           # LSA identical; nothing to do.
           return False
 
-    self._lsas[key] = candidate
+    self._store(key, candidate)
+    self._notify(key, candidate)
+    return True
+
+  def restore(self, lsa: Lsa) -> bool:
+    """
+    安装从检查点恢复的 LSA，保留其 age；校验和不匹配的条目会被拒绝。
+    """
+    expected = _compute_checksum(replace(lsa.header, age=0, checksum=0), lsa.payload)
+    if expected != lsa.header.checksum:
+      return False
+    key = lsa.fingerprint()
+    current = self._lsas.get(key)
+    if current is not None and current.header.sequence >= lsa.header.sequence:
+      return False
+    self._store(key, lsa)
+    self._notify(key, lsa)
     return True
 
+  def _hold_flushed(self, key: Tuple[str, str], lsa: Lsa) -> None:
+    flushed = Lsa(header=replace(lsa.header, age=timers.MAX_AGE), payload=lsa.payload)
+    self._flushed[key] = (flushed, self._clock + timers.FLUSH_HOLD_TIME)
+
+  def flushed(self, lsa_type: str, lsa_id: str) -> Optional[Lsa]:
+    """返回仍在保留期内的已清除实例（age 为 MaxAge），不存在时返回 None。"""
+    held = self._flushed.get((lsa_type, lsa_id))
+    return held[0] if held is not None else None
+
+  def _store(self, key: Tuple[str, str], lsa: Lsa) -> None:
+    if key in self._lsas:
+      self._unindex(key)
+    self._lsas[key] = lsa
+    _index_add(self._by_adv, lsa.header.advertising_router, key)
+    prefixes = tuple(advertised_prefixes(lsa))
+    if prefixes:
+      self._prefixes[key] = prefixes
+      for prefix in prefixes:
+        _index_add(self._by_prefix, prefix, key)
+    birth = self._clock - lsa.header.age
+    self._birth[key] = birth
+    _index_add(self._by_age, birth // AGE_BUCKET, key)
+    digest = topology_digest(lsa)
+    if digest:
+      self._digests[key] = digest
+      self.topology_hash ^= digest
+
+  def _discard(self, key: Tuple[str, str]) -> Optional[Lsa]:
+    lsa = self._lsas.pop(key, None)
+    if lsa is not None:
+      self._unindex(key, lsa)
+    return lsa
+
+  def _unindex(self, key: Tuple[str, str], lsa: Optional[Lsa] = None) -> None:
+    lsa = lsa or self._lsas[key]
+    _index_remove(self._by_adv, lsa.header.advertising_router, key)
+    for prefix in self._prefixes.pop(key, ()):
+      _index_remove(self._by_prefix, prefix, key)
+    birth = self._birth.pop(key)
+    _index_remove(self._by_age, birth // AGE_BUCKET, key)
+    self.topology_hash ^= self._digests.pop(key, 0)
+
+  def compare_header(self, header: Dict[str, object]) -> int:
+    """
+    仅凭 LSU 中的头部字段与已存 LSA 比较新旧，无需构造 Lsa 或复制 payload。
+
+    返回 1 表示应当安装（本地不存在、序列号更大或同序列号但校验和不同），
+    0 表示与本地完全相同的副本，-1 表示比本地旧。
+    """
+    current = self._lsas.get((str(header.get("lsa_type")), str(header.get("lsa_id"))))
+    try:
+      sequence = int(header.get("sequence", 0))  # type: ignore[arg-type]
+      checksum = int(header.get("checksum", 0))  # type: ignore[arg-type]
+      max_age = int(header.get("age", 0)) >= timers.MAX_AGE  # type: ignore[arg-type]
+    except (TypeError, ValueError):
+      return 1
+    if max_age:
+      # 清除报文只对本地仍持有、且不比它新的副本有意义。
+      if current is None:
+        return 0
+      return 1 if sequence >= current.header.sequence else -1
+    if current is None:
+      held = self._flushed.get((str(header.get("lsa_type")), str(header.get("lsa_id"))))
+      return 1 if held is None or sequence > held[0].header.sequence else -1
+    if sequence != current.header.sequence:
+      return 1 if sequence > current.header.sequence else -1
+    return 0 if checksum == current.header.checksum else 1
+
+  def lookup(self, lsa_type: str, lsa_id: str) -> Optional[Lsa]:
+    """
+    按 ``(lsa_type, lsa_id)`` 查找 LSA，不存在时返回 None。
+    """
+    return self._lsas.get((lsa_type, lsa_id))
+
+  def by_advertising_router(self, router_id: str) -> List[Lsa]:
+    """返回 ``router_id`` 生成的全部 LSA。"""
+    return [self._lsas[key] for key in sorted(self._by_adv.get(router_id, ()))]
+
+  def by_prefix(self, prefix: str) -> List[Lsa]:
+    """
+    返回通告 ``prefix`` 的全部 LSA。前缀按网络地址归一化，省略长度时视为 /32。
+
+    前缀格式非法时抛出 ValueError。
+    """
+    try:
+      key = parse_prefix(prefix)
+    except OSError as exc:
+      raise ValueError(f"invalid prefix {prefix!r}") from exc
+    return [self._lsas[k] for k in sorted(self._by_prefix.get(key, ()))]
+
+  def older_than(self, seconds: int) -> List[Lsa]:
+    """返回 age 不小于 ``seconds`` 的 LSA，只访问可能命中的年龄桶。"""
+    cutoff = self._clock - seconds
+    found: List[Lsa] = []
+    for bucket in sorted(b for b in self._by_age if b * AGE_BUCKET <= cutoff):
+      found.extend(self._lsas[key] for key in self._by_age[bucket] if self._birth[key] <= cutoff)
+    return found
+
   def age(self, seconds: int) -> Iterable[Lsa]:
     """
-    为每条 LSA 增加 age，超过刷新时间的条目会被删除并返回以供泛洪。
+    为每条 LSA 增加 age，达到 MaxAge 的条目会被删除，并以 age=MaxAge 返回以供泛洪清除；
+    保留期已满的已清除实例同时被释放。
     """
     if seconds <= 0:
       return []
 
     now = time.time()
+    self._clock += seconds
     expired: list[Lsa] = []
-    refreshed: dict[Tuple[str, str], Lsa] = {}
-
-    for key, lsa in list(self._lsas.items()):
-      new_age = lsa.header.age + seconds
-      if new_age >= timers.LS_REFRESH_TIME:
-        expired.append(self._lsas.pop(key))
-        continue
-      refreshed[key] = Lsa(
-          header=replace(lsa.header, age=new_age),
+    for lsa in self.older_than(timers.MAX_AGE):
+      key = lsa.fingerprint()
+      self._discard(key)
+      self._hold_flushed(key, lsa)
+      expired.append(self._flushed[key][0])
+      self._notify(key, None)
+    for key in [key for key, (_, release) in self._flushed.items() if release <= self._clock]:
+      del self._flushed[key]
+
+    # 出生时间不变，索引无需调整，只替换带新 age 的头部。
+    for key, lsa in self._lsas.items():
+      self._lsas[key] = Lsa(
+          header=replace(lsa.header, age=self._clock - self._birth[key]),
           payload=lsa.payload,
       )
-
-    self._lsas.update(refreshed)
     self._last_refresh = now
     return expired
 
@@ -122,19 +364,25 @@ class LinkStateDatabase:
     """
     return dict(self._lsas)
 
-  def to_message_payload(self, lsa: Lsa) -> Dict[str, object]:
+  @staticmethod
+  def header_payload(lsa: Lsa) -> Dict[str, object]:
+    """LSA 头部的 JSON 结构，DD 摘要只需要这一部分，无需复制 payload。"""
+    return {
+        "lsa_type": lsa.header.lsa_type,
+        "lsa_id": lsa.header.lsa_id,
+        "advertising_router": lsa.header.advertising_router,
+        "sequence": lsa.header.sequence,
+        "age": lsa.header.age,
+        "checksum": lsa.header.checksum,
+    }
+
+  @staticmethod
+  def to_message_payload(lsa: Lsa) -> Dict[str, object]:
     """
     将内存中的 LSA 转换为 LSU 可携带的 JSON 结构。
     """
     return {
-        "header": {
-            "lsa_type": lsa.header.lsa_type,
-            "lsa_id": lsa.header.lsa_id,
-            "advertising_router": lsa.header.advertising_router,
-            "sequence": lsa.header.sequence,
-            "age": lsa.header.age,
-            "checksum": lsa.header.checksum,
-        },
+        "header": LinkStateDatabase.header_payload(lsa),
         "payload": deepcopy(lsa.payload),
     }
 
@@ -142,16 +390,19 @@ class LinkStateDatabase:
   def from_message_payload(payload: Dict[str, object]) -> Lsa:
     """
     将 LSU 报文中的 JSON 字段还原为 Lsa 对象。
+
+    payload 直接引用解码结果而不复制；:meth:`install` 在真正写入时再复制。
     """
     header_dict = dict(payload.get("header") or {})
     return Lsa(
         header=LsaHeader(
-            lsa_type=str(header_dict.get("lsa_type")),
-            lsa_id=str(header_dict.get("lsa_id")),
-            advertising_router=str(header_dict.get("advertising_router")),
+            # 类型与 Router ID 在全网 LSDB 中大量重复，驻留后共享同一个字符串对象。
+            lsa_type=sys.intern(str(header_dict.get("lsa_type"))),
+            lsa_id=sys.intern(str(header_dict.get("lsa_id"))),
+            advertising_router=sys.intern(str(header_dict.get("advertising_router"))),
             sequence=int(header_dict.get("sequence", 0)),
             age=int(header_dict.get("age", 0)),
             checksum=int(header_dict.get("checksum", 0)),
         ),
-        payload=deepcopy(payload.get("payload") or {}),
+        payload=payload.get("payload") or {},
     )
@@ -20,6 +20,9 @@ except ModuleNotFoundError:  # pragma: no cover - instruct the student
 
 from .cli import CliShell
 from .events import EventLoop
+from .impair import ImpairedTransport
+from .query import QueryServer
+from .replay import MessageRecorder
 from .router import Router
 
 
@@ -32,6 +35,21 @@ def parse_args(argv: list[str]) -> argparse.Namespace:
   parser.add_argument("--log-level", default="info", choices=["trace", "debug", "info", "warning", "error"])
   parser.add_argument("--dry-run", action="store_true", help="Skip programming kernel routing tables")
   parser.add_argument("--single-process", action="store_true", help="Run using loopback sockets instead of namespaces")
+  parser.add_argument("--state-dir", default=None, help="Directory for LSDB checkpoints; enables warm restart")
+  parser.add_argument("--record", default=None, help="Record every received message to this file for offline replay")
+  parser.add_argument("--query-socket", default=None, help="Unix socket path for the read-only JSON query server")
+  parser.add_argument(
+      "--impair",
+      default=None,
+      help="Impairment file (YAML/JSON) injecting loss, delay and reordering per neighbor",
+  )
+  parser.add_argument("--profile-loop", action="store_true", help="Time every event loop callback from startup")
+  parser.add_argument(
+      "--slow-callback-ms",
+      type=float,
+      default=100.0,
+      help="Warn when a profiled callback runs longer than this",
+  )
   return parser.parse_args(argv)
 
 
@@ -67,19 +85,39 @@ def main(argv: list[str]) -> int:
 
   config = load_config(Path(args.config))
   loop = EventLoop()
+  if args.profile_loop:
+    loop.enable_profiling(args.slow_callback_ms / 1000)
   router = Router(
       router_id=args.router,
       config=config,
       event_loop=loop,
       dry_run=args.dry_run,
       single_process=args.single_process,
+      state_dir=args.state_dir,
   )
+  if args.record:
+    router.recorder = MessageRecorder(
+        Path(args.record),
+        router_id=args.router,
+        config=config,
+        single_process=args.single_process,
+    )
 
   cli = CliShell(router=router)
   cli_thread = threading.Thread(target=cli.run, name="cli", daemon=True)
 
   logging.info("启动路由器进程 %s", args.router)
   router.bootstrap()
+  # 劣化层包装已创建的套接字；拓扑文件中路由器自己的 impairment 段在未指定文件时生效。
+  router_config = config.get("routers", {}).get(args.router, {})
+  impairment = load_config(Path(args.impair)) if args.impair else router_config.get("impairment")
+  if impairment:
+    ImpairedTransport.from_config(loop, impairment).attach(router)
+    logging.warning("已启用链路劣化注入: %s", impairment)
+  query_server = None
+  if args.query_socket:
+    query_server = QueryServer(router.snapshots, loop, Path(args.query_socket))
+    query_server.start()
   cli_thread.start()
 
   try:
@@ -89,10 +127,14 @@ def main(argv: list[str]) -> int:
   finally:
     with contextlib.suppress(Exception):
       loop.stop()
+    if query_server is not None:
+      with contextlib.suppress(Exception):
+        query_server.close()
     with contextlib.suppress(Exception):
       router.shutdown()
     cli.stop()
     cli_thread.join(timeout=1)
+    loop.close()
 
   return 0
 
@@ -3,15 +3,20 @@
 
 正式协议使用裸 IP 封装，本实验为方便调试改用 UDP + JSON：既能
 直观观测内容，又能在保持结构化约束的同时快速实现校验逻辑。
+
+较大的 LSU 可将 ``lsas`` 列表压缩为 ``lsas_z`` 字段（zlib + 预置字典，
+base64 编码），是否启用由双方在 Hello ``options`` 中协商。
 """
 
 from __future__ import annotations
 
+import base64
+import binascii
 import json
 import zlib
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Dict, Iterable
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class MessageType(str, Enum):
@@ -151,6 +156,58 @@ def build_hello(router_id: str, area_id: str, **kwargs: Any) -> Message:
   )
 
 
+# 预置字典：LSA 的键名与常见片段。zlib 对靠近字典末尾的内容匹配代价
+# 更低，因此把出现最频繁的片段放在后面。
+LSA_COMPRESSION_DICT = (
+    b'"summary","prefixes":[{"metric":,"prefix":"'
+    b'"abr":true,"loopback_cost":0,"loopback":"/32",'
+    b'"networks":[{"interface":"","metric":,"prefix":"/24"},'
+    b'"links":[{"cost":,"interface":"","router_id":""},'
+    b'{"header":{"advertising_router":"","age":0,"checksum":,'
+    b'"lsa_id":"","lsa_type":"router","sequence":},"payload":{'
+)
+COMPRESSION_THRESHOLD = 1024  # 原始 JSON 超过该字节数的 LSU 才压缩
+# 解压后的上限：UDP 报文不超过 64 KiB，正常 LSU 的压缩比远低于 64 倍，
+# 超出即视为解压炸弹。
+MAX_DECOMPRESSED_BYTES = 4 * 1024 * 1024
+
+
+def compress_lsas(lsas: List[Dict[str, Any]], threshold: int = 0) -> Tuple[Optional[str], int]:
+  """
+  将 LSU 的 ``lsas`` 列表压缩为可放入 JSON 的字符串，同时返回原始 JSON 字节数。
+
+  原始大小低于 ``threshold`` 时不做压缩，返回的字符串为 None。
+  """
+  raw = json.dumps(lsas, sort_keys=True, separators=(",", ":")).encode("utf-8")
+  if len(raw) < threshold:
+    return None, len(raw)
+  compressor = zlib.compressobj(level=6, zdict=LSA_COMPRESSION_DICT)
+  packed = compressor.compress(raw) + compressor.flush()
+  return base64.b64encode(packed).decode("ascii"), len(raw)
+
+
+def decompress_lsas(blob: str, max_length: int = MAX_DECOMPRESSED_BYTES) -> List[Dict[str, Any]]:
+  """
+  还原 :func:`compress_lsas` 的结果，格式错误或解压后超过 ``max_length``
+  字节时抛出 :class:`MessageDecodeError`。
+  """
+  try:
+    packed = base64.b64decode(blob.encode("ascii"), validate=True)
+    decompressor = zlib.decompressobj(zdict=LSA_COMPRESSION_DICT)
+    raw = decompressor.decompress(packed, max_length)
+    if decompressor.unconsumed_tail:
+      raise MessageDecodeError(f"compressed lsas expand beyond {max_length} bytes")
+    raw += decompressor.flush()
+    lsas = json.loads(raw.decode("utf-8"))
+  except (binascii.Error, UnicodeError, zlib.error, json.JSONDecodeError) as exc:
+    raise MessageDecodeError(f"invalid compressed lsas: {exc}") from exc
+  try:
+    _ensure_list("lsas", lsas, dict)
+  except MessageValidationError as exc:
+    raise MessageDecodeError(str(exc)) from exc
+  return lsas
+
+
 # ------------------------------------------------------------------ helpers
 
 def _ensure_non_empty(field: str, value: Any, *, error_cls: type[MessageError] = MessageValidationError) -> None:
@@ -221,8 +278,12 @@ def _validate_lsr(payload: Dict[str, Any]) -> None:
 
 
 def _validate_lsu(payload: Dict[str, Any]) -> None:
-  _ensure_list("lsas", payload.get("lsas"), dict)
-  _ensure_known(payload, {"lsas", "more"})
+  if "lsas_z" in payload:
+    _ensure_optional(payload, "lsas_z", str)
+    _ensure_known(payload, {"lsas_z", "more"})
+  else:
+    _ensure_list("lsas", payload.get("lsas"), dict)
+    _ensure_known(payload, {"lsas", "more"})
   _ensure_optional(payload, "more", bool)
 
 
@@ -0,0 +1,38 @@
+"""
+路由进程内部的轻量级计数器。
+
+事件循环线程负责累加，CLI 与基准工具通过 :meth:`Metrics.snapshot` 读取
+一份拷贝；计数器名称使用 ``<子系统>.<指标>`` 的点分形式。
+"""
+
+from __future__ import annotations
+
+from typing import Dict
+
+
+class Metrics:
+  """
+  以名称索引的数值计数器集合。
+  """
+
+  def __init__(self) -> None:
+    self._values: Dict[str, float] = {}
+
+  def incr(self, name: str, value: float = 1) -> None:
+    self._values[name] = self._values.get(name, 0) + value
+
+  def set(self, name: str, value: float) -> None:
+    self._values[name] = value
+
+  def get(self, name: str) -> float:
+    return self._values.get(name, 0)
+
+  def ratio(self, numerator: str, denominator: str) -> float:
+    """返回两个计数器之比，分母为 0 时返回 0。"""
+    total = self._values.get(denominator, 0)
+    if not total:
+      return 0.0
+    return self._values.get(numerator, 0) / total
+
+  def snapshot(self) -> Dict[str, float]:
+    return dict(self._values)
@@ -0,0 +1,208 @@
+"""
+LSDB 检查点持久化，用于路由进程的热重启。
+
+检查点文件是一个只追加的记录日志，每条记录由 ``!BI`` 头部（记录类型、
+正文长度）和 zlib 压缩的 JSON 正文组成：
+
+- ``LSA``：安装或更新某个 Area 中的一条 LSA，附带写入时的墙钟时间以便恢复 age；
+- ``DELETE``：LSA 已从 LSDB 中移除；
+- ``SEQUENCE``：本路由器 LSA 序列号的预留上限。
+
+每次检查点只追加与上次相比发生变化的条目；当日志中失效记录过多时，
+整体重写为紧凑快照并原子替换。进程崩溃导致的残缺尾部会在加载时被忽略。
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import struct
+import time
+import zlib
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from . import timers
+from .lsdb import Lsa, LinkStateDatabase
+
+LOGGER = logging.getLogger(__name__)
+
+RECORD_LSA = 1
+RECORD_DELETE = 2
+RECORD_SEQUENCE = 3
+
+# 每次落盘预留的序列号数量。重启后从预留上限继续编号，保证单调递增，
+# 而无需在每次生成 LSA 时都写盘。
+SEQUENCE_RESERVE = 1024
+
+_RECORD_HEADER = struct.Struct("!BI")
+_COMPACT_MIN_RECORDS = 64
+
+
+class LsdbCheckpoint:
+  """
+  将 LSDB 与自有序列号周期性写入 ``path`` 指向的检查点文件。
+  """
+
+  def __init__(self, path: Path) -> None:
+    self.path = Path(path)
+    self._stream: Optional[BinaryIO] = None
+    self._written: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+    self._records = 0
+    self._sequence_reserved = 0
+
+  @property
+  def sequence_reserved(self) -> int:
+    return self._sequence_reserved
+
+  # ------------------------------------------------------------------ load
+  def load(self) -> Tuple[Dict[str, List[Lsa]], int]:
+    """
+    读取检查点，返回按 Area 分组且仍未过期的 LSA 以及已预留的序列号上限。
+
+    LSA 的 age 会加上自写入以来经过的时间；达到 MaxAge 的条目直接丢弃。
+    """
+    lsas: Dict[Tuple[str, str, str], Tuple[Lsa, float]] = {}
+    sequence = 0
+    records = 0
+    if self.path.exists():
+      with self.path.open("rb") as stream:
+        for kind, body in _read_records(stream):
+          records += 1
+          if kind == RECORD_LSA:
+            lsa = LinkStateDatabase.from_message_payload(body)
+            key = (str(body.get("area")), *lsa.fingerprint())
+            lsas[key] = (lsa, float(body.get("saved_at", 0.0)))
+          elif kind == RECORD_DELETE:
+            lsas.pop(tuple(body.get("key", ())), None)
+          elif kind == RECORD_SEQUENCE:
+            sequence = max(sequence, int(body.get("sequence", 0)))
+
+    now = time.time()
+    restored: Dict[str, List[Lsa]] = {}
+    for key, (lsa, saved_at) in lsas.items():
+      lsa.header.age += max(0, int(now - saved_at))
+      if lsa.header.age >= timers.MAX_AGE:
+        continue
+      restored.setdefault(key[0], []).append(lsa)
+      self._written[key] = (lsa.header.sequence, lsa.header.checksum)
+    self._records = records
+    self._sequence_reserved = sequence
+    LOGGER.info(
+        "从 %s 恢复 %d 条 LSA，序列号上限 %#x",
+        self.path,
+        sum(len(area_lsas) for area_lsas in restored.values()),
+        sequence,
+    )
+    return restored, sequence
+
+  # ----------------------------------------------------------------- write
+  def reserve_sequence(self, sequence: int) -> int:
+    """
+    为 ``sequence`` 之后的 LSA 预留一段序列号并立即落盘，返回新的上限。
+    """
+    self._sequence_reserved = sequence + SEQUENCE_RESERVE
+    self._append(RECORD_SEQUENCE, {"sequence": self._sequence_reserved})
+    self._flush()
+    return self._sequence_reserved
+
+  def checkpoint(self, lsdbs: Dict[str, LinkStateDatabase]) -> int:
+    """
+    追加各 Area 自上次检查点以来发生变化的 LSA，返回写入的记录数。
+    """
+    snapshot = {
+        (area_id, *key): lsa
+        for area_id, lsdb in lsdbs.items()
+        for key, lsa in lsdb.snapshot().items()
+    }
+    if self._records > max(_COMPACT_MIN_RECORDS, 2 * len(snapshot)):
+      return self._compact(snapshot)
+
+    now = time.time()
+    written = 0
+    for key, lsa in snapshot.items():
+      version = (lsa.header.sequence, lsa.header.checksum)
+      if self._written.get(key) == version:
+        continue
+      self._append(RECORD_LSA, _lsa_record(key[0], lsa, now))
+      self._written[key] = version
+      written += 1
+    for key in [key for key in self._written if key not in snapshot]:
+      self._append(RECORD_DELETE, {"key": list(key)})
+      del self._written[key]
+      written += 1
+    if written:
+      self._flush()
+    return written
+
+  def close(self) -> None:
+    if self._stream is not None:
+      self._stream.close()
+      self._stream = None
+
+  # ------------------------------------------------------------- internals
+  def _compact(self, snapshot: Dict[Tuple[str, str, str], Lsa]) -> int:
+    """将当前 LSDB 重写为紧凑检查点，并原子替换旧文件。"""
+    self.close()
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = self.path.with_name(self.path.name + ".tmp")
+    now = time.time()
+    written: Dict[Tuple[str, str, str], Tuple[int, int]] = {}
+    with tmp_path.open("wb") as stream:
+      _write_record(stream, RECORD_SEQUENCE, {"sequence": self._sequence_reserved})
+      for key, lsa in snapshot.items():
+        _write_record(stream, RECORD_LSA, _lsa_record(key[0], lsa, now))
+        written[key] = (lsa.header.sequence, lsa.header.checksum)
+      stream.flush()
+      os.fsync(stream.fileno())
+    os.replace(tmp_path, self.path)
+    self._written = written
+    self._records = len(written) + 1
+    LOGGER.debug("检查点 %s 已压缩为 %d 条记录", self.path, self._records)
+    return self._records
+
+  def _append(self, kind: int, body: Dict[str, object]) -> None:
+    if self._stream is None:
+      self.path.parent.mkdir(parents=True, exist_ok=True)
+      self._stream = self.path.open("ab")
+    _write_record(self._stream, kind, body)
+    self._records += 1
+
+  def _flush(self) -> None:
+    if self._stream is None:
+      return
+    self._stream.flush()
+    os.fsync(self._stream.fileno())
+
+
+def _lsa_record(area_id: str, lsa: Lsa, now: float) -> Dict[str, object]:
+  record = LinkStateDatabase.to_message_payload(lsa)
+  record["area"] = area_id
+  record["saved_at"] = now
+  return record
+
+
+def _write_record(stream: BinaryIO, kind: int, body: Dict[str, object]) -> None:
+  encoded = zlib.compress(json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8"))
+  stream.write(_RECORD_HEADER.pack(kind, len(encoded)))
+  stream.write(encoded)
+
+
+def _read_records(stream: BinaryIO):
+  while True:
+    head = stream.read(_RECORD_HEADER.size)
+    if len(head) < _RECORD_HEADER.size:
+      return
+    kind, length = _RECORD_HEADER.unpack(head)
+    raw = stream.read(length)
+    if len(raw) < length:
+      LOGGER.warning("检查点尾部记录不完整，已忽略")
+      return
+    try:
+      body = json.loads(zlib.decompress(raw).decode("utf-8"))
+    except (zlib.error, UnicodeDecodeError, json.JSONDecodeError):
+      LOGGER.warning("检查点记录损坏，停止读取")
+      return
+    if isinstance(body, dict):
+      yield kind, body
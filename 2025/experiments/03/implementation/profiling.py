@@ -0,0 +1,133 @@
+"""
+事件循环的可选性能剖析。
+
+Hello 迟到、邻接抖动时，需要知道是 ``run_spf``、LSU 处理还是日志阻塞了
+循环。:class:`LoopProfiler` 挂到 :class:`~implementation.events.EventLoop`
+上后，循环对每个回调计时并按回调名称分组，同时记录定时器的迟到时间与
+``select`` 的等待时间；单个回调超过阈值时输出告警。
+
+所有数据都记录在固定边界的 :class:`Histogram` 中，内存占用与运行时长无关。
+剖析器只应在事件循环线程中读写，其他线程通过 ``loop.call_threadsafe`` 读取。
+"""
+
+from __future__ import annotations
+
+import bisect
+import functools
+import logging
+from typing import Callable, Dict, List, Tuple
+
+LOGGER = logging.getLogger(__name__)
+
+# 直方图桶的上界（秒），最后一个桶收纳所有更大的值。
+BUCKET_BOUNDS: Tuple[float, ...] = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float("inf"),
+)
+
+
+class Histogram:
+  """以 :data:`BUCKET_BOUNDS` 为边界的计数直方图，另记总和与最大值。"""
+
+  __slots__ = ("counts", "count", "total", "max")
+
+  def __init__(self) -> None:
+    self.counts = [0] * len(BUCKET_BOUNDS)
+    self.count = 0
+    self.total = 0.0
+    self.max = 0.0
+
+  def record(self, value: float) -> None:
+    self.counts[bisect.bisect_left(BUCKET_BOUNDS, value)] += 1
+    self.count += 1
+    self.total += value
+    if value > self.max:
+      self.max = value
+
+  def percentile(self, fraction: float) -> float:
+    """返回 ``fraction`` 分位所在桶的上界（最后一个桶取最大值）。"""
+    if not self.count:
+      return 0.0
+    rank = fraction * self.count
+    seen = 0
+    for bound, count in zip(BUCKET_BOUNDS, self.counts):
+      seen += count
+      if seen >= rank:
+        return min(bound, self.max)
+    return self.max
+
+  def summary(self) -> Dict[str, float]:
+    return {
+        "count": self.count,
+        "total_s": self.total,
+        "mean_s": self.total / self.count if self.count else 0.0,
+        "p50_s": self.percentile(0.5),
+        "p99_s": self.percentile(0.99),
+        "max_s": self.max,
+    }
+
+
+def callback_name(callback: Callable[..., object]) -> str:
+  """回调的分组名称：展开 ``functools.partial``，取函数所在模块与限定名。"""
+  while isinstance(callback, functools.partial):
+    callback = callback.func
+  func = getattr(callback, "__func__", callback)
+  qualname = getattr(func, "__qualname__", None) or type(callback).__qualname__
+  module = getattr(func, "__module__", None)
+  if module:
+    return f"{module.rpartition('.')[2]}.{qualname}"
+  return qualname
+
+
+class LoopProfiler:
+  """
+  按回调名称统计执行时间，并记录定时器迟到与 ``select`` 等待时间。
+
+  ``slow_threshold`` 为慢回调告警阈值（秒），0 表示不告警。
+  """
+
+  def __init__(self, slow_threshold: float = 0.1) -> None:
+    self.slow_threshold = slow_threshold
+    self.callbacks: Dict[str, Histogram] = {}
+    self.lateness = Histogram()
+    self.select_wait = Histogram()
+    self.slow_callbacks = 0
+
+  def record_callback(self, callback: Callable[..., object], elapsed: float) -> None:
+    name = callback_name(callback)
+    histogram = self.callbacks.get(name)
+    if histogram is None:
+      histogram = self.callbacks[name] = Histogram()
+    histogram.record(elapsed)
+    if self.slow_threshold and elapsed > self.slow_threshold:
+      self.slow_callbacks += 1
+      LOGGER.warning("回调 %s 执行 %.1f ms，超过阈值 %.1f ms", name, elapsed * 1000, self.slow_threshold * 1000)
+
+  def record_lateness(self, lateness: float) -> None:
+    self.lateness.record(max(0.0, lateness))
+
+  def record_select_wait(self, elapsed: float) -> None:
+    self.select_wait.record(elapsed)
+
+  def top(self, limit: int = 10, key: str = "total_s") -> List[Dict[str, object]]:
+    """按 ``key``（``total_s``、``max_s``、``p99_s`` 或 ``count``）降序返回前 ``limit`` 个。"""
+    rows: List[Dict[str, object]] = [
+        {"name": name, **histogram.summary()} for name, histogram in self.callbacks.items()
+    ]
+    rows.sort(key=lambda row: row[key], reverse=True)  # type: ignore[arg-type, return-value]
+    return rows[:limit]
+
+  def report(self, limit: int = 10) -> Dict[str, object]:
+    return {
+        "callbacks": self.top(limit),
+        "lateness": self.lateness.summary(),
+        "select_wait": self.select_wait.summary(),
+        "slow_callbacks": self.slow_callbacks,
+        "slow_threshold_s": self.slow_threshold,
+    }
+
+  def reset(self) -> None:
+    self.callbacks.clear()
+    self.lateness = Histogram()
+    self.select_wait = Histogram()
+    self.slow_callbacks = 0
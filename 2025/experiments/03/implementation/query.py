@@ -0,0 +1,212 @@
+"""
+基于 Unix 域套接字的本地只读查询服务。
+
+服务端由 :class:`~implementation.events.EventLoop` 驱动，只读取
+:class:`~implementation.snapshot.SnapshotPublisher` 已发布的快照，因此无需加锁，
+也不会触碰路由器的可变状态。协议按行收发，每个请求一行，每个响应为一行 JSON：
+
+- 文本形式：``routes``、``fib``、``neighbors``、``lsdb``、``all`` 或 ``generation``，
+  可附加 ``since=<generation>`` 请求增量，例如 ``routes since=42``；
+- JSON 形式：``{"query": "routes", "since": 42}``。
+
+全量响应为 ``{"generation", "timestamp", "full": true, "sections": {...}}``；
+增量响应中每个分区给出 ``changed`` 与 ``removed``，若 ``since`` 已超出发布器
+保留的历史则自动退化为全量（``full: true``）。
+
+示例::
+
+  printf 'routes since=0\\n' | nc -U /tmp/r1.sock
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from .events import EventLoop
+from .snapshot import SECTIONS, SnapshotPublisher
+
+LOGGER = logging.getLogger(__name__)
+
+_MAX_REQUEST = 4096
+# 单个客户端未发送完的响应上限；超过说明客户端不再读取，直接断开。
+_MAX_PENDING = 8 * 1024 * 1024
+
+
+class QueryError(ValueError):
+  pass
+
+
+class QueryServer:
+  """
+  在 ``path`` 上监听查询请求，以 JSON 返回快照内容。
+  """
+
+  def __init__(self, publisher: SnapshotPublisher, loop: EventLoop, path: Path) -> None:
+    self.publisher = publisher
+    self.loop = loop
+    self.path = Path(path)
+    self._listener: Optional[socket.socket] = None
+    self._clients: Dict[socket.socket, bytearray] = {}
+    self._outbound: Dict[socket.socket, bytearray] = {}
+    self._unregister: Dict[socket.socket, Callable[[], None]] = {}
+
+  def start(self) -> None:
+    if self.path.exists():
+      self.path.unlink()
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(self.path))
+    listener.listen(16)
+    self._listener = listener
+    self._unregister[listener] = self.loop.register_socket(listener, self._on_accept)
+    LOGGER.info("查询服务监听 %s", self.path)
+
+  def close(self) -> None:
+    for client in list(self._clients):
+      self._drop(client)
+    if self._listener is not None:
+      self._unregister.pop(self._listener)()
+      self._listener.close()
+      self._listener = None
+      try:
+        os.unlink(self.path)
+      except OSError:
+        pass
+
+  # ------------------------------------------------------------- protocol
+  def handle(self, line: str) -> Dict[str, object]:
+    """解析一行请求并返回响应对象；请求非法时返回带 ``error`` 的对象。"""
+    try:
+      query, since = _parse_request(line)
+    except QueryError as exc:
+      return {"error": str(exc)}
+    snapshot = self.publisher.current
+    if query == "generation":
+      return {"generation": snapshot.generation, "timestamp": snapshot.timestamp}
+    names = SECTIONS if query == "all" else (query,)
+    if since is not None:
+      return self.publisher.delta(since, names)
+    return {
+        "generation": snapshot.generation,
+        "timestamp": snapshot.timestamp,
+        "full": True,
+        "sections": {name: snapshot.sections[name] for name in names},
+    }
+
+  # ------------------------------------------------------------ callbacks
+  def _on_accept(self, listener: socket.socket) -> None:
+    try:
+      client, _ = listener.accept()
+    except OSError as exc:
+      LOGGER.debug("接受查询连接失败: %s", exc)
+      return
+    self._clients[client] = bytearray()
+    self._outbound[client] = bytearray()
+    self._unregister[client] = self.loop.register_socket(client, self._on_client_readable)
+
+  def _on_client_readable(self, client: socket.socket) -> None:
+    try:
+      data = client.recv(_MAX_REQUEST)
+    except BlockingIOError:
+      return
+    except OSError:
+      data = b""
+    if not data:
+      self._drop(client)
+      return
+    buffer = self._clients[client]
+    buffer.extend(data)
+    while b"\n" in buffer:
+      line, _, rest = bytes(buffer).partition(b"\n")
+      buffer[:] = rest
+      response = self.handle(line.decode("utf-8", errors="replace"))
+      if not self._reply(client, response):
+        return
+    if len(buffer) > _MAX_REQUEST:
+      self._reply(client, {"error": "request too long"})
+      self._drop(client)
+
+  def _reply(self, client: socket.socket, response: Dict[str, object]) -> bool:
+    encoded = json.dumps(response, separators=(",", ":"), default=dict).encode("utf-8") + b"\n"
+    # 套接字保持非阻塞：发不完的部分留在客户端的发送缓冲中，等可写事件再继续。
+    pending = self._outbound[client]
+    if not pending:
+      try:
+        sent = client.send(encoded)
+      except (BlockingIOError, InterruptedError):
+        sent = 0
+      except OSError as exc:
+        LOGGER.debug("查询响应发送失败: %s", exc)
+        self._drop(client)
+        return False
+      if sent == len(encoded):
+        return True
+      encoded = encoded[sent:]
+      self.loop.watch_writable(client, self._on_client_writable)
+    pending.extend(encoded)
+    if len(pending) > _MAX_PENDING:
+      LOGGER.debug("查询客户端积压 %d 字节未读取，断开连接", len(pending))
+      self._drop(client)
+      return False
+    return True
+
+  def _on_client_writable(self, client: socket.socket) -> None:
+    pending = self._outbound.get(client)
+    if not pending:
+      return
+    try:
+      sent = client.send(pending)
+    except (BlockingIOError, InterruptedError):
+      sent = 0
+    except OSError as exc:
+      LOGGER.debug("查询响应发送失败: %s", exc)
+      self._drop(client)
+      return
+    del pending[:sent]
+    if pending:
+      self.loop.watch_writable(client, self._on_client_writable)
+
+  def _drop(self, client: socket.socket) -> None:
+    self._clients.pop(client, None)
+    self._outbound.pop(client, None)
+    unregister = self._unregister.pop(client, None)
+    if unregister is not None:
+      unregister()
+    client.close()
+
+
+def _parse_request(line: str) -> Tuple[str, Optional[int]]:
+  line = line.strip()
+  if not line:
+    raise QueryError("empty request")
+  if line.startswith("{"):
+    try:
+      request = json.loads(line)
+    except json.JSONDecodeError as exc:
+      raise QueryError(f"invalid JSON request: {exc}") from exc
+    if not isinstance(request, dict):
+      raise QueryError("request must be an object")
+    query = str(request.get("query", ""))
+    since_raw = request.get("since")
+  else:
+    tokens = line.split()
+    query = tokens[0]
+    since_raw = None
+    for token in tokens[1:]:
+      name, sep, value = token.partition("=")
+      if name != "since" or not sep:
+        raise QueryError(f"unknown argument {token!r}")
+      since_raw = value
+  if query not in SECTIONS and query not in ("all", "generation"):
+    raise QueryError(f"unknown query {query!r}")
+  if since_raw is None:
+    return query, None
+  try:
+    return query, int(since_raw)
+  except (TypeError, ValueError) as exc:
+    raise QueryError(f"invalid generation {since_raw!r}") from exc
@@ -0,0 +1,255 @@
+"""
+路由器报文的录制与离线回放工具。
+
+录制：为 ``Router.recorder`` 设置 :class:`MessageRecorder` 后，套接字收到的
+每个 UDP 载荷连同时间戳与来源地址写入紧凑二进制日志。文件结构：
+
+- 8 字节魔数 ``OSPFREC1``；
+- ``!I`` 长度 + JSON 头部，记录 router_id 与拓扑配置，回放时无需额外参数；
+- 若干条记录，每条为 ``!dIHI``（时间戳、IPv4 源地址、源端口、载荷长度）
+  加原始载荷字节。
+
+回放：在不创建套接字的新 Router 上按顺序注入记录，可选择全速或按录制
+时的节奏回放，并统计 ``process_message``、``LinkStateDatabase.install`` 与
+``run_spf`` 的耗时，用于确定性的吞吐基准与热路径改动前后的对比。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.replay capture.bin [--realtime] [--spf inline|deferred] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import socket
+import struct
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Iterator, Optional, Tuple
+
+from .events import EventLoop
+from .router import Router
+
+LOGGER = logging.getLogger(__name__)
+
+MAGIC = b"OSPFREC1"
+_LENGTH = struct.Struct("!I")
+_RECORD = struct.Struct("!dIHI")
+
+
+@dataclass
+class RecordedDatagram:
+  timestamp: float
+  src: Tuple[str, int]
+  data: bytes
+
+
+class MessageRecorder:
+  """
+  将路由器收到的原始报文追加写入录制文件。
+  """
+
+  def __init__(self, path: Path, *, router_id: str, config: Dict[str, object], single_process: bool = False) -> None:
+    self.path = Path(path)
+    self.path.parent.mkdir(parents=True, exist_ok=True)
+    self._stream: Optional[BinaryIO] = self.path.open("wb")
+    header = json.dumps(
+        {"router_id": router_id, "config": config, "single_process": single_process},
+        sort_keys=True,
+        separators=(",", ":"),
+    ).encode("utf-8")
+    self._stream.write(MAGIC)
+    self._stream.write(_LENGTH.pack(len(header)))
+    self._stream.write(header)
+    self.count = 0
+
+  def record(self, timestamp: float, addr: Tuple[str, int], data: bytes) -> None:
+    if self._stream is None:
+      return
+    try:
+      ip = struct.unpack("!I", socket.inet_aton(addr[0]))[0]
+    except OSError:
+      ip = 0
+    self._stream.write(_RECORD.pack(timestamp, ip, int(addr[1]), len(data)))
+    self._stream.write(data)
+    self.count += 1
+
+  def close(self) -> None:
+    if self._stream is not None:
+      self._stream.close()
+      self._stream = None
+
+
+def read_recording(path: Path) -> Tuple[Dict[str, object], Iterator[RecordedDatagram]]:
+  """
+  打开录制文件，返回头部信息与逐条记录的迭代器。
+  """
+  stream = Path(path).open("rb")
+  if stream.read(len(MAGIC)) != MAGIC:
+    stream.close()
+    raise ValueError(f"{path} is not a router message recording")
+  (length,) = _LENGTH.unpack(stream.read(_LENGTH.size))
+  header = json.loads(stream.read(length).decode("utf-8"))
+
+  def records() -> Iterator[RecordedDatagram]:
+    with stream:
+      while True:
+        head = stream.read(_RECORD.size)
+        if len(head) < _RECORD.size:
+          return
+        timestamp, ip, port, size = _RECORD.unpack(head)
+        data = stream.read(size)
+        if len(data) < size:
+          LOGGER.warning("录制文件尾部不完整，已忽略")
+          return
+        yield RecordedDatagram(timestamp, (socket.inet_ntoa(struct.pack("!I", ip)), port), data)
+
+  return header, records()
+
+
+class _NullSocket:
+  """替代 UDP 套接字，仅统计回放期间路由器试图发出的报文。"""
+
+  def __init__(self) -> None:
+    self.sent = 0
+    self.sent_bytes = 0
+
+  def sendto(self, data: bytes, _addr: Tuple[str, int]) -> int:
+    self.sent += 1
+    self.sent_bytes += len(data)
+    return len(data)
+
+  def close(self) -> None:
+    pass
+
+
+@dataclass
+class _Timing:
+  calls: int = 0
+  seconds: float = 0.0
+
+  def wrap(self, func: Callable) -> Callable:
+    def timed(*args, **kwargs):
+      start = time.perf_counter()
+      try:
+        return func(*args, **kwargs)
+      finally:
+        self.seconds += time.perf_counter() - start
+        self.calls += 1
+    return timed
+
+
+@dataclass
+class ReplayReport:
+  messages: int = 0
+  elapsed: float = 0.0
+  sent: int = 0
+  sent_bytes: int = 0
+  routes: int = 0
+  timings: Dict[str, _Timing] = field(default_factory=dict)
+
+  def as_dict(self) -> Dict[str, object]:
+    return {
+        "messages": self.messages,
+        "elapsed_s": round(self.elapsed, 6),
+        "messages_per_s": round(self.messages / self.elapsed, 1) if self.elapsed else None,
+        "sent": self.sent,
+        "sent_bytes": self.sent_bytes,
+        "routes": self.routes,
+        "timings": {
+            name: {
+                "calls": timing.calls,
+                "total_s": round(timing.seconds, 6),
+                "mean_us": round(timing.seconds / timing.calls * 1e6, 2) if timing.calls else None,
+            }
+            for name, timing in self.timings.items()
+        },
+    }
+
+
+def replay(
+    header: Dict[str, object],
+    records: Iterator[RecordedDatagram],
+    *,
+    realtime: bool = False,
+    spf_mode: str = "inline",
+) -> ReplayReport:
+  """
+  在全新的 Router 上回放录制的报文。
+
+  ``spf_mode`` 为 ``inline`` 时每条报文处理后立即执行被调度的 SPF，保证
+  结果与时钟无关；``deferred`` 时仅在回放结束后统一执行一次。
+  """
+  loop = EventLoop()
+  router = Router(
+      router_id=str(header["router_id"]),
+      config=dict(header["config"]),  # type: ignore[arg-type]
+      event_loop=loop,
+      dry_run=True,
+      single_process=bool(header.get("single_process", False)),
+  )
+  router.bootstrap(bind=False)
+  null_socket = _NullSocket()
+  router._socket = null_socket  # type: ignore[assignment]
+
+  report = ReplayReport()
+  timings = {name: _Timing() for name in ("process_message", "lsdb.install", "run_spf")}
+  report.timings = timings
+  router.process_message = timings["process_message"].wrap(router.process_message)  # type: ignore[method-assign]
+  router.run_spf = timings["run_spf"].wrap(router.run_spf)  # type: ignore[method-assign]
+  for area in router.areas.values():
+    area.lsdb.install = timings["lsdb.install"].wrap(area.lsdb.install)  # type: ignore[method-assign]
+
+  start = time.perf_counter()
+  first_ts: Optional[float] = None
+  for record in records:
+    if realtime:
+      if first_ts is None:
+        first_ts = record.timestamp
+      due = start + (record.timestamp - first_ts)
+      while (remaining := due - time.perf_counter()) > 0:
+        loop.run_pending()
+        time.sleep(min(remaining, 0.01))
+    router._handle_datagram(record.data, record.src)
+    report.messages += 1
+    # 收到的 LSU 先进入待安装批次，由事件循环的就绪队列安装；快速模式也需执行。
+    loop.run_pending()
+    if not realtime and spf_mode == "inline":
+      router.flush_spf()
+  loop.run_pending()
+  router.flush_spf()
+  report.elapsed = time.perf_counter() - start
+  report.sent = null_socket.sent
+  report.sent_bytes = null_socket.sent_bytes
+  report.routes = len(router.routes)
+  return report
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Replay a recorded router message log without sockets.")
+  parser.add_argument("recording", help="File produced by main.py --record")
+  parser.add_argument("--realtime", action="store_true", help="Replay at the recorded pace instead of as fast as possible")
+  parser.add_argument("--spf", choices=["inline", "deferred"], default="inline", help="When to run scheduled SPF in fast mode")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.WARNING)
+  header, records = read_recording(Path(args.recording))
+  report = replay(header, records, realtime=args.realtime, spf_mode=args.spf)
+  result = report.as_dict()
+  if args.json:
+    print(json.dumps(result, sort_keys=True))
+    return 0
+  print(f"messages {result['messages']} in {result['elapsed_s']}s ({result['messages_per_s']} msg/s)")
+  print(f"sent {result['sent']} messages / {result['sent_bytes']} bytes, routes {result['routes']}")
+  for name, timing in result["timings"].items():  # type: ignore[union-attr]
+    print(f"{name:16s} calls={timing['calls']:<8d} total={timing['total_s']}s mean={timing['mean_us']}us")
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -5,28 +5,73 @@
 1. 解析拓扑配置，初始化接口与邻居； 
 2. 通过 Hello 报文维护邻接状态并感知拓扑变化；
 3. 管理本地 LSDB，完成 LSA 的生成、安装与泛洪；
-4. 定期运行 SPF 计算最短路径树，生成实验用的转发表视图。
+4. 定期运行 SPF 计算最短路径树（大规模拓扑可交给子进程），生成路由表，
+   并聚合为条目更少的转发表；
+5. 接口分属多个 Area 时作为 ABR，按 Area 维护 LSDB 并生成 Summary LSA；
+6. 在广播网段上选举 DR/BDR，由 DR 生成 Network LSA 并负责网段内的泛洪。
 """
 
 from __future__ import annotations
 
+import functools
 import ipaddress
 import logging
+import multiprocessing
+import random
 import socket
 import time
-from dataclasses import dataclass, field
-from heapq import heappop, heappush
-from typing import Callable, Dict, Iterable, List, Optional, Tuple
-
-from .adjacency import Adjacency, NeighborState
+from array import array
+from collections import OrderedDict
+from concurrent.futures import BrokenExecutor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, TypeVar
+
+from .adjacency import Adjacency, ElectionCandidate, NeighborState, elect_designated_routers
+from .bfd import BfdManager, is_bfd_packet
+from .compact import (
+    UNREACHABLE,
+    CsrGraph,
+    Prefix,
+    RouterIdTable,
+    changed_vertices,
+    drop_links,
+    format_prefix,
+    loop_free_alternates,
+    loop_free_alternates_packed,
+    network_vertex,
+    pack_links,
+    parse_prefix,
+    shortest_paths,
+    shortest_paths_packed,
+    unpack_paths,
+)
 from .events import EventLoop
+from .fib import Fib, build_fib
+from .flooding import FloodingTopology, build_flooding_topology
 from .lsdb import Lsa, LsaHeader, LinkStateDatabase
+from .metrics import Metrics
+from .persist import LsdbCheckpoint
+from .snapshot import SnapshotPublisher
+from .transmit import DEFAULT_BURST, DEFAULT_QUEUE_DEPTH, Transmitter
 from . import message, timers
 
+if TYPE_CHECKING:
+  from .replay import MessageRecorder
+
 LOGGER = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 DEFAULT_OSPF_PORT = 5000
 _SINGLE_PROCESS_BASE_PORT = 55000
+BACKBONE_AREA = "0.0.0.0"
+# 保活报文走发送队列的加急通道，不排在整库同步的 LSU 之后。
+_URGENT_KINDS = frozenset({"hello", "bfd"})
+# 套接字每次可读时最多连续读取的报文数。
+_RECV_BURST = 64
+POINT_TO_POINT = "point-to-point"
+BROADCAST = "broadcast"
 
 
 @dataclass
@@ -44,6 +89,78 @@ class InterfaceConfig:
   hello_interval: Optional[int] = None
   dead_interval: Optional[int] = None
   priority: int = 1
+  area: str = BACKBONE_AREA
+  network_type: str = POINT_TO_POINT
+
+
+@dataclass
+class _SpfState:
+  """
+  上一次 SPF 的中间结果，用于区分拓扑变化与仅前缀变化。
+
+  路由器以 :class:`RouterIdTable` 中的整数下标表示，链路为交错数组，
+  前缀为整数二元组；字符串只在生成路由条目时出现。
+  """
+  versions: Dict[Tuple[str, str], Tuple[int, int]] = field(default_factory=dict)
+  # 自上次 SPF 以来被安装或移除的 LSDB 键，由 LSDB 变更回调填充。
+  dirty: set[Tuple[str, str]] = field(default_factory=set)
+  ids: RouterIdTable = field(default_factory=RouterIdTable)
+  links: Dict[int, array] = field(default_factory=dict)
+  graph: Optional[CsrGraph] = None
+  prefixes: Dict[int, Dict[Prefix, int]] = field(default_factory=dict)
+  candidates: Dict[Prefix, Dict[int, int]] = field(default_factory=dict)
+  summaries: Dict[int, Dict[str, int]] = field(default_factory=dict)
+  dist: Optional[array] = None
+  first_hop: Optional[array] = None
+  recompute: bool = False
+  # 每次重算拓扑递增；交给子进程的 SPF 结果只有 generation 仍为最新时才生效。
+  generation: int = 0
+  pending: Optional[int] = None
+  # 等待子进程结果期间积累、需在结果生效时重新选路的前缀。
+  deferred: set[Prefix] = field(default_factory=set)
+  # 无环备份（LFA）：以各直连邻居为根的距离、每个目的路由器的备份首跳与代价、
+  # 以及按前缀预先生成的备份路由条目。
+  neighbor_dist: Dict[int, array] = field(default_factory=dict)
+  router_alternates: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+  alternates: Dict[str, Dict[str, object]] = field(default_factory=dict)
+  lfa_task: Optional[object] = None
+  # 最短路径结果的 LRU 缓存，键为 (LSDB 拓扑摘要, 顶点数)，最近使用的排在末尾。
+  cache: "OrderedDict[Tuple[int, int], Tuple[CsrGraph, Tuple[array, array]]]" = field(default_factory=OrderedDict)
+  # 邻接断开后临时摘除了自有链路，自有 Router LSA 重新生成前拓扑与 LSDB 不一致，不查缓存。
+  links_overridden: bool = False
+
+  def set_prefixes(self, adv: int, prefixes: Dict[Prefix, int]) -> set[Prefix]:
+    """替换 ``adv`` 通告的前缀集合，返回发生变化的前缀。"""
+    old = self.prefixes.pop(adv, {})
+    if prefixes:
+      self.prefixes[adv] = prefixes
+    changed = {p for p in old.keys() | prefixes.keys() if old.get(p) != prefixes.get(p)}
+    for prefix in changed:
+      advertisers = self.candidates.setdefault(prefix, {})
+      if prefix in prefixes:
+        advertisers[adv] = prefixes[prefix]
+      else:
+        advertisers.pop(adv, None)
+        if not advertisers:
+          del self.candidates[prefix]
+    return changed
+
+  def distance(self, index: Optional[int]) -> Optional[int]:
+    """到下标 ``index`` 的最短距离，不可达时返回 None。"""
+    if index is None or self.dist is None or index >= len(self.dist):
+      return None
+    cost = self.dist[index]
+    return None if cost >= UNREACHABLE else cost
+
+  def hop(self, index: Optional[int]) -> Optional[int]:
+    if index is None or self.first_hop is None or index >= len(self.first_hop):
+      return None
+    hop = self.first_hop[index]
+    return None if hop < 0 else hop
+
+  def hop_name(self, index: Optional[int]) -> Optional[str]:
+    hop = self.hop(index)
+    return None if hop is None else self.ids.name(hop)
 
 
 @dataclass
@@ -52,6 +169,32 @@ class InterfaceState:
   address: ipaddress.IPv4Interface
   adjacency: Dict[str, Adjacency] = field(default_factory=dict)
   neighbors: Dict[str, NeighborConfig] = field(default_factory=dict)
+  # 广播网段的选举结果；waiting 期间只收集 Hello，不参与选举。
+  dr: Optional[str] = None
+  bdr: Optional[str] = None
+  waiting: bool = False
+
+  @property
+  def broadcast(self) -> bool:
+    return self.config.network_type == BROADCAST
+
+
+@dataclass
+class AreaState:
+  """单个 Area 的 LSDB、SPF 结果与区域内路由。"""
+  area_id: str
+  lsdb: LinkStateDatabase = field(default_factory=LinkStateDatabase)
+  interfaces: Dict[str, InterfaceState] = field(default_factory=dict)
+  ranges: List[ipaddress.IPv4Network] = field(default_factory=list)
+  spf: _SpfState = field(default_factory=_SpfState)
+  routes: Dict[str, Dict[str, object]] = field(default_factory=dict)
+  # 精简泛洪：各路由器 Router LSA 通告的邻居、Router LSA 有变化待刷新的路由器，
+  # 以及由前者计算的泛洪子图。
+  flood_links: Dict[str, frozenset[str]] = field(default_factory=dict)
+  flood_dirty: set[str] = field(default_factory=set)
+  flooding: Optional[FloodingTopology] = None
+  # 本轮事件循环中收到、尚未安装的 LSA，按 (type, id) 只保留最新实例及其来源邻居与接口。
+  lsu_batch: Dict[Tuple[str, str], Tuple[Lsa, str, Optional[InterfaceState]]] = field(default_factory=dict)
 
 
 class Router:
@@ -67,43 +210,129 @@ class Router:
       *,
       dry_run: bool = False,
       single_process: bool = False,
+      state_dir: Optional[str] = None,
   ) -> None:
     self.router_id = router_id
     self.config = config
     self.loop = event_loop
     self.dry_run = dry_run
     self.single_process = single_process
+    self.state_dir = Path(state_dir) if state_dir else None
 
     defaults = config.get("defaults", {}) if isinstance(config.get("defaults"), dict) else {}
     self.area_id = str(defaults.get("area", "0.0.0.0"))
     self._default_hello = int(defaults.get("hello_interval", timers.HELLO_INTERVAL))
     self._default_dead = int(defaults.get("dead_interval", timers.DEAD_INTERVAL))
+    self._min_ls_interval = float(defaults.get("min_ls_interval", timers.MIN_LS_INTERVAL))
+    self._bfd_interval_ms = int(defaults.get("bfd_interval_ms", 0))
+    # 顶点数达到该值的 SPF 交给子进程计算；0 表示始终在事件循环中计算。
+    self._spf_offload_threshold = int(defaults.get("spf_offload_threshold", 0))
+    self._spf_pool: Optional[ProcessPoolExecutor] = None
+    # 每个 Area 缓存的 SPF 结果数；链路在少数几种状态间反复切换时免去重复的 Dijkstra。
+    self._spf_cache_size = int(defaults.get("spf_cache_size", 8))
+    self._lsu_compression = bool(defaults.get("lsu_compression", True))
+    # 只沿泛洪子图（见 implementation.flooding）泛洪，邻接仍在所有链路上维持。
+    self._reduced_flooding = bool(defaults.get("reduced_flooding", False))
+    # 同一轮事件循环收到的 LSU 合并安装：一次泛洪、一次 SPF 调度。
+    self._lsu_batching = bool(defaults.get("lsu_batching", True))
+    self._lsu_compression_threshold = int(
+        defaults.get("lsu_compression_threshold", message.COMPRESSION_THRESHOLD)
+    )
 
     self.interfaces: Dict[str, InterfaceState] = {}
+    self.areas: Dict[str, AreaState] = {}
     self._neighbor_index: Dict[str, List[Tuple[InterfaceState, NeighborConfig]]] = {}
-    self.lsdb = LinkStateDatabase()
     self.routes: Dict[str, Dict[str, object]] = {}
+    self.fib = Fib()
+    self._summary_ranges: List[Prefix] = []
+    self.metrics = Metrics()
+    self.snapshots = SnapshotPublisher()
 
     self._socket: Optional[socket.socket] = None
+    self._tx = Transmitter(
+        event_loop,
+        lambda: self._socket,
+        metrics=self.metrics,
+        rate=float(defaults.get("send_rate_pps", 0)),
+        burst=int(defaults.get("send_burst", DEFAULT_BURST)),
+        max_depth=int(defaults.get("send_queue_depth", DEFAULT_QUEUE_DEPTH)),
+    )
+    self.recorder: Optional["MessageRecorder"] = None
     self._socket_unregister: Optional[Callable[[], None]] = None
     self._local_port: int = DEFAULT_OSPF_PORT
     self._spf_scheduled = False
     self._spf_task = None
     self._self_sequence = 0x80000000
     self._loopback: Optional[ipaddress.IPv4Interface] = None
+    self._checkpoint: Optional[LsdbCheckpoint] = None
+    # 自有 LSA 的上次生成时间，以及被 MinLSInterval 推迟、尚未执行的生成（值为是否强制）。
+    self._originated_at: Dict[Tuple[str, str], float] = {}
+    self._pending_originations: Dict[Tuple[str, str], bool] = {}
+    self._refresh_tasks: Dict[Tuple[str, str], object] = {}
+    self.bfd: Optional[BfdManager] = None
+    if self._bfd_interval_ms > 0:
+      self.bfd = BfdManager(
+          router_id,
+          event_loop,
+          interval=self._bfd_interval_ms / 1000.0,
+          multiplier=int(defaults.get("bfd_multiplier", 3)),
+          send=self._send_bfd,
+          on_down=self._on_bfd_down,
+          metrics=self.metrics,
+      )
+    self._publish_task = None
+    self._routes_dirty = False
+    self._neighbors_dirty = False
+    self._lsdb_dirty: Dict[str, Tuple[AreaState, Tuple[str, str]]] = {}
+
+  @property
+  def lsdb(self) -> LinkStateDatabase:
+    """主 Area 的 LSDB；单 Area 部署下即为完整 LSDB。"""
+    return self._area(self.area_id).lsdb
+
+  @property
+  def is_abr(self) -> bool:
+    return len(self.areas) > 1
 
   # ---------------------------------------------------------------- lifecycle
-  def bootstrap(self) -> None:
+  def bootstrap(self, *, bind: bool = True) -> None:
+    """
+    初始化接口、生成自有 LSA 并启动周期任务。
+
+    ``bind`` 为 False 时不创建 UDP 套接字，供回放等离线场景直接向
+    :meth:`process_message` 注入报文。
+    """
     LOGGER.debug("启动初始化流程，路由器 %s", self.router_id)
-    self._bind_socket()
+    if bind:
+      self._bind_socket()
     self._load_interfaces()
+    if self.state_dir is not None:
+      self._restore_checkpoint()
     self._originate_router_lsa()
     self.run_spf()
     # 周期性检查邻居状态与 LSDB 老化。
     self.loop.schedule(timers.NEIGHBOR_TICK, self._tick_neighbors, repeat=True)
+    if self._checkpoint is not None:
+      self.loop.schedule(timers.CHECKPOINT_INTERVAL, self._write_checkpoint, repeat=True)
 
   def shutdown(self) -> None:
     LOGGER.debug("关闭路由器 %s，释放资源", self.router_id)
+    if self._checkpoint is not None:
+      try:
+        self._write_checkpoint()
+      except OSError:
+        LOGGER.exception("failed to write LSDB checkpoint")
+      self._checkpoint.close()
+      self._checkpoint = None
+    if self.recorder is not None:
+      self.recorder.close()
+      self.recorder = None
+    if self.bfd is not None:
+      self.bfd.close()
+    if self._spf_pool is not None:
+      self._spf_pool.shutdown(wait=False, cancel_futures=True)
+      self._spf_pool = None
+    self._tx.close()
     if self._socket_unregister:
       try:
         self._socket_unregister()
@@ -154,6 +383,7 @@ class Router:
     interfaces_cfg = router_cfg.get("interfaces")
     if not isinstance(interfaces_cfg, list):
       raise ValueError(f"router {self.router_id} config missing interfaces list")
+    router_area = str(router_cfg.get("area", self.area_id))
 
     for iface_entry in interfaces_cfg:
       if not isinstance(iface_entry, dict):
@@ -169,6 +399,10 @@ class Router:
           raise ValueError("neighbor entry requires router_id and addr")
         neighbors.append(NeighborConfig(router_id=rid, addr=addr))
 
+      # 广播网段（DR/BDR 选举与 Network LSA）需显式配置 network_type: broadcast。
+      network_type = str(iface_entry.get("network_type") or POINT_TO_POINT)
+      if network_type not in (POINT_TO_POINT, BROADCAST):
+        raise ValueError(f"unsupported network_type {network_type!r}")
       iface_cfg = InterfaceConfig(
           name=str(iface_entry.get("name")),
           ip=str(iface_entry.get("ip")),
@@ -177,9 +411,12 @@ class Router:
           hello_interval=iface_entry.get("hello_interval"),
           dead_interval=iface_entry.get("dead_interval"),
           priority=int(iface_entry.get("priority", 1)),
+          area=str(iface_entry.get("area", router_area)),
+          network_type=network_type,
       )
       iface_address = ipaddress.ip_interface(iface_cfg.ip)
       iface_state = InterfaceState(config=iface_cfg, address=iface_address)
+      self._area(iface_cfg.area).interfaces[iface_cfg.name] = iface_state
       for neighbor in neighbors:
         adjacency = Adjacency(
             router_id=neighbor.router_id,
@@ -191,52 +428,330 @@ class Router:
         self._neighbor_index.setdefault(neighbor.router_id, []).append((iface_state, neighbor))
 
       self.interfaces[iface_cfg.name] = iface_state
+      if iface_state.broadcast:
+        # RFC 2328 的 Wait 计时器：先用一个 Dead Interval 了解网段上已有的 DR/BDR。
+        iface_state.waiting = True
+        self.loop.schedule(
+            float(iface_cfg.dead_interval or self._default_dead),
+            functools.partial(self._end_wait, iface_state),
+        )
 
       hello_interval = iface_cfg.hello_interval or self._default_hello
       self.loop.schedule(
           float(hello_interval),
-          lambda state=iface_state: self.send_hello(state),
+          functools.partial(self.send_hello, iface_state),
           repeat=True,
       )
 
       LOGGER.info(
-          "接口 %s 已加载，ip=%s cost=%s neighbors=%s",
+          "接口 %s 已加载，area=%s ip=%s cost=%s type=%s neighbors=%s",
           iface_cfg.name,
+          iface_cfg.area,
           iface_cfg.ip,
           iface_cfg.cost,
+          iface_cfg.network_type,
           [n.router_id for n in neighbors],
       )
 
+    if self.area_id not in self.areas and self.areas:
+      self.area_id = next(iter(self.areas))
+    ranges_cfg = router_cfg.get("area_ranges") or {}
+    if not isinstance(ranges_cfg, dict):
+      raise ValueError("area_ranges must map area id to a list of prefixes")
+    for area_id, prefixes in ranges_cfg.items():
+      area = self.areas.get(str(area_id))
+      if area is None:
+        raise ValueError(f"area_ranges references unknown area {area_id}")
+      area.ranges = [ipaddress.ip_network(str(prefix)) for prefix in prefixes]
+    summary_cfg = router_cfg.get("summary_ranges") or []
+    if not isinstance(summary_cfg, list):
+      raise ValueError("summary_ranges must be a list of prefixes")
+    self._summary_ranges = [parse_prefix(str(ipaddress.ip_network(str(prefix)))) for prefix in summary_cfg]
+    if self.is_abr:
+      if BACKBONE_AREA not in self.areas:
+        LOGGER.warning("路由器 %s 连接多个 Area 但未接入骨干区域", self.router_id)
+      LOGGER.info("路由器 %s 作为 ABR 连接 Area %s", self.router_id, sorted(self.areas))
+
+  def _area(self, area_id: str) -> AreaState:
+    area = self.areas.get(area_id)
+    if area is None:
+      area = AreaState(area_id=area_id)
+      area.lsdb.add_listener(lambda key, _lsa, area=area: self._on_lsdb_changed(area, key))
+      self.areas[area_id] = area
+    return area
+
+  def _restore_checkpoint(self) -> None:
+    """从 state_dir 中的检查点恢复各 Area 的 LSDB 与自有序列号，实现热重启。"""
+    assert self.state_dir is not None
+    self._checkpoint = LsdbCheckpoint(self.state_dir / f"{self.router_id}.lsdb")
+    try:
+      restored, reserved = self._checkpoint.load()
+    except OSError:
+      LOGGER.exception("读取 LSDB 检查点失败，将以空 LSDB 启动")
+      return
+    highest = reserved
+    for area_id, lsas in restored.items():
+      area = self.areas.get(area_id)
+      if area is None:
+        continue
+      for lsa in lsas:
+        if area.lsdb.restore(lsa) and lsa.header.advertising_router == self.router_id:
+          highest = max(highest, lsa.header.sequence)
+          # 内容未变时启动阶段不会重新生成，需按剩余寿命安排刷新。
+          # Network LSA 在 Wait 结束后的选举中重新生成或清除。
+          if lsa.header.lsa_type != "network":
+            self._schedule_refresh(area, lsa.header.lsa_type, age=lsa.header.age)
+    # 预留上限一定不小于重启前用过的任何序列号。
+    self._self_sequence = max(self._self_sequence, highest)
+    self._checkpoint.reserve_sequence(self._self_sequence)
+
+  def _write_checkpoint(self) -> None:
+    """将各 Area LSDB 的增量变化追加到检查点文件。"""
+    if self._checkpoint is None:
+      return
+    written = self._checkpoint.checkpoint({area.area_id: area.lsdb for area in self.areas.values()})
+    if written:
+      LOGGER.debug("LSDB 检查点写入 %d 条记录", written)
+
   # ------------------------------------------------------------------ timers
   def _tick_neighbors(self) -> None:
     """周期性执行的维护任务：更新邻居状态并老化 LSDB。"""
     now = time.time()
-    any_down = False
-    for iface_state in self.interfaces.values():
-      for adjacency in iface_state.adjacency.values():
-        if adjacency.tick(now):
-          LOGGER.warning(
-              "邻居 %s 在接口 %s 上超时",
-              adjacency.router_id,
-              iface_state.config.name,
-          )
-          any_down = True
-    if any_down:
+    for area in self.areas.values():
+      down: List[str] = []
+      for iface_state in area.interfaces.values():
+        for adjacency in iface_state.adjacency.values():
+          if adjacency.tick(now):
+            LOGGER.warning(
+                "邻居 %s 在接口 %s 上超时",
+                adjacency.router_id,
+                iface_state.config.name,
+            )
+            down.append(adjacency.router_id)
+      if down:
+        self._on_adjacency_down(area, down)
+
+      expired = list(area.lsdb.age(int(timers.NEIGHBOR_TICK)))
+      if expired:
+        LOGGER.info("Area %s 有 %d 条 LSA 达到 MaxAge，泛洪清除", area.area_id, len(expired))
+        self.metrics.incr("lsa.maxage_flushed", len(expired))
+        self._flood_lsas(area, expired)
+        self._schedule_spf()
+
+  def _on_adjacency_down(self, area: AreaState, router_ids: Iterable[str]) -> None:
+    """
+    邻接断开：先把受影响的路由切换到预先算好的无环备份，
+    再重新生成 Router LSA 并调度完整 SPF。
+    """
+    down = set(router_ids)
+    if self.bfd is not None:
+      for iface_state in area.interfaces.values():
+        for rid in down:
+          self.bfd.stop(iface_state.config.name, rid)
+    self._activate_alternates(area, down)
+    # 自有 Router LSA 可能因 MinLSInterval 延后生成；先从本地拓扑中摘除这些链路，
+    # 避免期间的 SPF 又把路由算回已断开的邻居。
+    state = area.spf
+    root = state.ids.lookup(self.router_id)
+    own_links = state.links.get(root) if root is not None else None
+    if own_links:
+      remaining = drop_links(own_links, {state.ids.lookup(rid) for rid in down})
+      if len(remaining) != len(own_links):
+        state.links[root] = remaining
+        state.recompute = True
+        state.links_overridden = True
+    self._neighbors_dirty = True
+    self._request_publish()
+    self._schedule_spf()
+    for iface_state in area.interfaces.values():
+      if iface_state.broadcast and not down.isdisjoint(iface_state.adjacency):
+        self._run_election(iface_state)
+    self._originate_router_lsa(area)
+
+  def _on_bfd_down(self, interface: str, router_id: str) -> None:
+    """BFD 判定故障：不等待 Dead Interval，立即拆除邻接。"""
+    iface_state = self.interfaces.get(interface)
+    adjacency = iface_state.adjacency.get(router_id) if iface_state else None
+    if adjacency is None or adjacency.state == NeighborState.DOWN:
+      return
+    LOGGER.warning("BFD 检测到邻居 %s 在接口 %s 上故障", router_id, interface)
+    adjacency.bring_down()
+    self._on_adjacency_down(self.areas[iface_state.config.area], [router_id])
+
+  def _sync_bfd(self, iface_state: InterfaceState, adjacency: Adjacency) -> None:
+    """双方都在 Hello 中声明 BFD 且邻接为 Full 时维持探测会话，否则拆除。"""
+    if self.bfd is None:
+      return
+    remote_ms = adjacency.hello_options.get("bfd")
+    if adjacency.state == NeighborState.FULL and isinstance(remote_ms, (int, float)) and remote_ms > 0:
+      self.bfd.start(iface_state.config.name, adjacency.router_id, remote_ms / 1000.0)
+    else:
+      self.bfd.stop(iface_state.config.name, adjacency.router_id)
+
+  def _send_bfd(self, interface: str, router_id: str, data: bytes) -> None:
+    iface_state = self.interfaces.get(interface)
+    neighbor = iface_state.neighbors.get(router_id) if iface_state else None
+    if neighbor is not None:
+      self._send_bytes(neighbor, data, "bfd")
+
+  # ------------------------------------------------------------------ DR/BDR
+  @staticmethod
+  def _backup_seen(adjacency: Adjacency) -> bool:
+    """RFC 2328 的 BackupSeen：邻居宣告自己为 BDR，或宣告自己为 DR 且网段没有 BDR。"""
+    if adjacency.state not in (NeighborState.TWO_WAY, NeighborState.FULL):
+      return False
+    rid = adjacency.router_id
+    return adjacency.bdr == rid or (adjacency.dr == rid and not adjacency.bdr)
+
+  def _end_wait(self, iface_state: InterfaceState) -> None:
+    if not iface_state.waiting:
+      return
+    iface_state.waiting = False
+    self._run_election(iface_state)
+
+  def _run_election(self, iface_state: InterfaceState) -> None:
+    """
+    重新选举广播网段的 DR/BDR，并据此调整邻接：本路由器或邻居为 DR/BDR 时
+    升至 Full 并同步 LSDB，否则停留在 Two-Way。角色或邻接变化后重新生成
+    Router LSA 与 Network LSA。
+    """
+    if not iface_state.broadcast or iface_state.waiting:
+      return
+    area = self.areas[iface_state.config.area]
+    candidates = {
+        self.router_id: ElectionCandidate(iface_state.config.priority, iface_state.dr, iface_state.bdr),
+    }
+    for rid, adjacency in iface_state.adjacency.items():
+      if adjacency.state in (NeighborState.TWO_WAY, NeighborState.FULL):
+        candidates[rid] = ElectionCandidate(adjacency.priority, adjacency.dr, adjacency.bdr)
+    dr, bdr = elect_designated_routers(self.router_id, candidates)
+    if bdr == dr:
+      bdr = None
+    changed = (dr, bdr) != (iface_state.dr, iface_state.bdr)
+    if changed:
+      self.metrics.incr("dr.elections")
+      LOGGER.info("接口 %s 选举结果 DR=%s BDR=%s", iface_state.config.name, dr, bdr)
+      iface_state.dr, iface_state.bdr = dr, bdr
+
+    roles = {dr, bdr} - {None}
+    for rid, adjacency in iface_state.adjacency.items():
+      if adjacency.state not in (NeighborState.TWO_WAY, NeighborState.FULL):
+        continue
+      want_full = self.router_id in roles or rid in roles
+      if want_full and adjacency.state == NeighborState.TWO_WAY:
+        adjacency.state = NeighborState.FULL
+        changed = True
+        LOGGER.info("邻居 %s 接口 %s 状态 two-way -> full", rid, iface_state.config.name)
+        self._start_database_exchange(area, adjacency)
+      elif not want_full and adjacency.state == NeighborState.FULL:
+        adjacency.state = NeighborState.TWO_WAY
+        changed = True
+        LOGGER.info("邻居 %s 接口 %s 状态 full -> two-way", rid, iface_state.config.name)
+      self._sync_bfd(iface_state, adjacency)
+    self.metrics.set(
+        f"dr.full_adjacencies.{iface_state.config.name}",
+        sum(1 for adj in iface_state.adjacency.values() if adj.state == NeighborState.FULL),
+    )
+    if changed:
+      self._neighbors_dirty = True
+      self._request_publish()
       self._schedule_spf()
-      self._originate_router_lsa()
+      self._originate_router_lsa(area)
+    self._originate_network_lsa(iface_state)
+
+  def _dr_address(self, iface_state: InterfaceState) -> Optional[str]:
+    """DR 在该网段上的接口地址，同时作为 Network LSA 的 lsa_id。"""
+    if iface_state.dr is None:
+      return None
+    if iface_state.dr == self.router_id:
+      return str(iface_state.address.ip)
+    neighbor = iface_state.neighbors.get(iface_state.dr)
+    return neighbor.addr if neighbor is not None else None
+
+  def _transit_link(self, iface_state: InterfaceState) -> Optional[Dict[str, object]]:
+    """与 DR 的邻接为 Full（或自身为 DR 且至少有一个 Full 邻居）时，返回指向网段伪节点的链路。"""
+    if iface_state.dr is None:
+      return None
+    if iface_state.dr == self.router_id:
+      attached = any(adj.state == NeighborState.FULL for adj in iface_state.adjacency.values())
+    else:
+      adjacency = iface_state.adjacency.get(iface_state.dr)
+      attached = adjacency is not None and adjacency.state == NeighborState.FULL
+    address = self._dr_address(iface_state)
+    if not attached or address is None:
+      return None
+    return {"network": address, "cost": iface_state.config.cost, "interface": iface_state.config.name}
+
+  def _originate_network_lsa(self, iface_state: InterfaceState, *, force: bool = False) -> None:
+    """
+    DR 为网段生成 Network LSA，列出所有与其 Full 的路由器（含自身）。
+
+    不再是 DR 或网段上没有 Full 邻居时，清除此前生成的 Network LSA。
+    """
+    area = self.areas[iface_state.config.area]
+    lsa_id = str(iface_state.address.ip)
+    attached = sorted(rid for rid, adj in iface_state.adjacency.items() if adj.state == NeighborState.FULL)
+    if iface_state.dr != self.router_id or not attached:
+      self._flush_self_lsa(area, "network", lsa_id)
+      return
+    payload = {
+        "network": str(iface_state.address.network.with_prefixlen),
+        "routers": [self.router_id, *attached],
+        "interface": iface_state.config.name,
+    }
+    current = area.lsdb.lookup("network", lsa_id)
+    if current is not None and current.payload == payload and not force:
+      self.metrics.incr("lsa.originate.unchanged")
+      return
+    kind = _network_kind(iface_state)
+    if self._throttle_origination(area, kind, force):
+      return
+    self._originate(area, "network", payload, lsa_id=lsa_id, kind=kind)
 
-    expired = list(self.lsdb.age(int(timers.NEIGHBOR_TICK)))
-    if expired:
-      LOGGER.debug("LSDB 老化移除 %d 条 LSA", len(expired))
+  def _flush_self_lsa(self, area: AreaState, lsa_type: str, lsa_id: str) -> None:
+    """以 MaxAge 泛洪清除本路由器生成的 LSA。"""
+    current = area.lsdb.lookup(lsa_type, lsa_id)
+    if current is None or current.header.advertising_router != self.router_id:
+      return
+    kind = lsa_type if lsa_id == self.router_id else next(
+        (_network_kind(i) for i in area.interfaces.values() if str(i.address.ip) == lsa_id),
+        lsa_type,
+    )
+    task = self._refresh_tasks.pop((area.area_id, kind), None)
+    if task is not None:
+      self.loop.cancel(task)
+    flushed = Lsa(header=replace(current.header, age=timers.MAX_AGE), payload=current.payload)
+    if area.lsdb.install(flushed):
+      LOGGER.info("Area %s 清除自有 %s LSA %s", area.area_id, lsa_type, lsa_id)
+      self.metrics.incr("lsa.flushed_self")
+      self._flood_lsas(area, [flushed])
       self._schedule_spf()
 
   # --------------------------------------------------------------- messaging
   def _on_socket_readable(self, sock: socket.socket) -> None:
-    """事件循环回调：套接字可读时解析并分发协议报文。"""
-    try:
-      data, addr = sock.recvfrom(65535)
-    except OSError as exc:
-      LOGGER.error("接收报文失败: %s", exc)
+    """
+    事件循环回调：套接字可读时解析并分发协议报文。
+
+    一次最多读取 :data:`_RECV_BURST` 个报文，直到接收缓冲区读空，同一突发中的
+    LSU 因此落入同一个待安装批次；上限避免持续到达的报文饿死定时器。
+    """
+    for _ in range(_RECV_BURST):
+      try:
+        data, addr = sock.recvfrom(65535)
+      except (BlockingIOError, InterruptedError):
+        return
+      except OSError as exc:
+        LOGGER.error("接收报文失败: %s", exc)
+        return
+      if self.recorder is not None:
+        self.recorder.record(time.time(), addr, data)
+      self._handle_datagram(data, addr)
+
+  def _handle_datagram(self, data: bytes, addr: Tuple[str, int]) -> None:
+    """解码一个 UDP 载荷并分发；套接字回调与离线回放共用此入口。"""
+    if is_bfd_packet(data):
+      if self.bfd is not None:
+        self.bfd.handle_packet(data)
       return
     try:
       msg = message.Message.loads(data)
@@ -244,7 +759,7 @@ class Router:
       LOGGER.warning("收到非法报文，已丢弃: %s", exc)
       return
 
-    if msg.area_id != self.area_id:
+    if msg.area_id not in self.areas:
       LOGGER.debug("忽略不同 Area (%s) 的报文", msg.area_id)
       return
 
@@ -256,22 +771,31 @@ class Router:
 
   def process_message(self, msg: message.Message, src: Tuple[str, int]) -> None:
     """根据报文类型调用相应处理逻辑。"""
-    iface_state = self._resolve_interface_for_neighbor(msg.router_id, src[0])
+    iface_state = self._resolve_interface_for_neighbor(msg.router_id, src[0], msg.area_id)
     if iface_state is None:
       LOGGER.warning("收到未知邻居 %s 的报文，来源 %s", msg.router_id, src)
       return
+    if iface_state.config.area != msg.area_id:
+      LOGGER.debug("接口 %s 不属于 Area %s，忽略报文", iface_state.config.name, msg.area_id)
+      return
+    area = self.areas[msg.area_id]
 
     LOGGER.debug("通过接口 %s 收到 %s 来自 %s", iface_state.config.name, msg.msg_type.value, msg.router_id)
 
     if msg.msg_type == message.MessageType.HELLO:
       self._handle_hello(iface_state, msg, src_ip=src[0])
     elif msg.msg_type == message.MessageType.LINK_STATE_UPDATE:
-      self._handle_lsu(msg)
+      self._handle_lsu(area, msg, iface_state)
+    elif msg.msg_type == message.MessageType.DATABASE_DESCRIPTION:
+      self._handle_dd(area, msg)
+    elif msg.msg_type == message.MessageType.LINK_STATE_REQUEST:
+      self._handle_lsr(area, msg)
     else:
       LOGGER.info("当前实验未实现消息类型 %s", msg.msg_type.value)
 
   def _handle_hello(self, iface_state: InterfaceState, msg: message.Message, src_ip: str) -> None:
     """处理 Hello 报文，推进邻接状态并在必要时触发 LSDB 同步。"""
+    area = self.areas[iface_state.config.area]
     adjacency = iface_state.adjacency.get(msg.router_id)
     if adjacency is None:
       adjacency = Adjacency(
@@ -302,6 +826,8 @@ class Router:
         hello_interval=float(iface_state.config.hello_interval or self._default_hello),
         dead_interval=float(iface_state.config.dead_interval or self._default_dead),
     )
+    self._neighbors_dirty = True
+    self._request_publish()
     if changed:
       LOGGER.info(
           "邻居 %s 接口 %s 状态 %s -> %s",
@@ -310,34 +836,205 @@ class Router:
           prev_state.value,
           adjacency.state.value,
       )
+    if iface_state.broadcast:
+      # 广播网段上邻接停在 Two-Way，是否升至 Full 由选举结果决定。
+      if iface_state.waiting and self._backup_seen(adjacency):
+        self._end_wait(iface_state)
+      elif changed and not iface_state.waiting:
+        self._run_election(iface_state)
+      self._sync_bfd(iface_state, adjacency)
+      return
+    self._sync_bfd(iface_state, adjacency)
+    if changed:
       if adjacency.state == NeighborState.FULL:
-        self._send_full_lsdb(adjacency.router_id)
+        self._start_database_exchange(area, adjacency)
       self._schedule_spf()
-      self._originate_router_lsa()
-
-  def _handle_lsu(self, msg: message.Message) -> None:
-    """处理 Link State Update 报文，安装其中的 LSA 并继续泛洪。"""
-    lsas_raw = msg.payload.get("lsas", [])
+      self._originate_router_lsa(area)
+
+  def _handle_lsu(self, area: AreaState, msg: message.Message, iface_state: Optional[InterfaceState] = None) -> None:
+    """
+    处理 Link State Update 报文，安装其中的 LSA 并继续泛洪。
+
+    先用头部的 (type, id, sequence, checksum) 与 LSDB 比对，重复或更旧的
+    LSA 直接跳过，只为需要安装的条目构造 Lsa 对象。启用 ``lsu_batching`` 时
+    新 LSA 先放入 Area 的待安装批次，由 :meth:`_install_lsu_batch` 在下一轮
+    事件循环开始时统一安装。
+    """
+    if "lsas_z" in msg.payload:
+      start = time.thread_time()
+      try:
+        lsas_raw = message.decompress_lsas(str(msg.payload["lsas_z"]))
+      except message.MessageError as exc:
+        self.metrics.incr("lsu.decompress.errors")
+        LOGGER.warning("邻居 %s 发来无法解压的 LSU: %s", msg.router_id, exc)
+        return
+      self.metrics.incr("lsu.decompress.messages")
+      self.metrics.incr("lsu.decompress.cpu_s", time.thread_time() - start)
+    else:
+      lsas_raw = msg.payload.get("lsas", [])
     if not isinstance(lsas_raw, list):
       LOGGER.warning("邻居 %s 发来畸形 LSU 负载", msg.router_id)
       return
-    installed: List[Lsa] = []
+    received: List[Lsa] = []
     for raw in lsas_raw:
       if not isinstance(raw, dict):
         continue
+      header = raw.get("header")
+      if not isinstance(header, dict):
+        continue
+      self.metrics.incr("lsu.lsas_received")
+      freshness = area.lsdb.compare_header(header)
+      if freshness == 0:
+        self.metrics.incr("lsu.lsas_duplicate")
+        continue
+      if freshness < 0:
+        self.metrics.incr("lsu.lsas_stale")
+        continue
       try:
         lsa = LinkStateDatabase.from_message_payload(raw)
       except Exception:
         LOGGER.exception("解析邻居 %s 的 LSA 失败", msg.router_id)
         continue
-      if self.lsdb.install(lsa):
-        installed.append(lsa)
+      received.append(lsa)
+
+    if not self._lsu_batching:
+      self._install_lsas(area, [(lsa, msg.router_id, iface_state) for lsa in received])
+      return
+    if received and not area.lsu_batch:
+      self.loop.call_soon(self._install_lsu_batch, area)
+    for lsa in received:
+      key = lsa.fingerprint()
+      pending = area.lsu_batch.get(key)
+      if pending is not None:
+        if not _supersedes(lsa, pending[0]):
+          self.metrics.incr("lsu.lsas_duplicate")
+          continue
+        self.metrics.incr("lsu.batch.superseded")
+      area.lsu_batch[key] = (lsa, msg.router_id, iface_state)
+
+  def _install_lsu_batch(self, area: AreaState) -> None:
+    """安装本轮收集的全部 LSA。"""
+    entries = list(area.lsu_batch.values())
+    area.lsu_batch.clear()
+    self.metrics.incr("lsu.batch.flushes")
+    self.metrics.incr("lsu.batch.lsas", len(entries))
+    self._install_lsas(area, entries)
+
+  def _install_lsas(self, area: AreaState, entries: List[Tuple[Lsa, str, Optional[InterfaceState]]]) -> None:
+    """将 (LSA, 来源邻居, 来源接口) 安装进 LSDB，随后合并泛洪并调度一次 SPF。"""
+    installed: List[Tuple[Lsa, Optional[str], Optional[InterfaceState]]] = []
+    for lsa, sender, iface_state in entries:
+      if not area.lsdb.install(lsa):
+        continue
+      self.metrics.incr("lsu.lsas_installed")
+      # 泛洪 LSDB 中的副本，其头部带有重新计算的校验和，下游可走重复快速路径；
+      # MaxAge 清除后本地已无副本，原样继续泛洪。
+      stored = area.lsdb.lookup(*lsa.fingerprint())
+      if stored is None:
+        self.metrics.incr("lsu.lsas_flushed")
+      installed.append((stored or lsa, sender, iface_state))
+      if lsa.header.advertising_router == self.router_id:
+        self._on_stale_self_lsa(area, lsa)
 
     if installed:
-      LOGGER.info("安装来自邻居 %s 的 %d 条 LSA", msg.router_id, len(installed))
-      self._flood_lsas(installed, exclude=msg.router_id)
+      senders = sorted({sender for _, sender, _ in installed if sender is not None})
+      LOGGER.info("Area %s 安装来自邻居 %s 的 %d 条 LSA", area.area_id, ", ".join(senders), len(installed))
+      self._flood_batch(area, installed)
       self._schedule_spf()
 
+  def _on_stale_self_lsa(self, area: AreaState, lsa: Lsa) -> None:
+    """
+    邻居送回了重启前生成的自有 LSA：跳过其序列号并重新生成，
+    确保本地序列号在重启后依旧单调递增。
+    """
+    if lsa.header.sequence < self._self_sequence:
+      return
+    LOGGER.info("收到序列号 %#x 的旧自有 LSA，重新生成", lsa.header.sequence)
+    self._self_sequence = lsa.header.sequence
+    kind = lsa.header.lsa_type
+    if kind == "network":
+      # 重新生成或清除（若本路由器已不再是该网段的 DR）。
+      iface_state = next((i for i in area.interfaces.values() if str(i.address.ip) == lsa.header.lsa_id), None)
+      if iface_state is None:
+        self.loop.schedule(0, functools.partial(self._flush_self_lsa, area, "network", lsa.header.lsa_id))
+        return
+      kind = _network_kind(iface_state)
+    self.loop.schedule(0, functools.partial(self._reoriginate, area, kind, force=True))
+
+  def _start_database_exchange(self, area: AreaState, adjacency: Adjacency) -> None:
+    """
+    邻接升至 Full 后同步 LSDB：对端支持 DD 时只交换 LSA 头部摘要，
+    由双方按需补齐过期条目；否则退回推送完整 LSDB。
+    """
+    if not adjacency.hello_options.get("dd"):
+      self._send_full_lsdb(area, adjacency.router_id)
+      return
+    headers = [LinkStateDatabase.header_payload(lsa) for lsa in area.lsdb.snapshot().values()]
+    msg = message.Message(
+        msg_type=message.MessageType.DATABASE_DESCRIPTION,
+        router_id=self.router_id,
+        area_id=area.area_id,
+        payload={"lsa_headers": headers, "more": False},
+    )
+    for neighbor in self._neighbors_in_area(area, adjacency.router_id):
+      self._send_message(neighbor, msg)
+
+  def _handle_dd(self, area: AreaState, msg: message.Message) -> None:
+    """
+    比较对端 LSDB 摘要：推送对端缺失或过期的 LSA，请求本地过期的 LSA。
+
+    对端仍持有本地已清除（且不比清除实例新）的 LSA 时，回送 MaxAge 实例让它一并清除，
+    而不是把该 LSA 请求回来。
+    """
+    remote: Dict[Tuple[str, str], int] = {}
+    requests: List[Dict[str, object]] = []
+    flushed: List[Lsa] = []
+    for header in msg.payload.get("lsa_headers", []):
+      key = (str(header.get("lsa_type")), str(header.get("lsa_id")))
+      sequence = int(header.get("sequence", 0))
+      remote[key] = sequence
+      local = area.lsdb.lookup(*key)
+      if local is None:
+        held = area.lsdb.flushed(*key)
+        if held is not None and held.header.sequence >= sequence:
+          flushed.append(held)
+          continue
+      if local is None or local.header.sequence < sequence:
+        requests.append({"lsa_type": key[0], "lsa_id": key[1]})
+
+    newer = [
+        lsa for key, lsa in area.lsdb.snapshot().items()
+        if lsa.header.sequence > remote.get(key, -1)
+    ] + flushed
+    LOGGER.debug(
+        "与邻居 %s 比对 LSDB 摘要：推送 %d 条，请求 %d 条",
+        msg.router_id,
+        len(newer),
+        len(requests),
+    )
+    if newer:
+      self._send_lsas_to(area, msg.router_id, newer)
+    if requests:
+      request = message.Message(
+          msg_type=message.MessageType.LINK_STATE_REQUEST,
+          router_id=self.router_id,
+          area_id=area.area_id,
+          payload={"requests": requests},
+      )
+      for neighbor in self._neighbors_in_area(area, msg.router_id):
+        self._send_message(neighbor, request)
+
+  def _handle_lsr(self, area: AreaState, msg: message.Message) -> None:
+    """响应 Link State Request，回送本地持有的对应 LSA；已清除的 LSA 回送其 MaxAge 实例。"""
+    lsas = []
+    for request in msg.payload.get("requests", []):
+      key = (str(request.get("lsa_type")), str(request.get("lsa_id")))
+      lsa = area.lsdb.lookup(*key) or area.lsdb.flushed(*key)
+      if lsa is not None:
+        lsas.append(lsa)
+    if lsas:
+      self._send_lsas_to(area, msg.router_id, lsas)
+
   def send_hello(self, iface_state: InterfaceState) -> None:
     """在指定接口上广播 Hello，维持邻居感知。"""
     hello_interval = int(iface_state.config.hello_interval or self._default_hello)
@@ -352,11 +1049,17 @@ class Router:
         "dead_interval": dead_interval,
         "priority": iface_state.config.priority,
         "neighbors": known_neighbors,
-        "options": {"p2p": True},
+        "options": {"p2p": not iface_state.broadcast, "dd": True, "lsu_z": self._lsu_compression},
     }
+    if self.bfd is not None:
+      payload["options"]["bfd"] = self._bfd_interval_ms
+    if iface_state.dr:
+      payload["dr"] = iface_state.dr
+    if iface_state.bdr:
+      payload["bdr"] = iface_state.bdr
     msg = message.build_hello(
         router_id=self.router_id,
-        area_id=self.area_id,
+        area_id=iface_state.config.area,
         **payload,
     )
     for neighbor in iface_state.neighbors.values():
@@ -364,69 +1067,178 @@ class Router:
 
   def _send_message(self, neighbor: NeighborConfig, msg: message.Message) -> None:
     """通过 UDP 套接字向邻居发送消息，支持单进程测试或 namespace 环境。"""
+    self._send_bytes(neighbor, msg.dumps(), msg.msg_type.value)
+
+  def _send_bytes(self, neighbor: NeighborConfig, data: bytes, kind: str) -> None:
+    """经邻居的发送队列发出报文；套接字暂时不可写时由队列在可写后重试。"""
     if self._socket is None:
       LOGGER.warning("套接字尚未初始化，无法发送报文")
       return
-    data = msg.dumps()
     dest_ip = neighbor.addr
     dest_port = self._local_port
     if self.single_process:
       dest_ip = "127.0.0.1"
       dest_port = self._port_for_router(neighbor.router_id)
-    try:
-      self._socket.sendto(data, (dest_ip, dest_port))
-    except OSError as exc:
-      LOGGER.error("发送 %s 至 %s:%s 失败: %s", msg.msg_type.value, dest_ip, dest_port, exc)
+    self._tx.send(
+        f"{neighbor.router_id}@{neighbor.addr}",
+        data,
+        (dest_ip, dest_port),
+        kind,
+        urgent=kind in _URGENT_KINDS,
+    )
+
+  def transmit_stats(self) -> Dict[str, Dict[str, int]]:
+    """各邻居发送队列的深度与收发计数；需在事件循环线程中调用。"""
+    return self._tx.stats()
+
+  def _flood_lsas(
+      self,
+      area: AreaState,
+      lsas: Iterable[Lsa],
+      *,
+      exclude: Optional[str] = None,
+      source: Optional[InterfaceState] = None,
+  ) -> None:
+    """将更新后的 LSA 泛洪给同一 Area 内的所有邻居，可选排除来源邻居。"""
+    self._flood_batch(area, [(lsa, exclude, source) for lsa in lsas])
 
-  def _flood_lsas(self, lsas: Iterable[Lsa], *, exclude: Optional[str] = None) -> None:
-    """将更新后的 LSA 泛洪给所有邻居，可选排除来源邻居。"""
-    payload_lsas = [self.lsdb.to_message_payload(lsa) for lsa in lsas]
+  def _flood_batch(
+      self,
+      area: AreaState,
+      entries: Sequence[Tuple[Lsa, Optional[str], Optional[InterfaceState]]],
+  ) -> None:
+    """
+    泛洪一批 (LSA, 来源邻居, 来源接口)：每个邻居只收到一个 LSU，其中不含
+    由它发来的 LSA；内容相同的 LSU 只构造一次。
+
+    广播网段上只沿 Full 邻接泛洪：DROther 只发给 DR/BDR，由 DR 转发给网段
+    上的其余路由器；从某网段收到的 LSA，只有该网段的 DR 才会再泛洪回去。
+    """
+    payload_lsas = [area.lsdb.to_message_payload(lsa) for lsa, _, _ in entries]
     if not payload_lsas:
       return
-    msg = message.Message(
-        msg_type=message.MessageType.LINK_STATE_UPDATE,
-        router_id=self.router_id,
-        area_id=self.area_id,
-        payload={
-            "lsas": payload_lsas,
-            "more": False,
-        },
-    )
-    for iface_state in self.interfaces.values():
+    topology = self._flooding_topology(area) if self._reduced_flooding else None
+    messages: Dict[Tuple[Tuple[int, ...], bool], message.Message] = {}
+    for iface_state in area.interfaces.values():
+      returns_to_segment = not iface_state.broadcast or iface_state.dr == self.router_id
       for neighbor in iface_state.neighbors.values():
-        if neighbor.router_id == exclude:
+        selected = tuple(
+            index for index, (_, exclude, source) in enumerate(entries)
+            if exclude != neighbor.router_id and (returns_to_segment or source is not iface_state)
+        )
+        if not selected:
           continue
         adjacency = iface_state.adjacency.get(neighbor.router_id)
         if adjacency is None or adjacency.state == NeighborState.DOWN:
           continue
-        self._send_message(neighbor, msg)
-
-  def _send_full_lsdb(self, neighbor_id: str) -> None:
+        if iface_state.broadcast and adjacency.state != NeighborState.FULL:
+          continue
+        if topology is not None and not iface_state.broadcast and not topology.floods(self.router_id, neighbor.router_id):
+          self.metrics.incr("flood.suppressed")
+          continue
+        compress = self._accepts_compression(adjacency)
+        key = (selected, compress)
+        if key not in messages:
+          messages[key] = self._build_lsu(area, [payload_lsas[index] for index in selected], compress=compress)
+        self.metrics.incr("flood.lsu_messages")
+        self._send_message(neighbor, messages[key])
+
+  def _flooding_topology(self, area: AreaState) -> Optional[FloodingTopology]:
+    """
+    返回 Area 的泛洪子图，只为 Router LSA 有变化的路由器刷新其邻居集合，
+    邻居集合都未变时沿用上次结果。本机在子图中的某个邻居已断开时返回 None：
+    新的 Router LSA 生效前退回全量泛洪，避免子图在本地出现缺口。
+    """
+    if area.flood_dirty:
+      changed = False
+      for rid in area.flood_dirty:
+        lsa = area.lsdb.lookup("router", rid)
+        links = frozenset(
+            str(link["router_id"])
+            for link in (lsa.payload.get("links", []) if lsa is not None else [])
+            if isinstance(link, dict) and link.get("router_id")
+        )
+        if area.flood_links.get(rid) != links:
+          changed = True
+          if links:
+            area.flood_links[rid] = links
+          else:
+            area.flood_links.pop(rid, None)
+      area.flood_dirty.clear()
+      if changed or area.flooding is None:
+        area.flooding = build_flooding_topology(area.flood_links)
+        self.metrics.incr("flood.topology.builds")
+        self.metrics.set("flood.topology.links", area.flooding.links)
+        self.metrics.set("flood.topology.flooding_links", area.flooding.flooding_links)
+    topology = area.flooding
+    if topology is None:
+      return None
+    for rid in topology.flooding.get(self.router_id, ()):
+      if not any(
+          iface_state.config.area == area.area_id
+          and iface_state.adjacency.get(rid) is not None
+          and iface_state.adjacency[rid].state != NeighborState.DOWN
+          for iface_state, _ in self._neighbor_index.get(rid, [])
+      ):
+        return None
+    return topology
+
+  def _send_full_lsdb(self, area: AreaState, neighbor_id: str) -> None:
     """在邻接升至 Full 时推送完整 LSDB，辅助快速收敛。"""
-    snapshot = self.lsdb.snapshot().values()
-    if not snapshot:
-      return
-    entries = self._neighbor_index.get(neighbor_id, [])
-    if not entries:
+    self._send_lsas_to(area, neighbor_id, area.lsdb.snapshot().values())
+
+  def _send_lsas_to(self, area: AreaState, neighbor_id: str, lsas: Iterable[Lsa]) -> None:
+    """以单个 LSU 将指定 LSA 发送给某个邻居。"""
+    payload_lsas = [area.lsdb.to_message_payload(lsa) for lsa in lsas]
+    if not payload_lsas:
       return
-    msg = message.Message(
+    for iface_state, neighbor in self._neighbor_index.get(neighbor_id, []):
+      if iface_state.config.area != area.area_id:
+        continue
+      compress = self._accepts_compression(iface_state.adjacency.get(neighbor_id))
+      self._send_message(neighbor, self._build_lsu(area, payload_lsas, compress=compress))
+
+  def _accepts_compression(self, adjacency: Optional[Adjacency]) -> bool:
+    """本端启用压缩且邻居在 Hello options 中声明支持时才发送压缩 LSU。"""
+    return self._lsu_compression and adjacency is not None and bool(adjacency.hello_options.get("lsu_z"))
+
+  def _build_lsu(self, area: AreaState, payload_lsas: List[Dict[str, object]], *, compress: bool) -> message.Message:
+    """构造 LSU；允许压缩且原始大小超过阈值时改用 ``lsas_z`` 字段。"""
+    payload: Dict[str, object] = {"lsas": payload_lsas, "more": False}
+    if compress:
+      start = time.thread_time()
+      blob, raw_size = message.compress_lsas(payload_lsas, self._lsu_compression_threshold)
+      elapsed = time.thread_time() - start
+      if blob is not None:
+        payload = {"lsas_z": blob, "more": False}
+        self.metrics.incr("lsu.compress.messages")
+        self.metrics.incr("lsu.compress.bytes_in", raw_size)
+        self.metrics.incr("lsu.compress.bytes_out", len(blob))
+        self.metrics.incr("lsu.compress.cpu_s", elapsed)
+    return message.Message(
         msg_type=message.MessageType.LINK_STATE_UPDATE,
         router_id=self.router_id,
-        area_id=self.area_id,
-        payload={
-            "lsas": [self.lsdb.to_message_payload(lsa) for lsa in snapshot],
-            "more": False,
-        },
+        area_id=area.area_id,
+        payload=payload,
     )
-    for _, neighbor in entries:
-      self._send_message(neighbor, msg)
 
   # ------------------------------------------------------------------- LSDB
-  def _originate_router_lsa(self) -> None:
-    """生成本路由器的 Router LSA，描述本地接口与相邻路由器。"""
+  def _originate_router_lsa(self, area: Optional[AreaState] = None, *, force: bool = False) -> None:
+    """
+    生成本路由器的 Router LSA，描述本地接口与相邻路由器。
+
+    每个 Area 各有一条只包含该 Area 接口的 Router LSA；``area`` 为空时
+    为所有 Area 重新生成。内容与已安装的副本相同时不重新生成，除非
+    ``force`` 要求跳过旧序列号。
+    """
+    if area is None:
+      for each in list(self.areas.values()):
+        self._originate_router_lsa(each, force=force)
+      return
+
     links = []
     networks = []
-    for iface_state in self.interfaces.values():
+    for iface_state in area.interfaces.values():
       networks.append(
           {
               "prefix": str(iface_state.address.network.with_prefixlen),
@@ -434,7 +1246,17 @@ class Router:
               "interface": iface_state.config.name,
           }
       )
+      if iface_state.broadcast:
+        # 广播网段只通告一条指向伪节点（由 DR 的 Network LSA 描述）的链路。
+        transit = self._transit_link(iface_state)
+        if transit is not None:
+          links.append(transit)
+        continue
       for neighbor in iface_state.neighbors.values():
+        # 只通告已完成数据库同步的邻居，邻接断开后该链路随之从拓扑中消失。
+        adjacency = iface_state.adjacency.get(neighbor.router_id)
+        if adjacency is None or adjacency.state != NeighborState.FULL:
+          continue
         links.append(
             {
                 "router_id": neighbor.router_id,
@@ -450,22 +1272,156 @@ class Router:
     if self._loopback:
       payload["loopback"] = str(self._loopback.with_prefixlen)
       payload["loopback_cost"] = 0
+    if self.is_abr:
+      payload["abr"] = True
+
+    current = area.lsdb.lookup("router", self.router_id)
+    if current is not None and current.payload == payload and not force:
+      self.metrics.incr("lsa.originate.unchanged")
+      return
+    if self._throttle_origination(area, "router", force):
+      return
+    self._originate(area, "router", payload)
+
+  def _originate_summary_lsa(self, area: AreaState, *, force: bool = False) -> None:
+    """
+    ABR 向 ``area`` 通告其他 Area 可达的前缀（Summary LSA）。
+
+    通告内容未变化时不重新生成，避免在每次 SPF 后产生泛洪。
+    """
+    prefixes = self._summary_prefixes_for(area)
+    payload = {
+        "router_id": self.router_id,
+        "prefixes": [
+            {"prefix": prefix, "metric": metric}
+            for prefix, metric in sorted(prefixes.items())
+        ],
+    }
+    current = area.lsdb.lookup("summary", self.router_id)
+    if current is None and not prefixes:
+      return
+    if current is not None and current.payload == payload and not force:
+      self.metrics.incr("lsa.originate.unchanged")
+      return
+    if self._throttle_origination(area, "summary", force):
+      return
+    self._originate(area, "summary", payload)
+
+  def _throttle_origination(self, area: AreaState, kind: str, force: bool) -> bool:
+    """
+    MinLSInterval 限速：距上次生成不足间隔时推迟，返回 True 表示本次被推迟。
+
+    推迟期间的多次请求合并为一次，到期时按当时的状态重新构造 LSA。
+    ``kind`` 区分同一 Area 内的各条自有 LSA：``router``、``summary`` 或
+    每个广播接口一条的 ``network:<接口名>``。
+    """
+    key = (area.area_id, kind)
+    if key in self._pending_originations:
+      self._pending_originations[key] |= force
+      self.metrics.incr("lsa.originate.merged")
+      return True
+    last = self._originated_at.get(key)
+    now = time.time()
+    if last is None or now - last >= self._min_ls_interval:
+      return False
+    self._pending_originations[key] = force
+    self.metrics.incr("lsa.originate.deferred")
+    self.loop.schedule(last + self._min_ls_interval - now, functools.partial(self._run_pending_origination, area, kind))
+    return True
+
+  def _run_pending_origination(self, area: AreaState, kind: str) -> None:
+    force = self._pending_originations.pop((area.area_id, kind), False)
+    self._reoriginate(area, kind, force=force)
+
+  def _reoriginate(self, area: AreaState, kind: str, *, force: bool) -> None:
+    if kind == "summary":
+      self._originate_summary_lsa(area, force=force)
+    elif kind.startswith("network:"):
+      iface_state = self.interfaces.get(kind.partition(":")[2])
+      if iface_state is not None:
+        self._originate_network_lsa(iface_state, force=force)
+    else:
+      self._originate_router_lsa(area, force=force)
 
+  def _originate(
+      self,
+      area: AreaState,
+      lsa_type: str,
+      payload: Dict[str, object],
+      *,
+      lsa_id: Optional[str] = None,
+      kind: Optional[str] = None,
+  ) -> None:
+    """以新的序列号生成自有 LSA，安装后在 ``area`` 内泛洪。"""
+    lsa_id = lsa_id or self.router_id
+    kind = kind or lsa_type
+    self._originated_at[(area.area_id, kind)] = time.time()
+    self.metrics.incr(f"lsa.originate.{lsa_type}")
+    self._schedule_refresh(area, kind)
     self._self_sequence += 1
+    if self._checkpoint is not None and self._self_sequence >= self._checkpoint.sequence_reserved:
+      self._checkpoint.reserve_sequence(self._self_sequence)
     lsa = Lsa(
         header=LsaHeader(
-            lsa_type="router",
-            lsa_id=self.router_id,
+            lsa_type=lsa_type,
+            lsa_id=lsa_id,
             advertising_router=self.router_id,
             sequence=self._self_sequence,
         ),
         payload=payload,
     )
-    if self.lsdb.install(lsa):
-      LOGGER.debug("生成自有 Router LSA，序列号 %s", self._self_sequence)
-      self._flood_lsas([lsa])
+    if area.lsdb.install(lsa):
+      LOGGER.debug("Area %s 生成自有 %s LSA，序列号 %s", area.area_id, lsa_type, self._self_sequence)
+      self._flood_lsas(area, [area.lsdb.lookup(lsa_type, lsa_id)])
       self._schedule_spf()
 
+  def _schedule_refresh(self, area: AreaState, kind: str, *, age: int = 0) -> None:
+    """
+    在自有 LSA 达到 LS_REFRESH_TIME 之前重新生成。
+
+    刷新时刻向前随机抖动最多 LS_REFRESH_JITTER 比例，避免全网路由器
+    在同一时刻集中刷新。
+    """
+    key = (area.area_id, kind)
+    previous = self._refresh_tasks.pop(key, None)
+    if previous is not None:
+      self.loop.cancel(previous)
+    interval = timers.LS_REFRESH_TIME * (1.0 - random.uniform(0.0, timers.LS_REFRESH_JITTER))
+    delay = max(0.0, interval - age)
+
+    def refresh() -> None:
+      self._refresh_tasks.pop(key, None)
+      self.metrics.incr("lsa.refresh")
+      self._reoriginate(area, kind, force=True)
+
+    self._refresh_tasks[key] = self.loop.schedule(delay, refresh)
+
+  def _summary_prefixes_for(self, target: AreaState) -> Dict[str, int]:
+    """
+    计算 ABR 应向 ``target`` 通告的前缀及度量：
+
+    - 其他 Area 的区域内路由，按该 Area 配置的聚合范围汇总；
+    - 向非骨干区域额外通告从骨干区域学到的区域间路由。
+    """
+    result: Dict[str, int] = {}
+
+    def offer(prefix: str, metric: int) -> None:
+      if prefix in target.routes:
+        return
+      if prefix not in result or metric < result[prefix]:
+        result[prefix] = metric
+
+    for area in self.areas.values():
+      if area is target:
+        continue
+      for prefix, metric in _summarize_routes(area.routes, area.ranges).items():
+        offer(prefix, metric)
+    if target.area_id != BACKBONE_AREA:
+      for prefix, entry in self.routes.items():
+        if entry.get("type") == "inter":
+          offer(prefix, int(entry["cost"]))
+    return result
+
   # -------------------------------------------------------------------- SPF
   def _schedule_spf(self) -> None:
     """触发 SPF 计算的调度器，带初始延迟以合并频繁更新。"""
@@ -475,124 +1431,709 @@ class Router:
 
     def run() -> None:
       self._spf_scheduled = False
+      self._spf_task = None
       self.run_spf()
 
     self._spf_scheduled = True
-    self.loop.schedule(delay, run)
+    self._spf_task = self.loop.schedule(delay, run)
+
+  def flush_spf(self) -> bool:
+    """立即执行已调度但尚未运行的 SPF，返回是否实际运行。"""
+    if not self._spf_scheduled:
+      return False
+    if self._spf_task is not None:
+      self.loop.cancel(self._spf_task)
+      self._spf_task = None
+    self._spf_scheduled = False
+    self.run_spf()
+    return True
 
   def run_spf(self) -> None:
-    """运行 Dijkstra 算法，生成最新的转发表视图。"""
-    snapshot = self.lsdb.snapshot()
-    graph: Dict[str, Dict[str, int]] = {}
-    net_records: List[Tuple[str, str, int]] = []
-
-    for lsa in snapshot.values():
-      if lsa.header.lsa_type != "router":
+    """
+    按 Area 运行 SPF，合并区域内与区域间路由生成转发表。
+
+    ABR 在路由变化后重新计算各 Area 的 Summary LSA。
+    """
+    changed = False
+    for area in self.areas.values():
+      changed |= self._run_area_spf(area)
+    if changed:
+      self._apply_routes()
+
+  def _apply_routes(self) -> None:
+    """区域内路由更新后合并各 Area 的路由、生成转发表并发布。"""
+    self._routes_dirty = True
+    self._request_publish()
+    single = next(iter(self.areas.values())) if len(self.areas) == 1 else None
+    if single is not None and not single.spf.summaries:
+      self.routes = single.routes
+      self._install_fib()
+      return
+    self.routes = self._merge_area_routes()
+    LOGGER.info("合并 %d 个 Area 的路由，共 %d 条", len(self.areas), len(self.routes))
+    self._install_fib()
+    if self.is_abr:
+      for area in self.areas.values():
+        self._originate_summary_lsa(area)
+
+  def _install_fib(self) -> None:
+    """
+    由当前路由表生成聚合后的转发表，并记录条目数与生成耗时。
+
+    已路由目的地址的转发结果与逐条安装 ``routes`` 相同，见 :mod:`implementation.fib`。
+    """
+    start = time.perf_counter()
+    self.fib = build_fib(self.routes, self._summary_ranges)
+    elapsed = time.perf_counter() - start
+    self.metrics.incr("fib.installs")
+    self.metrics.set("fib.install_s", elapsed)
+    self.metrics.set("fib.routes", len(self.routes))
+    self.metrics.set("fib.entries", len(self.fib))
+    LOGGER.debug("转发表 %d 条（路由 %d 条），耗时 %.3f ms", len(self.fib), len(self.routes), elapsed * 1000)
+
+  def _run_area_spf(self, area: AreaState) -> bool:
+    """
+    根据 ``area`` 的 LSDB 变化更新区域内路由，返回路由或区域间信息是否可能变化。
+
+    只处理 LSDB 变更回调记录的键，不遍历整个 LSDB，并按变化类型分流：
+    - 拓扑变化（links 改变、路由器出现或消失）重新运行 Dijkstra，
+      之后只重建距离或首跳发生变化的路由器所通告的前缀；
+    - 仅前缀变化（networks/loopback 改变）复用上次的距离与首跳，
+      只重建受影响前缀的路由条目。
+
+    图的规模达到 ``spf_offload_threshold`` 时 Dijkstra 在子进程中运行，
+    路由在结果返回后由 :meth:`_on_spf_result` 更新。拓扑回到缓存中的某个
+    状态时直接复用当时的最短路径结果，见 :meth:`_cached_paths`。
+    """
+    state = area.spf
+    topology_changed = state.recompute or (state.dist is None and state.pending is None)
+    state.recompute = False
+    summaries_changed = False
+    changed_prefixes: set[Prefix] = set()
+    dirty, state.dirty = state.dirty, set()
+
+    for key in dirty:
+      lsa_type, lsa_id = key
+      if lsa_type not in ("router", "summary", "network"):
+        continue
+      lsa = area.lsdb.lookup(lsa_type, lsa_id)
+      # Router/Summary LSA 的 lsa_id 即通告者的 Router ID；Network LSA 对应网段伪节点。
+      vertex = network_vertex(lsa_id) if lsa_type == "network" else lsa_id
+      if lsa is None:
+        if state.versions.pop(key, None) is None:
+          continue
+        adv_index = state.ids.intern(vertex)
+        if lsa_type == "summary":
+          state.summaries.pop(adv_index, None)
+          summaries_changed = True
+          continue
+        state.links.pop(adv_index, None)
+        changed_prefixes.update(state.set_prefixes(adv_index, {}))
+        topology_changed = True
         continue
       adv = lsa.header.advertising_router
-      graph.setdefault(adv, {})
-      for link in lsa.payload.get("links", []):
-        router_id = str(link.get("router_id"))
-        cost = int(link.get("cost", 1))
-        graph.setdefault(adv, {})
-        prev = graph[adv].get(router_id)
-        if prev is None or cost < prev:
-          graph[adv][router_id] = cost
+      if lsa_type == "summary":
+        version = (lsa.header.sequence, lsa.header.checksum)
+        if state.versions.get(key) == version:
+          continue
+        state.versions[key] = version
+        state.summaries[state.ids.intern(adv)] = {
+            str(entry.get("prefix")): int(entry.get("metric", 0))
+            for entry in lsa.payload.get("prefixes", [])
+        }
+        summaries_changed = True
+        continue
+      version = (lsa.header.sequence, lsa.header.checksum)
+      if state.versions.get(key) == version:
+        continue
+      state.versions[key] = version
+
+      adv_index = state.ids.intern(vertex)
+      if lsa_type == "network":
+        # 伪节点到网段上每台路由器的代价为 0，进入网段的代价由各路由器的链路给出。
+        links = pack_links(state.ids, ((str(rid), 0) for rid in lsa.payload.get("routers", [])))
+      else:
+        links = pack_links(
+            state.ids,
+            (
+                (
+                    str(link["router_id"]) if "router_id" in link else network_vertex(str(link.get("network"))),
+                    int(link.get("cost", 1)),
+                )
+                for link in lsa.payload.get("links", [])
+            ),
+        )
+      if state.links.get(adv_index) != links:
+        state.links[adv_index] = links
+        topology_changed = True
+      if lsa_type == "router" and lsa_id == self.router_id:
+        state.links_overridden = False
+
+      prefixes: Dict[Prefix, int] = {}
+      if lsa.payload.get("network"):
+        prefixes[parse_prefix(str(lsa.payload["network"]))] = 0
       loopback = lsa.payload.get("loopback")
       if loopback:
-        net_records.append((str(loopback), adv, int(lsa.payload.get("loopback_cost", 0))))
+        prefixes[parse_prefix(str(loopback))] = int(lsa.payload.get("loopback_cost", 0))
       for net in lsa.payload.get("networks", []):
-        prefix = str(net.get("prefix"))
-        metric = int(net.get("metric", 0))
-        net_records.append((prefix, adv, metric))
+        prefixes[parse_prefix(str(net.get("prefix")))] = int(net.get("metric", 0))
+      changed_prefixes.update(state.set_prefixes(adv_index, prefixes))
+
+    if topology_changed:
+      state.generation += 1
+      root = state.ids.intern(self.router_id)
+      cache_key = self._spf_cache_key(area)
+      cached = self._cached_paths(area, cache_key)
+      if cached is not None:
+        return self._apply_paths(area, *cached, changed_prefixes) or summaries_changed
+      graph = CsrGraph.build(len(state.ids), state.links)
+      if self._submit_spf(area, graph, root, changed_prefixes, cache_key):
+        return summaries_changed
+      paths = shortest_paths(graph, root, state.ids.transit)
+      self._cache_paths(area, cache_key, graph, paths)
+      return self._apply_paths(area, graph, paths, changed_prefixes) or summaries_changed
+    if state.dist is None:
+      # 首次 SPF 仍在子进程中计算，前缀变化留到结果生效时一并处理。
+      state.deferred.update(changed_prefixes)
+      return summaries_changed
+    return self._update_prefixes(area, changed_prefixes, topology_changed=False) or summaries_changed
+
+  def _apply_paths(
+      self,
+      area: AreaState,
+      graph: CsrGraph,
+      paths: Tuple[array, array],
+      changed_prefixes: set[Prefix],
+  ) -> bool:
+    """采用新的最短路径结果，并重建受影响的路由，返回路由是否变化。"""
+    state = area.spf
+    previous = (state.dist, state.first_hop)
+    state.graph = graph
+    state.dist, state.first_hop = paths
+    self._schedule_alternates(area)
+    if previous[0] is None:
+      routes = self._local_routes(area)
+      for prefix in state.candidates:
+        if format_prefix(prefix) not in routes:
+          self._update_route(area, routes, prefix)
+      area.routes = routes
+      LOGGER.info("Area %s SPF 计算完成，共生成 %d 条区域内路由", area.area_id, len(routes))
+      return True
+    # 只有距离或首跳变化的路由器所通告的前缀需要重新选路。
+    for index in changed_vertices(previous, paths):
+      changed_prefixes.update(state.prefixes.get(index, ()))
+    return self._update_prefixes(area, changed_prefixes, topology_changed=True)
+
+  def _update_prefixes(self, area: AreaState, changed_prefixes: set[Prefix], *, topology_changed: bool) -> bool:
+    if not changed_prefixes:
+      return False
+    routes = dict(area.routes)
+    local = self._local_routes(area)
+    for prefix in changed_prefixes:
+      if format_prefix(prefix) in local:
+        continue
+      self._update_route(area, routes, prefix)
+      self._update_alternate(area, routes, prefix)
+    area.routes = routes
+    LOGGER.info(
+        "Area %s %s，增量更新 %d 个前缀，共 %d 条路由",
+        area.area_id,
+        "SPF 计算完成" if topology_changed else "仅前缀变化",
+        len(changed_prefixes),
+        len(routes),
+    )
+    return True
+
+  def _spf_cache_key(self, area: AreaState) -> Optional[Tuple[int, int]]:
+    """
+    当前拓扑的缓存键。顶点下标只增不减，顶点数相同才能保证缓存的数组覆盖所有
+    路由器；本地临时摘除了链路时拓扑与 LSDB 不一致，返回 None。
+    """
+    state = area.spf
+    if self._spf_cache_size <= 0 or state.links_overridden:
+      return None
+    return area.lsdb.topology_hash, len(state.ids)
+
+  def _cached_paths(
+      self, area: AreaState, key: Optional[Tuple[int, int]]
+  ) -> Optional[Tuple[CsrGraph, Tuple[array, array]]]:
+    if key is None:
+      return None
+    cache = area.spf.cache
+    entry = cache.get(key)
+    self.metrics.incr("spf.cache.lookups")
+    if entry is not None:
+      cache.move_to_end(key)
+      self.metrics.incr("spf.cache.hits")
+      LOGGER.debug("Area %s 拓扑与缓存中的状态相同，复用最短路径结果", area.area_id)
+    self._update_cache_metrics()
+    return entry
+
+  def _cache_paths(
+      self, area: AreaState, key: Optional[Tuple[int, int]], graph: CsrGraph, paths: Tuple[array, array]
+  ) -> None:
+    if key is None:
+      return
+    cache = area.spf.cache
+    cache[key] = (graph, paths)
+    cache.move_to_end(key)
+    while len(cache) > self._spf_cache_size:
+      cache.popitem(last=False)
+    self._update_cache_metrics()
+
+  def _update_cache_metrics(self) -> None:
+    entries = 0
+    size = 0
+    for area in self.areas.values():
+      for graph, paths in area.spf.cache.values():
+        entries += 1
+        size += sum(len(a) * a.itemsize for a in (graph.offsets, graph.targets, graph.costs, *paths))
+    self.metrics.set("spf.cache.hit_rate", self.metrics.ratio("spf.cache.hits", "spf.cache.lookups"))
+    self.metrics.set("spf.cache.entries", entries)
+    self.metrics.set("spf.cache.bytes", size)
+
+  def _submit_spf(
+      self,
+      area: AreaState,
+      graph: CsrGraph,
+      root: int,
+      changed_prefixes: set[Prefix],
+      cache_key: Optional[Tuple[int, int]] = None,
+  ) -> bool:
+    """
+    图的规模达到 ``spf_offload_threshold`` 时把 Dijkstra 交给子进程，返回是否已提交。
+
+    事件循环继续处理 Hello 与 LSU；结果经 ``call_soon_threadsafe`` 回到循环线程，
+    期间若拓扑再次变化（generation 增加），旧结果直接丢弃。
+    """
+    state = area.spf
+    future = self._offload(graph, shortest_paths_packed, graph.pack(), root, tuple(state.ids.transit))
+    if future is None:
+      return False
+    state.pending = state.generation
+    state.deferred.update(changed_prefixes)
+    self._deliver_to_loop(
+        future,
+        functools.partial(self._on_spf_result, area, state.generation, graph, root, cache_key, time.perf_counter()),
+    )
+    self.metrics.incr("spf.offload.submitted")
+    return True
+
+  def _offload(self, graph: CsrGraph, func: Callable[..., T], *args: object) -> "Optional[Future[T]]":
+    """
+    图的顶点数达到 ``spf_offload_threshold`` 时把 ``func(*args)`` 提交给计算子进程，
+    否则返回 None。子进程池不可用时关闭卸载，此后一律在事件循环中计算。
+    """
+    if self._spf_offload_threshold <= 0 or graph.size < self._spf_offload_threshold:
+      return None
+    try:
+      if self._spf_pool is None:
+        # spawn 方式启动，避免在已有 CLI 等线程的进程中 fork。
+        self._spf_pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+      return self._spf_pool.submit(func, *args)
+    except (BrokenExecutor, OSError, RuntimeError):
+      LOGGER.exception("SPF 子进程不可用，改为在事件循环中计算")
+      self._spf_offload_threshold = 0
+      if self._spf_pool is not None:
+        self._spf_pool.shutdown(wait=False, cancel_futures=True)
+        self._spf_pool = None
+      return None
+
+  def _deliver_to_loop(self, future: "Future[T]", callback: Callable[["Future[T]"], None]) -> None:
+    # 完成回调运行在执行器的管理线程中，只负责把结果转交给事件循环。
+    future.add_done_callback(lambda done: self.loop.call_soon_threadsafe(callback, done))
+
+  def _on_spf_result(
+      self,
+      area: AreaState,
+      generation: int,
+      graph: CsrGraph,
+      root: int,
+      cache_key: Optional[Tuple[int, int]],
+      submitted: float,
+      future: "Future[Tuple[bytes, bytes]]",
+  ) -> None:
+    """在循环线程中应用子进程的 SPF 结果；已有更新的拓扑时丢弃。"""
+    state = area.spf
+    if state.pending == generation:
+      state.pending = None
+    if generation != state.generation or future.cancelled():
+      self.metrics.incr("spf.offload.stale")
+      LOGGER.debug("丢弃过期的 SPF 结果 generation=%d（当前 %d）", generation, state.generation)
+      return
+    try:
+      paths = unpack_paths(future.result())
+    except Exception:
+      LOGGER.exception("SPF 子进程计算失败，改为在事件循环中计算")
+      paths = shortest_paths(graph, root, state.ids.transit)
+    self.metrics.incr("spf.offload.applied")
+    self.metrics.set("spf.offload.latency_s", time.perf_counter() - submitted)
+    self._cache_paths(area, cache_key, graph, paths)
+    changed_prefixes, state.deferred = state.deferred, set()
+    if self._apply_paths(area, graph, paths, changed_prefixes):
+      self._apply_routes()
+
+  # -------------------------------------------------------------------- LFA
+  def _schedule_alternates(self, area: AreaState) -> None:
+    """SPF 完成后在事件循环空闲时计算备份路径，不推迟主路由的生效。"""
+    state = area.spf
+    if state.lfa_task is not None:
+      return
 
-    dist: Dict[str, float] = {self.router_id: 0}
-    first_hop: Dict[str, Optional[str]] = {self.router_id: None}
-    heap: List[Tuple[float, str]] = [(0, self.router_id)]
+    def run() -> None:
+      state.lfa_task = None
+      self._compute_alternates(area)
 
-    while heap:
-      cost, vertex = heappop(heap)
-      if cost > dist.get(vertex, float("inf")):
-        continue
-      for neighbor, weight in graph.get(vertex, {}).items():
-        new_cost = cost + weight
-        if new_cost < dist.get(neighbor, float("inf")):
-          dist[neighbor] = new_cost
-          if vertex == self.router_id:
-            first_hop[neighbor] = neighbor
-          else:
-            first_hop[neighbor] = first_hop.get(vertex)
-          heappush(heap, (new_cost, neighbor))
+    state.lfa_task = self.loop.schedule(timers.LFA_DELAY, run)
 
-    routes: Dict[str, Dict[str, object]] = {}
+  def _compute_alternates(self, area: AreaState) -> None:
+    """
+    为每个目的路由器选择满足 RFC 5286 无环条件的备份首跳（见
+    :func:`~implementation.compact.loop_free_alternates`），再为各前缀生成备份路由。
+
+    图的规模达到 ``spf_offload_threshold`` 时备份首跳在子进程中计算。
+    """
+    state = area.spf
+    if state.dist is None or state.graph is None or state.first_hop is None:
+      return
+    root = state.ids.intern(self.router_id)
+    graph = state.graph
+    future = self._offload(
+        graph,
+        loop_free_alternates_packed,
+        graph.pack(),
+        root,
+        (state.dist.tobytes(), state.first_hop.tobytes()),
+        tuple(state.ids.transit),
+    )
+    if future is not None:
+      self._deliver_to_loop(future, functools.partial(self._on_alternates_result, area, graph))
+      self.metrics.incr("spf.offload.lfa_submitted")
+      return
+    start = time.perf_counter()
+    state.neighbor_dist, alternates = loop_free_alternates(graph, root, state.dist, state.first_hop, state.ids.transit)
+    self._install_alternates(area, alternates, start)
+
+  def _on_alternates_result(
+      self,
+      area: AreaState,
+      graph: CsrGraph,
+      future: "Future[Dict[int, Tuple[int, int]]]",
+  ) -> None:
+    """应用子进程计算的备份首跳；期间拓扑已重算（图已替换）时丢弃。"""
+    state = area.spf
+    if state.graph is not graph or future.cancelled():
+      self.metrics.incr("spf.offload.stale")
+      return
+    start = time.perf_counter()
+    try:
+      alternates = future.result()
+    except Exception:
+      LOGGER.exception("备份路径子进程计算失败")
+      return
+    state.neighbor_dist = {}
+    self._install_alternates(area, alternates, start)
+
+  def _install_alternates(self, area: AreaState, alternates: Dict[int, Tuple[int, int]], start: float) -> None:
+    state = area.spf
+    state.router_alternates = alternates
+    state.alternates = {}
+    for prefix in state.candidates:
+      if format_prefix(prefix) in area.routes:
+        self._update_alternate(area, area.routes, prefix)
+    elapsed = time.perf_counter() - start
+    self.metrics.incr("lfa.runs")
+    self.metrics.incr("lfa.cpu_s", elapsed)
+    self.metrics.set(f"lfa.protected.{area.area_id}", len(state.alternates))
+    LOGGER.debug(
+        "Area %s 备份路径计算完成：%d/%d 条路由受保护，用时 %.1f ms",
+        area.area_id,
+        len(state.alternates),
+        len(area.routes),
+        elapsed * 1000,
+    )
 
-    # Local routes (connected)
-    for iface_state in self.interfaces.values():
+  def _update_alternate(self, area: AreaState, routes: Dict[str, Dict[str, object]], prefix: Prefix) -> None:
+    """
+    为 ``prefix`` 选择首跳不同于主路由的备份：可以是经由另一首跳到达的
+    其他通告者，也可以是主通告者的无环备份邻居。
+    """
+    state = area.spf
+    name = format_prefix(prefix)
+    state.alternates.pop(name, None)
+    entry = routes.get(name)
+    if entry is None or state.dist is None:
+      return
+    primary = state.ids.lookup(entry.get("next_hop_router"))  # type: ignore[arg-type]
+    if primary is None:
+      return
+    root = state.ids.lookup(self.router_id)
+    best: Optional[Tuple[int, int]] = None
+    for adv_index, metric in state.candidates.get(prefix, {}).items():
+      if adv_index == root:
+        continue
+      base_cost = state.distance(adv_index)
+      hop = state.hop(adv_index)
+      if base_cost is not None and hop is not None and hop != primary:
+        candidate = (base_cost + metric, hop)
+        if best is None or candidate < best:
+          best = candidate
+      alternate = state.router_alternates.get(adv_index)
+      if alternate is not None and alternate[0] != primary:
+        candidate = (alternate[1] + metric, alternate[0])
+        if best is None or candidate < best:
+          best = candidate
+    if best is None:
+      return
+    cost, hop = best
+    backup = self._route_via(area, state.ids.name(hop), cost)
+    backup["protection"] = "lfa"
+    state.alternates[name] = backup
+
+  def _activate_alternates(self, area: AreaState, down: set[str]) -> int:
+    """将首跳已断开的区域内路由立即切换到备份路径，返回切换的路由数。"""
+    alternates = area.spf.alternates
+    switched: Dict[str, Dict[str, object]] = {}
+    for prefix, entry in area.routes.items():
+      if entry.get("next_hop_router") not in down:
+        continue
+      backup = alternates.get(prefix)
+      if backup is not None and backup.get("next_hop_router") not in down:
+        switched[prefix] = backup
+    if not switched:
+      return 0
+    shared = self.routes is area.routes
+    area.routes = {**area.routes, **switched}
+    self.routes = area.routes if shared else self._merge_area_routes()
+    self._install_fib()
+    self._routes_dirty = True
+    self._request_publish()
+    self.metrics.incr("lfa.activations", len(switched))
+    LOGGER.info("Area %s 邻居 %s 断开，%d 条路由切换到备份路径", area.area_id, sorted(down), len(switched))
+    return len(switched)
+
+  def _local_routes(self, area: AreaState) -> Dict[str, Dict[str, object]]:
+    """``area`` 内的直连网段与 loopback 路由，优先级高于任何远端通告。"""
+    routes: Dict[str, Dict[str, object]] = {}
+    for iface_state in area.interfaces.values():
       routes[str(iface_state.address.network.with_prefixlen)] = {
           "cost": 0,
           "interface": iface_state.config.name,
           "next_hop": None,
+          "area": area.area_id,
       }
     if self._loopback:
       routes[str(self._loopback.with_prefixlen)] = {
           "cost": 0,
           "interface": "lo",
           "next_hop": None,
+          "area": area.area_id,
       }
-
-    for prefix, adv_router, metric in net_records:
-      if adv_router == self.router_id:
+    return routes
+
+  def _update_route(self, area: AreaState, routes: Dict[str, Dict[str, object]], prefix: Prefix) -> None:
+    """在所有通告者中为 ``prefix`` 选择代价最小的路径，写入或移除路由条目。"""
+    state = area.spf
+    root = state.ids.lookup(self.router_id)
+    best: Optional[Tuple[int, int, int]] = None
+    for adv_index, metric in state.candidates.get(prefix, {}).items():
+      if adv_index == root:
         continue
-      base_cost = dist.get(adv_router)
+      base_cost = state.distance(adv_index)
       if base_cost is None:
         continue
-      total_cost = base_cost + metric
-      hop = first_hop.get(adv_router)
-      iface_state, neighbor_cfg = self._resolve_first_hop(hop)
-      routes[prefix] = {
-          "cost": total_cost,
-          "interface": iface_state.config.name if iface_state else None,
-          "next_hop": neighbor_cfg.addr if neighbor_cfg else None,
-          "next_hop_router": hop,
-      }
+      # 代价相同时按 Router ID 数值决定，结果与通告顺序无关。
+      candidate = (base_cost + metric, state.ids.values[adv_index], adv_index)
+      if best is None or candidate < best:
+        best = candidate
+    name = format_prefix(prefix)
+    if best is None:
+      routes.pop(name, None)
+      return
+    total_cost, _, adv_index = best
+    routes[name] = self._route_via(area, state.hop_name(adv_index), total_cost)
+
+  def _route_via(self, area: AreaState, hop: Optional[str], cost: float, route_type: str = "intra") -> Dict[str, object]:
+    iface_state, neighbor_cfg = self._resolve_first_hop(hop, area.area_id)
+    return {
+        "cost": cost,
+        "interface": iface_state.config.name if iface_state else None,
+        "next_hop": neighbor_cfg.addr if neighbor_cfg else None,
+        "next_hop_router": hop,
+        "area": area.area_id,
+        "type": route_type,
+    }
 
-    self.routes = routes
-    LOGGER.info("SPF 计算完成，共生成 %d 条路由", len(routes))
+  def _merge_area_routes(self) -> Dict[str, Dict[str, object]]:
+    """
+    合并各 Area 的区域内路由，再补充由 Summary LSA 得到的区域间路由。
 
-  # --------------------------------------------------------------- utilities
-  def get_neighbors(self) -> Dict[str, Dict[str, object]]:
-    """供 CLI 使用的邻居快照。"""
-    snapshot: Dict[str, Dict[str, object]] = {}
+    区域内路由总是优先；ABR 只采用骨干区域中的 Summary LSA。
+    """
+    routes: Dict[str, Dict[str, object]] = {}
+    for area in self.areas.values():
+      for prefix, entry in area.routes.items():
+        current = routes.get(prefix)
+        if current is None or entry["cost"] < current["cost"]:
+          routes[prefix] = entry
+
+    if self.is_abr and BACKBONE_AREA in self.areas:
+      sources = [self.areas[BACKBONE_AREA]]
+    else:
+      sources = list(self.areas.values())
+    inter: Dict[str, Tuple[int, int, int, AreaState]] = {}
+    for area in sources:
+      state = area.spf
+      root = state.ids.lookup(self.router_id)
+      for abr, prefixes in state.summaries.items():
+        if abr == root:
+          continue
+        base_cost = state.distance(abr)
+        if base_cost is None:
+          continue
+        for prefix, metric in prefixes.items():
+          if prefix in routes:
+            continue
+          candidate = (base_cost + metric, state.ids.values[abr], abr, area)
+          current = inter.get(prefix)
+          if current is None or candidate[:2] < current[:2]:
+            inter[prefix] = candidate
+    for prefix, (cost, _, abr, area) in inter.items():
+      routes[prefix] = self._route_via(area, area.spf.hop_name(abr), cost, "inter")
+    return routes
+
+  # --------------------------------------------------------------- snapshots
+  def _on_lsdb_changed(self, area: AreaState, key: Tuple[str, str]) -> None:
+    area.spf.dirty.add(key)
+    if self._reduced_flooding and key[0] == "router":
+      area.flood_dirty.add(key[1])
+    self._lsdb_dirty[self._lsdb_view_key(area.area_id, key)] = (area, key)
+    self._request_publish()
+
+  def _request_publish(self) -> None:
+    """在本轮事件循环结束后发布一次快照，合并同一轮内的多次变化。"""
+    if self._publish_task is None:
+      self._publish_task = self.loop.schedule(0, self._publish_snapshot)
+
+  def _publish_snapshot(self) -> None:
+    """
+    将累积的变化发布为新一代快照。
+
+    路由表每次 SPF 都会整体替换，可直接交给发布器；邻居视图很小，整体
+    重建；LSDB 只重新渲染发生变化的条目。
+    """
+    self._publish_task = None
+    replace: Dict[str, Dict[str, object]] = {}
+    update: Dict[str, Dict[str, Optional[object]]] = {}
+    if self._routes_dirty:
+      replace["routes"] = self.routes
+      replace["fib"] = self.fib.view()
+      self._routes_dirty = False
+    if self._neighbors_dirty:
+      replace["neighbors"] = self._neighbor_view()
+      self._neighbors_dirty = False
+    if self._lsdb_dirty:
+      now = time.time()
+      entries: Dict[str, Optional[object]] = {}
+      for name, (area, key) in self._lsdb_dirty.items():
+        lsa = area.lsdb.lookup(*key)
+        entries[name] = self._lsdb_entry(area.area_id, lsa, now) if lsa is not None else None
+      update["lsdb"] = entries
+      self._lsdb_dirty = {}
+    snapshot = self.snapshots.publish(replace=replace, update=update)
+    LOGGER.debug("发布状态快照 generation=%d", snapshot.generation)
+
+  def _neighbor_view(self) -> Dict[str, Dict[str, object]]:
+    view: Dict[str, Dict[str, object]] = {}
     for ifname, state in self.interfaces.items():
       for rid, adj in state.adjacency.items():
-        snapshot[f"{ifname}:{rid}"] = {
+        view[f"{ifname}:{rid}"] = {
             "interface": ifname,
             "neighbor": rid,
             "state": adj.state.value,
             "last_hello": adj.last_hello,
         }
-    return snapshot
-
-  def get_lsdb(self) -> Dict[str, object]:
-    """以易读格式返回 LSDB 内容。"""
-    view: Dict[str, object] = {}
-    for key, lsa in self.lsdb.snapshot().items():
-      view[f"{key[0]}:{key[1]}"] = {
-          "adv_router": lsa.header.advertising_router,
-          "seq": lsa.header.sequence,
-          "age": lsa.header.age,
-          "payload": lsa.payload,
-      }
     return view
 
-  def get_routes(self) -> Dict[str, object]:
-    """返回当前计算出的转发表。"""
-    return dict(self.routes)
+  def _lsdb_view_key(self, area_id: str, key: Tuple[str, str]) -> str:
+    name = f"{key[0]}:{key[1]}"
+    if len(self.areas) > 1:
+      name = f"{area_id}/{name}"
+    return name
 
-  def _resolve_interface_for_neighbor(self, router_id: str, src_ip: Optional[str]) -> Optional[InterfaceState]:
-    """根据邻居 Router ID 或报文源地址推断接入的接口。"""
+  @staticmethod
+  def _lsdb_entry(area_id: str, lsa: Lsa, now: float) -> Dict[str, object]:
+    # age 只在条目变化时渲染，读取方可据 as_of 推算当前 age。
+    return {
+        "area": area_id,
+        "adv_router": lsa.header.advertising_router,
+        "seq": lsa.header.sequence,
+        "age": lsa.header.age,
+        "as_of": now,
+        "payload": lsa.payload,
+    }
+
+  def find_lsdb(self, *, adv_router: Optional[str] = None, prefix: Optional[str] = None) -> Dict[str, object]:
+    """
+    按通告者或前缀过滤 LSDB，借助二级索引而不遍历全部条目。
+
+    需在事件循环线程中调用（CLI 经 ``loop.call_threadsafe`` 转交）；前缀非法时抛出 ValueError。
+    """
+    now = time.time()
+    result: Dict[str, object] = {}
+    for area in self.areas.values():
+      if adv_router is not None:
+        lsas = area.lsdb.by_advertising_router(adv_router)
+      elif prefix is not None:
+        lsas = area.lsdb.by_prefix(prefix)
+      else:
+        lsas = list(area.lsdb.snapshot().values())
+      for lsa in lsas:
+        result[self._lsdb_view_key(area.area_id, lsa.fingerprint())] = self._lsdb_entry(area.area_id, lsa, now)
+    return result
+
+  # --------------------------------------------------------------- utilities
+  def get_neighbors(self) -> Mapping[str, object]:
+    """供 CLI 使用的邻居视图，取自最新发布的只读快照。"""
+    return self.snapshots.current.neighbors
+
+  def get_lsdb(self) -> Mapping[str, object]:
+    """以易读格式返回 LSDB 内容；多 Area 时键以 Area 为前缀。"""
+    return self.snapshots.current.lsdb
+
+  def get_routes(self) -> Mapping[str, object]:
+    """返回最新快照中的路由表。"""
+    return self.snapshots.current.routes
+
+  def get_fib(self) -> Mapping[str, object]:
+    """返回最新快照中聚合后的转发表。"""
+    return self.snapshots.current.fib
+
+  def get_stats(self) -> Dict[str, float]:
+    """返回运行计数器及派生比率。"""
+    stats = self.metrics.snapshot()
+    stats["lsu.duplicate_rate"] = self.metrics.ratio("lsu.lsas_duplicate", "lsu.lsas_received")
+    stats["lsu.compress.ratio"] = self.metrics.ratio("lsu.compress.bytes_out", "lsu.compress.bytes_in")
+    return stats
+
+  def _neighbors_in_area(self, area: AreaState, router_id: str) -> List[NeighborConfig]:
+    return [
+        neighbor for iface_state, neighbor in self._neighbor_index.get(router_id, [])
+        if iface_state.config.area == area.area_id
+    ]
+
+  def _resolve_interface_for_neighbor(
+      self,
+      router_id: str,
+      src_ip: Optional[str],
+      area_id: Optional[str] = None,
+  ) -> Optional[InterfaceState]:
+    """根据邻居 Router ID 或报文源地址推断接入的接口，优先匹配报文所属 Area。"""
     entries = self._neighbor_index.get(router_id)
     if entries:
+      for iface_state, _ in entries:
+        if area_id is None or iface_state.config.area == area_id:
+          return iface_state
       return entries[0][0]
     if src_ip:
       for iface_state in self.interfaces.values():
@@ -601,15 +2142,58 @@ class Router:
             return iface_state
     return None
 
-  def _resolve_first_hop(self, hop: Optional[str]) -> Tuple[Optional[InterfaceState], Optional[NeighborConfig]]:
+  def _resolve_first_hop(
+      self,
+      hop: Optional[str],
+      area_id: Optional[str] = None,
+  ) -> Tuple[Optional[InterfaceState], Optional[NeighborConfig]]:
     """将首跳路由器映射到对应的接口与邻居配置。"""
     if hop is None:
       return None, None
     entries = self._neighbor_index.get(hop)
     if not entries:
       return None, None
+    for entry in entries:
+      if area_id is None or entry[0].config.area == area_id:
+        return entry
     return entries[0]
 
   @staticmethod
   def _port_for_router(router_id: str) -> int:
     return _SINGLE_PROCESS_BASE_PORT + (abs(hash(router_id)) % 10000)
+
+
+def _network_kind(iface_state: InterfaceState) -> str:
+  """Network LSA 在限速与刷新表中的键：每个广播接口一条。"""
+  return f"network:{iface_state.config.name}"
+
+
+def _supersedes(new: Lsa, old: Lsa) -> bool:
+  """同一 LSA 的两个收到的实例中 ``new`` 是否更新：序列号更大，其次清除优先，再次校验和不同。"""
+  if new.header.sequence != old.header.sequence:
+    return new.header.sequence > old.header.sequence
+  new_flush = new.header.age >= timers.MAX_AGE
+  if new_flush != (old.header.age >= timers.MAX_AGE):
+    return new_flush
+  return new.header.checksum != old.header.checksum
+
+
+def _summarize_routes(
+    routes: Dict[str, Dict[str, object]],
+    ranges: List[ipaddress.IPv4Network],
+) -> Dict[str, int]:
+  """
+  将区域内路由按聚合范围汇总：被范围覆盖的前缀以范围本身通告，
+  度量取被覆盖前缀中的最大值；其余前缀原样通告。
+  """
+  summarized: Dict[str, int] = {}
+  for prefix, entry in routes.items():
+    cost = int(entry["cost"])
+    network = ipaddress.ip_network(prefix)
+    covering = next((rng for rng in ranges if network.subnet_of(rng)), None)
+    key = str(covering) if covering is not None else prefix
+    if covering is not None:
+      summarized[key] = max(summarized.get(key, 0), cost)
+    elif key not in summarized or cost < summarized[key]:
+      summarized[key] = cost
+  return summarized
@@ -0,0 +1,303 @@
+"""
+脚本化故障场景：测量流量黑洞与微环路的持续时间。
+
+日志中的“SPF 计算完成”并不代表转发已经恢复。场景运行器在一个进程内用
+:class:`~implementation.fabric.Fabric` 启动整个拓扑，按时间线注入链路中断/
+恢复、代价变化与路由器宕机，并以固定步长探测每一对路由器之间的转发路径：
+从源路由器出发，逐跳在各路由器的转发表（与 ``routes`` 的最长前缀匹配结果
+相同）中查找目的 loopback，直到
+
+- 到达目的路由器：正常；
+- 没有匹配条目、下一跳不存在，或到下一跳的链路已中断、路由器已宕机：黑洞；
+- 回到已经过的路由器：微环路。
+
+每个事件统计从它发生到下一个事件之间的异常：受影响的路由器对数、单对的
+最长与累计持续时间，以及所有路由器对恢复正常所用的时间。
+
+场景文件（YAML）::
+
+  topology: topo.sample.yaml        # 相对场景文件的路径，也可以直接内联拓扑映射
+  defaults: {hello_interval: 1, dead_interval: 4}   # 覆盖拓扑中的 defaults
+  step_ms: 10                       # 探测步长
+  settle: 10                        # 最后一个事件之后继续观察的秒数
+  timeout: 60                       # 等待初始收敛的秒数
+  events:
+    - {at: 1, link_down: [1.1.1.1, 2.2.2.2]}
+    - {at: 12, link_up: [1.1.1.1, 2.2.2.2]}
+    - {at: 20, cost: {router: 1.1.1.1, neighbor: 5.5.5.5, value: 50}}
+    - {at: 30, kill: 3.3.3.3}
+
+``at`` 为相对初始收敛时刻的秒数；``cost`` 只修改指定路由器一侧的接口代价。
+拓扑中路由器自带的 ``impairment`` 段（见 :mod:`implementation.impair`）同样生效。
+
+用法（在 ``experiments/03`` 目录下）::
+
+  python -m implementation.scenario scenario.sample.yaml [--step-ms 10] [--json]
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import functools
+import ipaddress
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional, Tuple
+
+from .events import EventLoop
+from .fabric import Fabric
+from .impair import ImpairedTransport
+from .main import load_config
+from .router import Router
+
+LOGGER = logging.getLogger(__name__)
+
+OK = "ok"
+BLACKHOLE = "blackhole"
+LOOP = "loop"
+ACTIONS = ("link_down", "link_up", "cost", "kill")
+
+Pair = Tuple[str, str]
+
+
+@dataclass
+class Event:
+  at: float
+  action: str
+  target: object
+
+  @property
+  def label(self) -> str:
+    if self.action in ("link_down", "link_up"):
+      a, b = self.target  # type: ignore[misc]
+      return f"{self.action} {a}-{b}"
+    if self.action == "cost":
+      spec = self.target
+      return f"cost {spec['router']}->{spec['neighbor']}={spec['value']}"  # type: ignore[index]
+    return f"kill {self.target}"
+
+  @classmethod
+  def from_config(cls, raw: Mapping[str, object]) -> "Event":
+    actions = [name for name in ACTIONS if name in raw]
+    if len(actions) != 1 or "at" not in raw:
+      raise ValueError(f"event needs 'at' and exactly one of {', '.join(ACTIONS)}: {dict(raw)!r}")
+    action = actions[0]
+    target = raw[action]
+    if action in ("link_down", "link_up"):
+      if not isinstance(target, list) or len(target) != 2:
+        raise ValueError(f"{action} expects two router IDs")
+      target = (str(target[0]), str(target[1]))
+    elif action == "cost":
+      if not isinstance(target, Mapping) or not {"router", "neighbor", "value"} <= set(target):
+        raise ValueError("cost expects router, neighbor and value")
+      target = {"router": str(target["router"]), "neighbor": str(target["neighbor"]), "value": int(target["value"])}
+    else:
+      target = str(target)
+    return cls(at=float(raw["at"]), action=action, target=target)  # type: ignore[arg-type]
+
+
+@dataclass
+class _Window:
+  """一个事件从发生到下一个事件之间的探测统计。"""
+  event: Optional[Event]
+  started: float
+  durations: Dict[str, Dict[Pair, float]] = field(default_factory=lambda: {BLACKHOLE: {}, LOOP: {}})
+  last_bad: Optional[float] = None
+
+  def report(self) -> Dict[str, object]:
+    result: Dict[str, object] = {
+        "event": self.event.label if self.event is not None else "baseline",
+        "at_s": self.event.at if self.event is not None else 0.0,
+        "recovered_s": round(self.last_bad - self.started, 3) if self.last_bad is not None else 0.0,
+    }
+    for kind in (BLACKHOLE, LOOP):
+      durations = self.durations[kind]
+      result[f"{kind}_pairs"] = len(durations)
+      result[f"{kind}_max_s"] = round(max(durations.values(), default=0.0), 3)
+      result[f"{kind}_total_s"] = round(sum(durations.values()), 3)
+    return result
+
+
+class ScenarioRunner:
+  """在单个事件循环中运行拓扑、执行时间线并统计转发异常。"""
+
+  def __init__(self, topology: Mapping[str, object], events: List[Event], *, step: float = 0.01) -> None:
+    self.loop = EventLoop()
+    self.fabric = Fabric(self.loop)
+    self.events = sorted(events, key=lambda event: event.at)
+    self.step = step
+    self.routers: Dict[str, Router] = {}
+    self.loopbacks: Dict[str, str] = {}
+    self.killed: set[str] = set()
+    routers = topology.get("routers", {})
+    for rid, entry in routers.items():  # type: ignore[union-attr]
+      router = Router(str(rid), dict(topology), self.loop, dry_run=True)
+      self.routers[str(rid)] = router
+      loopback = entry.get("loopback") if isinstance(entry, Mapping) else None
+      if loopback:
+        self.loopbacks[str(rid)] = str(ipaddress.ip_interface(str(loopback)).ip)
+    self._windows: List[_Window] = []
+    self._last_probe = 0.0
+    self._healthy = False
+
+  # ------------------------------------------------------------------ run
+  def run(self, *, timeout: float, settle: float) -> Dict[str, object]:
+    for rid, router in self.routers.items():
+      router.bootstrap(bind=False)
+      self.fabric.attach(router)
+      impairment = router.config.get("routers", {}).get(rid, {}).get("impairment")  # type: ignore[union-attr]
+      if impairment:
+        ImpairedTransport.from_config(self.loop, impairment).attach(router)
+
+    started = time.monotonic()
+    self._last_probe = started
+    probe_task = self.loop.schedule(self.step, self._probe, repeat=True)
+    converged = self._run_until(lambda: self._healthy, started + timeout)
+    convergence = time.monotonic() - started
+    pairs = len(self._pairs())
+
+    origin = time.monotonic()
+    self._windows = [_Window(event=None, started=origin)]
+    for event in self.events:
+      self.loop.schedule(max(0.0, origin + event.at - time.monotonic()), functools.partial(self._apply, event))
+    end = origin + (self.events[-1].at if self.events else 0.0) + settle
+    self._run_until(lambda: False, end)
+    self.loop.cancel(probe_task)
+
+    for rid, router in self.routers.items():
+      if rid not in self.killed:
+        router.shutdown()
+    return {
+        "routers": len(self.routers),
+        "pairs": pairs,
+        "step_ms": round(self.step * 1000, 3),
+        "converged": converged,
+        "convergence_s": round(convergence, 3),
+        "events": [window.report() for window in self._windows],
+    }
+
+  def _run_until(self, done, deadline: float) -> bool:  # type: ignore[no-untyped-def]
+    while time.monotonic() < deadline:
+      self.loop._run_once()
+      if done():
+        return True
+    return False
+
+  # --------------------------------------------------------------- events
+  def _apply(self, event: Event) -> None:
+    LOGGER.warning("t=%.3fs 执行事件 %s", event.at, event.label)
+    if event.action == "link_down":
+      self.fabric.down(*event.target)  # type: ignore[misc]
+    elif event.action == "link_up":
+      self.fabric.up(*event.target)  # type: ignore[misc]
+    elif event.action == "cost":
+      spec = event.target
+      router = self.routers[spec["router"]]  # type: ignore[index]
+      for iface_state in router.interfaces.values():
+        if spec["neighbor"] in iface_state.neighbors:  # type: ignore[index]
+          iface_state.config.cost = spec["value"]  # type: ignore[index]
+      router._originate_router_lsa()
+    else:
+      rid = str(event.target)
+      if rid not in self.killed:
+        self.killed.add(rid)
+        self.routers[rid].shutdown()
+        self.fabric.detach(self.routers[rid])
+    self._windows.append(_Window(event=event, started=time.monotonic()))
+
+  # ---------------------------------------------------------------- probes
+  def _pairs(self) -> List[Pair]:
+    alive = [rid for rid in self.routers if rid not in self.killed and rid in self.loopbacks]
+    return [(src, dst) for src in alive for dst in alive if src != dst]
+
+  def trace(self, src: str, dst: str) -> str:
+    """从 ``src`` 逐跳转发到 ``dst`` 的 loopback，返回 ok、blackhole 或 loop。"""
+    address = self.loopbacks[dst]
+    current = src
+    visited: set[str] = set()
+    while current != dst:
+      if current in visited:
+        return LOOP
+      visited.add(current)
+      action = self.routers[current].fib.lookup(address)
+      if action is None:
+        return BLACKHOLE
+      next_hop, _, next_router = action
+      if next_router is None and next_hop is not None:
+        owner = self.fabric.owner(next_hop)
+        next_router = owner.router_id if owner is not None else None
+      if next_router is None or next_router in self.killed or next_router not in self.routers:
+        return BLACKHOLE
+      if self.fabric.is_down(current, next_router):
+        return BLACKHOLE
+      current = next_router
+    return OK
+
+  def _probe(self) -> None:
+    now = time.monotonic()
+    elapsed, self._last_probe = now - self._last_probe, now
+    bad = [(pair, state) for pair in self._pairs() if (state := self.trace(*pair)) != OK]
+    self._healthy = not bad
+    if not self._windows or not bad:
+      return
+    window = self._windows[-1]
+    window.last_bad = now
+    for pair, state in bad:
+      durations = window.durations[state]
+      durations[pair] = durations.get(pair, 0.0) + elapsed
+
+
+def load_scenario(path: Path) -> Tuple[Dict[str, object], Dict[str, object]]:
+  """读取场景文件，返回 (拓扑配置, 场景参数)；拓扑可以是相对路径或内联映射。"""
+  scenario = load_config(path)
+  topology = scenario.get("topology")
+  if isinstance(topology, str):
+    topology = load_config((path.parent / topology).resolve())
+  if not isinstance(topology, Mapping) or "routers" not in topology:
+    raise ValueError("scenario needs a topology with routers")
+  topology = copy.deepcopy(dict(topology))
+  overrides = scenario.get("defaults") or {}
+  topology["defaults"] = {**(topology.get("defaults") or {}), **overrides}
+  return topology, scenario
+
+
+def main(argv: list[str]) -> int:
+  parser = argparse.ArgumentParser(description="Run a scripted failure timeline and measure blackholes and microloops.")
+  parser.add_argument("scenario", help="Scenario file (YAML)")
+  parser.add_argument("--step-ms", type=float, default=None, help="Probe interval; overrides the scenario file")
+  parser.add_argument("--json", action="store_true", help="Print the report as one JSON object")
+  args = parser.parse_args(argv)
+
+  logging.basicConfig(level=logging.ERROR)
+  topology, scenario = load_scenario(Path(args.scenario))
+  events = [Event.from_config(raw) for raw in scenario.get("events") or []]  # type: ignore[union-attr]
+  step_ms = args.step_ms if args.step_ms is not None else float(scenario.get("step_ms", 10))  # type: ignore[arg-type]
+  runner = ScenarioRunner(topology, events, step=max(0.001, step_ms / 1000))
+  result = runner.run(
+      timeout=float(scenario.get("timeout", 60)),  # type: ignore[arg-type]
+      settle=float(scenario.get("settle", 10)),  # type: ignore[arg-type]
+  )
+  if args.json:
+    print(json.dumps(result, sort_keys=True))
+    return 0
+  print(
+      f"routers {result['routers']} pairs {result['pairs']} step {result['step_ms']}ms"
+      f" converged={result['converged']} in {result['convergence_s']}s"
+  )
+  for row in result["events"]:  # type: ignore[union-attr]
+    print(
+        f"t={row['at_s']:>7.3f}s {row['event']:40s}"
+        f" blackhole pairs={row['blackhole_pairs']} max={row['blackhole_max_s']}s total={row['blackhole_total_s']}s"
+        f" loop pairs={row['loop_pairs']} max={row['loop_max_s']}s total={row['loop_total_s']}s"
+        f" recovered={row['recovered_s']}s"
+    )
+  return 0
+
+
+if __name__ == "__main__":
+  sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,149 @@
+"""
+路由器状态的版本化只读快照。
+
+事件循环在状态变化后发布新的 :class:`StateSnapshot`：每个快照带有单调
+递增的 generation，各分区（routes / fib / neighbors / lsdb）以只读映射暴露。
+未变化的分区直接复用上一代的对象，变化的分区写时复制，因此 CLI 线程
+或查询服务读取 ``publisher.current`` 时既不需要加锁，也不必复制整个字典。
+
+发布器保留最近若干代的变更键集合，可回答 ``since=<generation>`` 形式的
+增量查询；请求的 generation 过旧时退化为全量结果。
+"""
+
+from __future__ import annotations
+
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Deque, Dict, FrozenSet, Iterable, Mapping, Optional
+
+SECTIONS = ("routes", "fib", "neighbors", "lsdb")
+
+_EMPTY: Mapping[str, object] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class StateSnapshot:
+  generation: int
+  timestamp: float
+  sections: Mapping[str, Mapping[str, object]]
+  changed: Mapping[str, FrozenSet[str]] = field(default_factory=dict)
+
+  @property
+  def routes(self) -> Mapping[str, object]:
+    return self.sections.get("routes", _EMPTY)
+
+  @property
+  def fib(self) -> Mapping[str, object]:
+    return self.sections.get("fib", _EMPTY)
+
+  @property
+  def neighbors(self) -> Mapping[str, object]:
+    return self.sections.get("neighbors", _EMPTY)
+
+  @property
+  def lsdb(self) -> Mapping[str, object]:
+    return self.sections.get("lsdb", _EMPTY)
+
+
+class SnapshotPublisher:
+  """
+  生成并保存状态快照；仅应在事件循环线程中调用 :meth:`publish`。
+  """
+
+  def __init__(self, history: int = 256) -> None:
+    self._current = StateSnapshot(
+        generation=0,
+        timestamp=time.time(),
+        sections={name: _EMPTY for name in SECTIONS},
+    )
+    self._history: Deque[StateSnapshot] = deque(maxlen=history)
+
+  @property
+  def current(self) -> StateSnapshot:
+    return self._current
+
+  def publish(
+      self,
+      *,
+      replace: Optional[Dict[str, Mapping[str, object]]] = None,
+      update: Optional[Dict[str, Dict[str, Optional[object]]]] = None,
+  ) -> StateSnapshot:
+    """
+    发布新一代快照。
+
+    ``replace`` 给出分区的完整新内容，变更键通过与上一代比较得到；
+    ``update`` 只给出变化的键，值为 None 表示删除。调用方在发布后不得
+    再修改传入的映射。
+    """
+    previous = self._current
+    sections = dict(previous.sections)
+    changed: Dict[str, FrozenSet[str]] = {}
+
+    for name, mapping in (replace or {}).items():
+      old = previous.sections.get(name, _EMPTY)
+      diff = {key for key, value in mapping.items() if old.get(key) != value}
+      diff.update(key for key in old if key not in mapping)
+      if diff:
+        sections[name] = mapping if isinstance(mapping, MappingProxyType) else MappingProxyType(mapping)
+        changed[name] = frozenset(diff)
+
+    for name, updates in (update or {}).items():
+      if not updates:
+        continue
+      merged = dict(sections.get(name, _EMPTY))
+      for key, value in updates.items():
+        if value is None:
+          merged.pop(key, None)
+        else:
+          merged[key] = value
+      sections[name] = MappingProxyType(merged)
+      changed[name] = frozenset(updates)
+
+    if not changed:
+      return previous
+    snapshot = StateSnapshot(
+        generation=previous.generation + 1,
+        timestamp=time.time(),
+        sections=MappingProxyType(sections),
+        changed=MappingProxyType(changed),
+    )
+    self._history.append(snapshot)
+    self._current = snapshot
+    return snapshot
+
+  def delta(self, since: int, names: Iterable[str] = SECTIONS) -> Dict[str, object]:
+    """
+    返回自 ``since`` 代以来的变化。无法覆盖该区间时返回全量内容，
+    并以 ``full: true`` 标明。
+    """
+    current = self._current
+    names = [name for name in names if name in current.sections]
+    oldest = self._history[0].generation if self._history else current.generation + 1
+    result: Dict[str, object] = {"generation": current.generation, "since": since}
+    if since >= current.generation:
+      result["full"] = False
+      result["sections"] = {name: {"changed": {}, "removed": []} for name in names}
+      return result
+    if since < oldest - 1 or since < 0:
+      result["full"] = True
+      result["sections"] = {name: dict(current.sections[name]) for name in names}
+      return result
+
+    touched: Dict[str, set] = {name: set() for name in names}
+    for snapshot in self._history:
+      if snapshot.generation <= since:
+        continue
+      for name in names:
+        touched[name].update(snapshot.changed.get(name, ()))
+    sections: Dict[str, object] = {}
+    for name in names:
+      mapping = current.sections[name]
+      sections[name] = {
+          "changed": {key: mapping[key] for key in touched[name] if key in mapping},
+          "removed": sorted(key for key in touched[name] if key not in mapping),
+      }
+    result["full"] = False
+    result["sections"] = sections
+    return result
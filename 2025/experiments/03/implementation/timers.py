@@ -9,6 +9,12 @@
 HELLO_INTERVAL = 5
 DEAD_INTERVAL = 20
 LS_REFRESH_TIME = 30 * 60  # LSA 默认 30 分钟刷新
+MAX_AGE = 60 * 60          # 达到 MaxAge 的 LSA 被泛洪清除
+FLUSH_HOLD_TIME = 5 * 60   # 清除后保留 MaxAge 实例的时间，期间拒绝同序列号的旧副本
+LS_REFRESH_JITTER = 0.1    # 自有 LSA 提前刷新的随机比例，错开各路由器的刷新时刻
 SPF_INITIAL_DELAY = 0.2    # SPF 触发的初始延迟，用于抑制抖动
 SPF_HOLD_TIME = 2.0        # 当前实现未使用，预留给后续 hold-down
 NEIGHBOR_TICK = 1.0        # 邻居与 LSDB aging 的周期性检查间隔
+CHECKPOINT_INTERVAL = 10.0 # LSDB 检查点写盘周期（启用 state_dir 时）
+MIN_LS_INTERVAL = 5.0      # 同一条自有 LSA 两次生成之间的最小间隔
+LFA_DELAY = 0.1            # SPF 完成后计算无环备份路径的延迟，不阻塞主路由下发
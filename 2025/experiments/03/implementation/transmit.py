@@ -0,0 +1,210 @@
+"""
+按邻居排队的报文发送。
+
+非阻塞 UDP 套接字的发送缓冲区满时 ``sendto`` 抛出 ``BlockingIOError``，若直接
+丢弃，整库同步这类突发只能依赖重传补救。:class:`Transmitter` 为每个邻居维护
+一个出站队列：
+
+- 套接字暂时不可写时报文留在队首，通过事件循环的 ``watch_writable`` 在可写后
+  继续发送（计入 ``retries``），内核报告 ``ENOBUFS`` 时短暂延迟后重试；
+- 可选的令牌桶按 ``rate``（报文/秒）与 ``burst`` 平滑每个邻居的发送速率；
+- Hello 与 BFD 等保活报文走加急通道，排在普通报文之前且不受限速影响；
+- 队列深度超过 ``max_depth`` 时丢弃新报文并计数（``dropped``）。
+
+队列之间轮转发送，单个邻居的大量同步报文不会阻塞其他邻居的保活报文。
+"""
+
+from __future__ import annotations
+
+import errno
+import logging
+import socket
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Tuple
+
+from .events import EventLoop
+from .metrics import Metrics
+
+LOGGER = logging.getLogger(__name__)
+
+Packet = Tuple[bytes, Tuple[str, int], str]
+
+DEFAULT_QUEUE_DEPTH = 4096
+DEFAULT_BURST = 64
+# 内核缓冲不足（ENOBUFS）时套接字仍报告可写，只能按时间重试。
+RETRY_DELAY = 0.005
+
+_TRANSIENT_ERRNOS = {errno.EAGAIN, errno.EWOULDBLOCK, errno.ENOBUFS, errno.EINTR}
+
+
+class _NeighborQueue:
+  __slots__ = ("name", "urgent", "bulk", "tokens", "updated", "sent", "dropped", "retries", "errors", "high_water")
+
+  def __init__(self, name: str, burst: float) -> None:
+    self.name = name
+    self.urgent: Deque[Packet] = deque()
+    self.bulk: Deque[Packet] = deque()
+    self.tokens = burst
+    self.updated = time.monotonic()
+    self.sent = 0
+    self.dropped = 0
+    self.retries = 0
+    self.errors = 0
+    self.high_water = 0
+
+  def __len__(self) -> int:
+    return len(self.urgent) + len(self.bulk)
+
+  def stats(self) -> Dict[str, int]:
+    return {
+        "queued": len(self),
+        "high_water": self.high_water,
+        "sent": self.sent,
+        "dropped": self.dropped,
+        "retries": self.retries,
+        "errors": self.errors,
+    }
+
+
+class Transmitter:
+  """
+  路由器的出站报文调度器；只应在事件循环线程中使用。
+
+  ``socket_of`` 返回当前用于发送的套接字（可能尚未创建）；``rate`` 为 0 时不限速。
+  """
+
+  def __init__(
+      self,
+      loop: EventLoop,
+      socket_of: Callable[[], Optional[socket.socket]],
+      *,
+      metrics: Metrics,
+      rate: float = 0.0,
+      burst: int = DEFAULT_BURST,
+      max_depth: int = DEFAULT_QUEUE_DEPTH,
+  ) -> None:
+    self.loop = loop
+    self.metrics = metrics
+    self.rate = max(0.0, float(rate))
+    self.burst = max(1, int(burst))
+    self.max_depth = max(1, int(max_depth))
+    self._socket_of = socket_of
+    self._queues: Dict[str, _NeighborQueue] = {}
+    # 有待发报文且未被限速的队列，按轮转顺序排列。
+    self._active: Deque[_NeighborQueue] = deque()
+    self._blocked = False
+    self._timer = None
+
+  def send(self, neighbor: str, data: bytes, addr: Tuple[str, int], kind: str, *, urgent: bool = False) -> bool:
+    """将报文放入 ``neighbor`` 的队列并尽快发送；队列已满而被丢弃时返回 False。"""
+    queue = self._queues.get(neighbor)
+    if queue is None:
+      queue = self._queues[neighbor] = _NeighborQueue(neighbor, self.burst)
+    if len(queue) >= self.max_depth:
+      queue.dropped += 1
+      self.metrics.incr("tx.dropped")
+      LOGGER.warning("发往 %s 的队列已满（%d），丢弃 %s 报文", neighbor, self.max_depth, kind)
+      return False
+    idle = not queue
+    (queue.urgent if urgent else queue.bulk).append((data, addr, kind))
+    queue.high_water = max(queue.high_water, len(queue))
+    if idle:
+      self._active.append(queue)
+    if not self._blocked:
+      self._flush()
+    return True
+
+  def stats(self) -> Dict[str, Dict[str, int]]:
+    return {name: queue.stats() for name, queue in self._queues.items()}
+
+  @property
+  def queued(self) -> int:
+    return sum(len(queue) for queue in self._queues.values())
+
+  def close(self) -> None:
+    if self._timer is not None:
+      self.loop.cancel(self._timer)
+      self._timer = None
+    sock = self._socket_of()
+    if self._blocked and isinstance(sock, socket.socket):
+      self.loop.unwatch_writable(sock)
+    self._blocked = False
+
+  # ------------------------------------------------------------ internals
+  def _flush(self) -> None:
+    sock = self._socket_of()
+    if sock is None:
+      return
+    now = time.monotonic()
+    paced: Optional[float] = None
+    active = self._active
+    while active:
+      queue = active.popleft()
+      if queue.urgent:
+        packet = queue.urgent[0]
+      else:
+        if self.rate:
+          queue.tokens = min(self.burst, queue.tokens + (now - queue.updated) * self.rate)
+          queue.updated = now
+          if queue.tokens < 1:
+            wait = (1 - queue.tokens) / self.rate
+            paced = wait if paced is None else min(paced, wait)
+            continue
+        packet = queue.bulk[0]
+      data, addr, kind = packet
+      try:
+        sock.sendto(data, addr)
+      except OSError as exc:
+        if exc.errno in _TRANSIENT_ERRNOS or isinstance(exc, BlockingIOError):
+          queue.retries += 1
+          self.metrics.incr("tx.retries")
+          active.appendleft(queue)
+          self._wait_writable(sock, exc.errno == errno.ENOBUFS)
+          return
+        # 不可恢复的错误（如地址不可达）只影响当前报文。
+        queue.errors += 1
+        self.metrics.incr("tx.errors")
+        LOGGER.error("发送 %s 至 %s:%s 失败: %s", kind, addr[0], addr[1], exc)
+      else:
+        queue.sent += 1
+        self.metrics.incr("tx.sent")
+      if queue.urgent:
+        queue.urgent.popleft()
+      else:
+        queue.bulk.popleft()
+        if self.rate:
+          queue.tokens -= 1
+      if queue:
+        active.append(queue)
+    if paced is not None:
+      # 被限速的队列在令牌补足后重新加入轮转。
+      self._requeue_paced()
+      if self._timer is not None:
+        self.loop.cancel(self._timer)
+      self._timer = self.loop.schedule(paced, self._on_timer)
+
+  def _requeue_paced(self) -> None:
+    waiting = {id(queue) for queue in self._active}
+    for queue in self._queues.values():
+      if queue and id(queue) not in waiting:
+        self._active.append(queue)
+
+  def _wait_writable(self, sock: socket.socket, no_buffers: bool) -> None:
+    self._blocked = True
+    if self._timer is not None:
+      self.loop.cancel(self._timer)
+      self._timer = None
+    if no_buffers or not isinstance(sock, socket.socket):
+      self._timer = self.loop.schedule(RETRY_DELAY, self._on_timer)
+    else:
+      self.loop.watch_writable(sock, self._on_writable)
+
+  def _on_writable(self, _sock: socket.socket) -> None:
+    self._blocked = False
+    self._flush()
+
+  def _on_timer(self) -> None:
+    self._timer = None
+    self._blocked = False
+    self._flush()
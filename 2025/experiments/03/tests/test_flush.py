@@ -0,0 +1,108 @@
+"""MaxAge 清除后，已清除的 LSA 不会经由 DD/LSR 交换或迟到的泛洪重新出现。"""
+
+from __future__ import annotations
+
+import unittest
+from dataclasses import replace
+
+from implementation import timers
+from implementation.bench_common import AREA, add_p2p_links, loopbacks_reachable, router_id, run_until
+from implementation.events import EventLoop
+from implementation.fabric import Fabric
+from implementation.lsdb import LinkStateDatabase, Lsa, LsaHeader
+from implementation.router import Router
+
+PHANTOM = "192.0.2.99"
+
+
+def _phantom_lsa(sequence: int, age: int = 0) -> Lsa:
+  return Lsa(
+      header=LsaHeader("router", PHANTOM, PHANTOM, sequence, age=age),
+      payload={"router_id": PHANTOM, "links": [], "loopback": f"{PHANTOM}/32"},
+  )
+
+
+def _flushed(lsa: Lsa) -> Lsa:
+  return Lsa(header=replace(lsa.header, age=timers.MAX_AGE), payload=lsa.payload)
+
+
+class FlushedHoldTest(unittest.TestCase):
+
+  def test_same_sequence_rejected_until_released(self) -> None:
+    lsdb = LinkStateDatabase()
+    lsa = _phantom_lsa(0x80000005)
+    self.assertTrue(lsdb.install(lsa))
+    self.assertTrue(lsdb.install(_flushed(lsa)))
+    self.assertIsNone(lsdb.lookup("router", PHANTOM))
+    self.assertEqual(lsdb.flushed("router", PHANTOM).header.sequence, 0x80000005)
+
+    self.assertFalse(lsdb.install(lsa))
+    self.assertEqual(lsdb.compare_header(LinkStateDatabase.header_payload(lsa)), -1)
+
+    list(lsdb.age(timers.FLUSH_HOLD_TIME))
+    self.assertIsNone(lsdb.flushed("router", PHANTOM))
+    self.assertTrue(lsdb.install(lsa))
+
+  def test_higher_sequence_replaces_flushed(self) -> None:
+    lsdb = LinkStateDatabase()
+    lsa = _phantom_lsa(0x80000005)
+    lsdb.install(lsa)
+    lsdb.install(_flushed(lsa))
+    self.assertTrue(lsdb.install(_phantom_lsa(0x80000006)))
+    self.assertIsNone(lsdb.flushed("router", PHANTOM))
+
+  def test_received_age_is_kept(self) -> None:
+    lsdb = LinkStateDatabase()
+    lsdb.install(_phantom_lsa(0x80000005, age=timers.MAX_AGE - 10))
+    self.assertEqual(lsdb.lookup("router", PHANTOM).header.age, timers.MAX_AGE - 10)
+    expired = list(lsdb.age(10))
+    self.assertEqual([lsa.header.lsa_id for lsa in expired], [PHANTOM])
+
+
+class DatabaseExchangeTest(unittest.TestCase):
+
+  def setUp(self) -> None:
+    ids = [router_id(1), router_id(2)]
+    config = {
+        "defaults": {"area": AREA, "hello_interval": 1, "dead_interval": 4, "min_ls_interval": 0},
+        "routers": {rid: {"loopback": f"{rid}/32", "interfaces": []} for rid in ids},
+    }
+    add_p2p_links(config, [(ids[0], ids[1])])
+    self.loop = EventLoop()
+    self.fabric = Fabric(self.loop)
+    self.routers = [Router(rid, config, self.loop, dry_run=True) for rid in ids]
+    for router in self.routers:
+      router.bootstrap(bind=False)
+      self.fabric.attach(router)
+    self.assertTrue(run_until(self.loop, lambda: loopbacks_reachable(self.routers), 10.0))
+
+  def tearDown(self) -> None:
+    for router in self.routers:
+      router.shutdown()
+    self.loop.close()
+
+  def _exchange(self) -> None:
+    for router in self.routers:
+      area = router.areas[AREA]
+      for iface_state in area.interfaces.values():
+        for adjacency in iface_state.adjacency.values():
+          router._start_database_exchange(area, adjacency)
+    run_until(self.loop, lambda: False, 0.5)
+
+  def test_dd_after_flush_does_not_resurrect(self) -> None:
+    flusher, lagging = self.routers
+    lsa = _phantom_lsa(0x80000005)
+    for router in self.routers:
+      self.assertTrue(router.lsdb.install(lsa))
+    # 只有 flusher 处理了清除；lagging 仍持有同序列号的实例。
+    self.assertTrue(flusher.lsdb.install(_flushed(lsa)))
+
+    self._exchange()
+
+    self.assertIsNone(flusher.lsdb.lookup("router", PHANTOM))
+    self.assertIsNone(lagging.lsdb.lookup("router", PHANTOM))
+    self.assertIsNotNone(lagging.lsdb.flushed("router", PHANTOM))
+
+
+if __name__ == "__main__":
+  unittest.main()